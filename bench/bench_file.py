@@ -0,0 +1,113 @@
+# coding: utf-8
+"""
+File ID: 3cJw8Pz
+
+Benchmark |SixyIOObj.open_out| and |SixyIOObj.open_in| with the |io| engine
+against the |codecs| engine.
+
+Each engine writes a file of about |--size| bytes line by line, then reads it
+back line by line and as a whole.
+
+Run from the repo root:
+    python bench/bench_file.py [--size BYTES] [--dir DIR] [--encoding ENC]
+"""
+
+import argparse
+import os
+import os.path
+import sys
+import tempfile
+import time
+
+#/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from aoiksixyio import SixyIOObj
+
+#/
+LINE_UTXT = 'The quick brown fox jumps over the lazy dog. é中文 0123456789\n'
+
+def bench_engine(sio, engine, file_path, size):
+    #/
+    line_count = size // len(LINE_UTXT.encode(sio.ofe)) + 1
+
+    res_d = {}
+
+    #/
+    start = time.perf_counter()
+
+    with sio.open_out(file_path, engine=engine) as file_obj:
+        write = file_obj.write
+
+        for _ in range(line_count):
+            write(LINE_UTXT)
+
+    res_d['write lines'] = time.perf_counter() - start
+
+    #/
+    start = time.perf_counter()
+
+    with sio.open_in(file_path, engine=engine) as file_obj:
+        for _ in file_obj:
+            pass
+
+    res_d['read lines'] = time.perf_counter() - start
+
+    #/
+    start = time.perf_counter()
+
+    with sio.open_in(file_path, engine=engine) as file_obj:
+        while file_obj.read(1024 * 1024):
+            pass
+
+    res_d['read 1M chunks'] = time.perf_counter() - start
+
+    #/
+    return res_d
+
+def main():
+    #/
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('--size', type=int, default=1024 * 1024 * 1024)
+
+    parser.add_argument('--dir', default=None)
+
+    parser.add_argument('--encoding', default='utf-8')
+
+    args_obj = parser.parse_args()
+
+    #/
+    sio = SixyIOObj(ife=args_obj.encoding, ofe=args_obj.encoding)
+
+    #/
+    fd, file_path = tempfile.mkstemp(prefix='bench_file_', dir=args_obj.dir)
+
+    os.close(fd)
+
+    #/
+    try:
+        #/
+        res_d_d = {}
+
+        for engine in ('codecs', 'io'):
+            res_d_d[engine] = bench_engine(sio, engine, file_path, args_obj.size)
+
+        #/
+        print('size: {} MB, encoding: {}'.format(args_obj.size // (1024 * 1024), args_obj.encoding))
+
+        print('{:<16}{:>12}{:>12}{:>10}'.format('case', 'codecs s', 'io s', 'speedup'))
+
+        for case in res_d_d['io']:
+            codecs_time = res_d_d['codecs'][case]
+
+            io_time = res_d_d['io'][case]
+
+            print('{:<16}{:>12.2f}{:>12.2f}{:>9.1f}x'.format(
+                case, codecs_time, io_time, codecs_time / io_time))
+    finally:
+        os.remove(file_path)
+
+#/
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+# coding: utf-8
+"""
+File ID: 5kRt2Wd
+
+Benchmark import time of |aoiksixyio|.
+
+Each case runs in a fresh interpreter:
+- import: Import only. Environment probes are deferred.
+- import+probe: Import and access all lazily probed encodings, which is
+  the cost every import paid when the probes ran in the class body.
+
+Run from the repo root:
+    python bench/bench_import.py [-n RUNS]
+"""
+
+import argparse
+import os.path
+import subprocess
+import sys
+import time
+
+#/
+CASE_S = [
+    ('import', 'import aoiksixyio'),
+    ('import+probe', 'import aoiksixyio; S = aoiksixyio.SixyIO; '
+        '[getattr(S, x) for x in sorted(S._LAZY_ATTR_D)]'),
+    ('python only', 'pass'),
+]
+
+def run_case(code, runs, env):
+    #/
+    time_s = []
+
+    #/
+    for _ in range(runs):
+        #/
+        start = time.perf_counter()
+
+        subprocess.check_call([sys.executable, '-S', '-c', code], env=env)
+
+        time_s.append(time.perf_counter() - start)
+
+    #/
+    time_s.sort()
+
+    #/
+    return time_s[0], time_s[len(time_s) // 2]
+
+def main():
+    #/
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('-n', dest='runs', type=int, default=30)
+
+    args_obj = parser.parse_args()
+
+    #/
+    src_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+    env = dict(os.environ)
+
+    env['PYTHONPATH'] = os.path.abspath(src_dir)
+
+    #/
+    print('{:<15}{:>12}{:>12}'.format('case', 'min ms', 'median ms'))
+
+    for name, code in CASE_S:
+        min_time, median_time = run_case(code, args_obj.runs, env)
+
+        print('{:<15}{:>12.2f}{:>12.2f}'.format(name, min_time * 1000, median_time * 1000))
+
+#/
+if __name__ == '__main__':
+    main()
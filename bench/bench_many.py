@@ -0,0 +1,91 @@
+# coding: utf-8
+"""
+File ID: 9tGe4Lc
+
+Benchmark |SixyIO.to_u_many| and |SixyIO.to_b_many| against a Python loop
+over |SixyIO.to_u| and |SixyIO.to_b|, on many small fields like CSV cells.
+
+Run from the repo root:
+    python bench/bench_many.py [-n FIELDS] [--encoding ENC ...]
+"""
+
+import argparse
+import os.path
+import sys
+import time
+
+#/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from aoiksixyio import SixyIO
+
+def timeit(func):
+    #/
+    time_s = []
+
+    for _ in range(3):
+        #/
+        start = time.perf_counter()
+
+        func()
+
+        time_s.append(time.perf_counter() - start)
+
+    #/
+    return min(time_s)
+
+def main():
+    #/
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('-n', dest='count', type=int, default=1000000)
+
+    parser.add_argument('--encoding', dest='encoding_s', action='append')
+
+    args_obj = parser.parse_args()
+
+    encoding_s = args_obj.encoding_s or ['utf-8', 'latin-1', 'gbk']
+
+    #/
+    utxt_s = ['cell{}'.format(i) for i in range(args_obj.count)]
+
+    #/
+    print('fields: {}'.format(args_obj.count))
+
+    print('{:<10}{:<10}{:>10}{:>10}{:>10}'.format('encoding', 'case', 'loop s', 'many s', 'speedup'))
+
+    for encoding in encoding_s:
+        #/
+        btxt_s = [x.encode(encoding) for x in utxt_s]
+
+        mixed_s = [x if i % 2 else y for i, (x, y) in enumerate(zip(btxt_s, utxt_s))]
+
+        #/
+        case_s = [
+            ('to_u',
+                lambda: [SixyIO.to_u(x, encoding) for x in btxt_s],
+                lambda: SixyIO.to_u_many(btxt_s, encoding)),
+            ('to_u mix',
+                lambda: [SixyIO.to_u(x, encoding) for x in mixed_s],
+                lambda: SixyIO.to_u_many(mixed_s, encoding)),
+            ('to_b',
+                lambda: [SixyIO.to_b(x, encoding) for x in utxt_s],
+                lambda: SixyIO.to_b_many(utxt_s, encoding)),
+        ]
+
+        #/
+        for name, loop_func, many_func in case_s:
+            #/
+            assert loop_func() == many_func()
+
+            #/
+            loop_time = timeit(loop_func)
+
+            many_time = timeit(many_func)
+
+            print('{:<10}{:<10}{:>10.3f}{:>10.3f}{:>9.1f}x'.format(
+                encoding, name, loop_time, many_time, loop_time / many_time))
+
+#/
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+# coding: utf-8
+"""
+File ID: 6Mv3Tq8
+
+Benchmark record mode throughput, in million records per second.
+
+Cases:
+    decode: |SixyIO.iter_decode_records| over bytes chunks in memory.
+    read+decode: |SixyIO.iter_read_records| from a file, reading in a thread.
+    main --stream: The command copying a file in stream mode.
+    main --rec: The command copying a file in record mode.
+
+Records are short lines, where the per-record overhead shows most.
+
+Run from the repo root:
+    python bench/bench_records.py [--count N] [--encoding ENC] [--dir DIR]
+"""
+
+import argparse
+import io
+import os
+import os.path
+import subprocess
+import sys
+import tempfile
+import time
+
+#/
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+sys.path.insert(0, SRC_DIR)
+
+from aoiksixyio import SixyIO
+
+#/
+MAIN_CODE = 'import sys; from aoiksixyio.aoiksixyioexp import main; sys.exit(main())'
+
+#/
+LINE_UTXT = 'record é 0123\n'
+
+def make_decode_func(btxt, encoding):
+    #/
+    def decode_func():
+        #/
+        chunk_size = SixyIO.CHUNK_SIZE
+
+        btxt_s = (btxt[i:i + chunk_size] for i in range(0, len(btxt), chunk_size))
+
+        for _ in SixyIO.iter_decode_records(btxt_s, '\n', encoding=encoding):
+            pass
+
+    return decode_func
+
+def make_read_func(file_path, encoding):
+    #/
+    def read_func():
+        #/
+        with io.open(file_path, 'rb') as file_b:
+            for _ in SixyIO.iter_read_records(file_b, '\n', encoding=encoding):
+                pass
+
+    return read_func
+
+def make_main_func(arg_s, env):
+    #/
+    def main_func():
+        #/
+        subprocess.check_call(
+            [sys.executable, '-c', MAIN_CODE] + arg_s,
+            stdout=subprocess.DEVNULL,
+            env=env,
+        )
+
+    return main_func
+
+def main():
+    #/
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('--count', type=int, default=5000000)
+
+    parser.add_argument('--encoding', default='utf-8')
+
+    parser.add_argument('--dir', default=None)
+
+    args_obj = parser.parse_args()
+
+    #/
+    encoding = args_obj.encoding
+
+    btxt = (LINE_UTXT * args_obj.count).encode(encoding)
+
+    #/
+    env = dict(os.environ)
+
+    env['PYTHONPATH'] = os.path.abspath(SRC_DIR)
+
+    #/
+    fd, file_path = tempfile.mkstemp(prefix='bench_records_', dir=args_obj.dir)
+
+    #/
+    try:
+        #/
+        with os.fdopen(fd, 'wb') as file_b:
+            file_b.write(btxt)
+
+        #/
+        main_arg_s = ['--if', file_path, '--ife', encoding, '--stdoe', encoding, '--nopt']
+
+        case_s = [
+            ('decode', make_decode_func(btxt, encoding)),
+            ('read+decode', make_read_func(file_path, encoding)),
+            ('main --stream', make_main_func(main_arg_s + ['--stream'], env)),
+            ('main --rec', make_main_func(main_arg_s + ['--rec'], env)),
+        ]
+
+        #/
+        print('records: {}, size: {} MB, encoding: {}'.format(
+            args_obj.count, len(btxt) // (1024 * 1024), encoding))
+
+        print('{:<16}{:>10}{:>14}'.format('case', 'time s', 'M records/s'))
+
+        for name, func in case_s:
+            #/
+            start = time.perf_counter()
+
+            func()
+
+            time_s = time.perf_counter() - start
+
+            #/
+            print('{:<16}{:>10.2f}{:>14.2f}'.format(
+                name, time_s, args_obj.count / time_s / 1000000))
+    finally:
+        os.remove(file_path)
+
+#/
+if __name__ == '__main__':
+    main()
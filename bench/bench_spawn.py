@@ -0,0 +1,128 @@
+# coding: utf-8
+"""
+File ID: 5jRt2Wm
+
+Benchmark spawn latency of |--sp| subprocs, run directly by |SixyIO.spawn|
+against run via the shell as with |--spsh|.
+
+Each run starts a program, by default |cat|, that exits on the empty input,
+with stdin, stdout, and stderr piped like |--sp| does, and waits for it. Shell
+builtins, e.g. |true| in most shells, would not show the exec the shell does.
+Also times the whole command with each mode, in a fresh interpreter per run.
+
+Run from the repo root:
+    python bench/bench_spawn.py [-n RUNS] [--prog PROG]
+"""
+
+import argparse
+import os.path
+import subprocess
+import sys
+import time
+
+#/
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+sys.path.insert(0, SRC_DIR)
+
+from aoiksixyio import SixyIO
+
+#/
+MAIN_CODE = 'import sys; from aoiksixyio.aoiksixyioexp import main; sys.exit(main())'
+
+def time_runs(func, runs):
+    #/
+    time_s = []
+
+    #/
+    for _ in range(runs):
+        #/
+        start = time.perf_counter()
+
+        func()
+
+        time_s.append(time.perf_counter() - start)
+
+    #/
+    time_s.sort()
+
+    #/
+    return time_s[0], time_s[len(time_s) // 2]
+
+def make_spawn_func(cmd, shell):
+    #/
+    def spawn_func():
+        #/
+        proc_obj = SixyIO.spawn(cmd,
+            shell=shell,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+
+        proc_obj.communicate(b'')
+
+    return spawn_func
+
+def make_main_func(arg_s, env):
+    #/
+    def main_func():
+        #/
+        proc_obj = subprocess.Popen(
+            [sys.executable, '-c', MAIN_CODE] + arg_s,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            env=env,
+        )
+
+        proc_obj.communicate(b'hello\n')
+
+        #/
+        if proc_obj.returncode != 0:
+            raise RuntimeError('Exit code {}: {}'.format(proc_obj.returncode, arg_s))
+
+    return main_func
+
+def main():
+    #/
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('-n', dest='runs', type=int, default=200)
+
+    parser.add_argument('--prog', default='cat')
+
+    args_obj = parser.parse_args()
+
+    #/
+    env = dict(os.environ)
+
+    env['PYTHONPATH'] = os.path.abspath(SRC_DIR)
+
+    #/
+    prog_btxt = args_obj.prog.encode('utf-8')
+
+    case_s = [
+        ('spawn direct', make_spawn_func([prog_btxt], shell=False), args_obj.runs),
+        ('spawn shell', make_spawn_func(prog_btxt, shell=True), args_obj.runs),
+        ## A fresh interpreter per run costs much more, so run fewer times.
+        ('main --sp', make_main_func(['--sp', args_obj.prog], env), args_obj.runs // 10 or 1),
+        ('main --spsh --sp', make_main_func(['--spsh', '--sp', args_obj.prog], env), args_obj.runs // 10 or 1),
+    ]
+
+    #/
+    print('{:<20}{:>8}{:>12}{:>12}'.format('case', 'runs', 'min ms', 'median ms'))
+
+    for name, func, runs in case_s:
+        #/
+        ## Warm up, e.g. the lookup of the program in |PATH|.
+        func()
+
+        #/
+        min_time, median_time = time_runs(func, runs)
+
+        print('{:<20}{:>8}{:>12.3f}{:>12.3f}'.format(
+            name, runs, min_time * 1000, median_time * 1000))
+
+#/
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+# coding: utf-8
+"""
+File ID: 7sHn4Vb
+
+Benchmark startup latency of the |aoiksixyioexp| command on short inputs.
+
+Each run starts a fresh interpreter, like a shell loop calling the command.
+Wall time is noisy on a busy machine. CPU time of the child is reported too.
+
+With |--server|, also start |aoiksixyiosrv| on a temp socket and time the
+same runs via client |aoiksixyiocli|. CPU time of these covers the client
+only, not the server's child doing the work.
+
+Run from the repo root:
+    python bench/bench_startup.py [-n RUNS] [--server]
+"""
+
+import argparse
+import os.path
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+#/
+MAIN_CODE = 'import sys; from aoiksixyio.aoiksixyioexp import main; sys.exit(main())'
+## Same as the console script made by setup.py. |-m| would add |runpy|.
+
+CLI_CODE = 'import sys; from aoiksixyiocli import main; sys.exit(main())'
+
+#/
+CASE_S = [
+    ('python only', ['-c', 'pass'], None),
+    ('--ia', ['-c', MAIN_CODE, '--ia', 'hello'], None),
+    ('stdin', ['-c', MAIN_CODE], b'hello\n'),
+    ('stdin --nopt', ['-c', MAIN_CODE, '--nopt'], b'hello\n'),
+    ('--sp', ['-c', MAIN_CODE, '--sp', 'cat'], b'hello\n'),
+]
+
+SERVER_CASE_S = [
+    ('cli --ia', ['-c', CLI_CODE, '--ia', 'hello'], None),
+    ('cli stdin', ['-c', CLI_CODE], b'hello\n'),
+    ('cli --sp', ['-c', CLI_CODE, '--sp', 'cat'], b'hello\n'),
+]
+
+def start_server(sock_path, env):
+    #/
+    proc_obj = subprocess.Popen(
+        [sys.executable, '-m', 'aoiksixyio.aoiksixyiosrv', '--sock', sock_path],
+        stderr=subprocess.DEVNULL,
+        env=env,
+    )
+
+    #/
+    while not os.path.exists(sock_path):
+        #/
+        if proc_obj.poll() is not None:
+            raise RuntimeError('Server exit code {}'.format(proc_obj.returncode))
+
+        time.sleep(0.01)
+
+    #/
+    return proc_obj
+
+def run_case(arg_s, input_btxt, runs, env):
+    #/
+    time_s = []
+
+    cpu_time_s = []
+
+    #/
+    for _ in range(runs):
+        #/
+        usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+        cpu_start = usage.ru_utime + usage.ru_stime
+
+        start = time.perf_counter()
+
+        proc_obj = subprocess.Popen(
+            [sys.executable] + arg_s,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            env=env,
+        )
+
+        proc_obj.communicate(input_btxt or b'')
+
+        time_s.append(time.perf_counter() - start)
+
+        usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+        cpu_time_s.append(usage.ru_utime + usage.ru_stime - cpu_start)
+
+        #/
+        if proc_obj.returncode != 0:
+            raise RuntimeError('Exit code {}: {}'.format(proc_obj.returncode, arg_s))
+
+    #/
+    time_s.sort()
+
+    cpu_time_s.sort()
+
+    #/
+    return time_s[0], time_s[len(time_s) // 2], cpu_time_s[len(cpu_time_s) // 2]
+
+def main():
+    #/
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('-n', dest='runs', type=int, default=30)
+
+    parser.add_argument('--server', dest='server_on', action='store_true')
+
+    args_obj = parser.parse_args()
+
+    #/
+    src_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+    env = dict(os.environ)
+
+    env['PYTHONPATH'] = os.path.abspath(src_dir)
+
+    #/
+    case_s = list(CASE_S)
+
+    server_proc_obj = None
+
+    if args_obj.server_on:
+        #/
+        sock_path = os.path.join(tempfile.mkdtemp(prefix='bench_startup_'), 'srv.sock')
+
+        server_proc_obj = start_server(sock_path, env)
+
+        env['AOIKSIXYIO_SOCK'] = sock_path
+
+        case_s.extend(SERVER_CASE_S)
+
+    #/
+    try:
+        #/
+        print('{:<15}{:>12}{:>12}{:>12}'.format('case', 'min ms', 'median ms', 'cpu ms'))
+
+        for name, arg_s, input_btxt in case_s:
+            min_time, median_time, cpu_time = run_case(arg_s, input_btxt, args_obj.runs, env)
+
+            print('{:<15}{:>12.2f}{:>12.2f}{:>12.2f}'.format(
+                name, min_time * 1000, median_time * 1000, cpu_time * 1000))
+    finally:
+        #/
+        if server_proc_obj is not None:
+            server_proc_obj.terminate()
+
+            server_proc_obj.wait()
+
+            os.rmdir(os.path.dirname(sock_path))
+
+#/
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,510 @@
+# coding: utf-8
+"""
+File ID: 4wNd7Fq
+
+Benchmark suite for the conversion and I/O hot paths of |SixyIO| and
+|aoiksixyioexp|, over a matrix of payload sizes, encodings, and error modes.
+
+Cases:
+- to_u, to_b: |SixyIO.to_u| and |SixyIO.to_b|.
+- sio.*: The |*_to_u| and |*_to_b| helpers of |SixyIOObj|.
+- stdout_write, stdout_print: Stdout is redirected to the null device.
+- wrapper.write, wrapper.write_fmt: |FileForceWriteUnicodeWrapper|, as
+  returned by |open_out| with the |codecs| engine.
+- open_out, open_in: Write the payload to a file, and read it back, with the
+  default file engine.
+- open_out atomic=POLICY: Same as |open_out|, via |AtomicFileWriter| with each
+  fsync policy.
+- main, main --sp: End-to-end |aoiksixyioexp.main| from input file to output
+  file, in process, without and with a |cat| subproc. Strict mode only,
+  because the command has no error mode option.
+
+In modes other than |strict|, the unicode payload has characters the encoding
+can not encode, and the bytes payload has sequences it can not decode, so that
+the error handler is exercised.
+
+Results are written as JSON. Give |--cmp| an earlier result file to print the
+ratio of each case's time to the earlier time, and exit with code 1 if any
+case is slower than |--threshold|.
+
+Run from the repo root:
+    python bench/bench_suite.py [--size 1,1K,1M] [--encoding utf-8,cp936]
+        [--errors strict,replace] [--case to_u,main] [--out FILE]
+        [--cmp FILE] [--threshold 1.2] [--min-time SECONDS]
+
+Sizes take |K|, |M|, and |G| suffixes. The default stops at 16M. A |1G|
+payload needs several GB of memory.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import os.path
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+#/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from aoiksixyio import SixyIO
+from aoiksixyio import SixyIOObj
+from aoiksixyio.aoiksixyioexp import main as exp_main
+
+#/
+SIZE_S_DFT = '1,1K,64K,1M,16M'
+
+ENCODING_S_DFT = 'utf-8,utf-16,latin-1,cp936'
+
+ERRORS_S_DFT = 'strict,replace'
+
+#/
+SAMPLE_UTXT_S = (
+    'The quick brown fox jumps over the lazy dog. 0123456789\n',
+    'Café naïve résumé\n',
+    '中文测试，这是一段文字。\n',
+)
+## Lines not encodable in an encoding are left out of its payload.
+
+BAD_UTXT_S = ('\U0001f600', '\udcff')
+## First one the encoding can not encode is put in the unicode payload in
+##  non-strict modes.
+
+BAD_BTXT = b'\x00\xdc\x00\xdc'
+## Invalid in UTF-8, UTF-16, UTF-32, and CP936. Four bytes keep UTF-16 and
+##  UTF-32 code units aligned. Every byte is valid in Latin-1.
+
+BAD_INTERVAL = 1024
+## Bytes between bad sequences in the bytes payload.
+
+def parse_size(size_stxt):
+    #/
+    size_stxt = size_stxt.strip().upper()
+
+    #/
+    for suffix, factor in (('K', 1024), ('M', 1024 ** 2), ('G', 1024 ** 3)):
+        if size_stxt.endswith(suffix):
+            return int(float(size_stxt[:-1]) * factor)
+
+    #/
+    return int(size_stxt)
+
+def encodable(utxt, encoding):
+    #/
+    try:
+        utxt.encode(encoding)
+    except UnicodeEncodeError:
+        return False
+
+    #/
+    return True
+
+def make_payload(size, encoding, errors):
+    """
+    Return a tuple of a unicode payload about |size| bytes when encoded, and a
+    bytes payload of about |size| bytes.
+    """
+    #/
+    sample_utxt = ''.join(x for x in SAMPLE_UTXT_S if encodable(x, encoding))
+
+    #/
+    if errors != 'strict':
+        #/
+        for bad_utxt in BAD_UTXT_S:
+            if not encodable(bad_utxt, encoding):
+                sample_utxt += bad_utxt
+
+                break
+
+    #/
+    ## Estimate characters per byte from the sample.
+    sample_len = len(sample_utxt.encode(encoding, 'replace'))
+
+    char_count = max(1, size * len(sample_utxt) // sample_len)
+
+    #/
+    utxt = (sample_utxt * (char_count // len(sample_utxt) + 1))[:char_count]
+
+    #/
+    btxt = utxt.encode(encoding, 'replace')
+
+    #/
+    if errors != 'strict' and size >= BAD_INTERVAL:
+        #/
+        ## Put the bad sequence at even offsets after the BOM, if any.
+        btxt = BAD_BTXT.join(
+            btxt[x:x + BAD_INTERVAL] for x in range(0, len(btxt), BAD_INTERVAL))
+
+    #/
+    return utxt, btxt
+
+@contextlib.contextmanager
+def stdout_to_null():
+    #/
+    old_stdout = sys.stdout
+
+    null_file = open(os.devnull, 'w')
+
+    #/
+    sys.stdout = null_file
+
+    ## Rebind the lazily bound stdout functions to the new stdout.
+    SixyIO.refresh()
+
+    #/
+    try:
+        yield
+    finally:
+        #/
+        SixyIO.stdout_flush()
+
+        sys.stdout = old_stdout
+
+        SixyIO.refresh()
+
+        null_file.close()
+
+def make_case_s(ctx):
+    """
+    Return a list of tuples of case name, setup function, and function to
+    time. Setup functions run before each timed run, untimed.
+    """
+    #/
+    utxt = ctx['utxt']
+
+    btxt = ctx['btxt']
+
+    encoding = ctx['encoding']
+
+    errors = ctx['errors']
+
+    sio = ctx['sio']
+
+    tmp_dir = ctx['tmp_dir']
+
+    #/
+    in_path = os.path.join(tmp_dir, 'in.txt')
+
+    out_path = os.path.join(tmp_dir, 'out.txt')
+
+    #/
+    def noop():
+        pass
+
+    def write_in_file():
+        #/
+        with open(in_path, 'wb') as file_b:
+            file_b.write(btxt if errors == 'strict' else utxt.encode(encoding, 'replace'))
+
+    #/
+    def run_stdout_write():
+        with stdout_to_null():
+            SixyIO.stdout_write(utxt, encoding=encoding, errors=errors)
+
+    def run_stdout_print():
+        with stdout_to_null():
+            SixyIO.stdout_print(utxt, encoding=encoding, errors=errors)
+
+    ## The wrapper's |__enter__| returns the wrapped file, so the wrapper is
+    ##  closed explicitly instead of used in a |with| statement.
+    def run_wrapper_write():
+        #/
+        file_obj = sio.open_out(out_path, 'w', engine='codecs', errors=errors)
+
+        try:
+            file_obj.write(utxt)
+        finally:
+            file_obj.close()
+
+    def run_wrapper_write_fmt():
+        #/
+        file_obj = sio.open_out(out_path, 'w', engine='codecs', errors=errors)
+
+        try:
+            file_obj.write_fmt('{}\n', utxt)
+        finally:
+            file_obj.close()
+
+    def run_open_out():
+        with sio.open_out(out_path, 'w', errors=errors) as file_obj:
+            file_obj.write(utxt)
+
+    def make_run_open_out_atomic(fsync):
+        #/
+        def run_open_out_atomic():
+            with sio.open_out(out_path, 'w', errors=errors, atomic=True, fsync=fsync) as file_obj:
+                file_obj.write(utxt)
+
+        return run_open_out_atomic
+
+    def run_open_in():
+        with sio.open_in(in_path, errors=errors) as file_obj:
+            file_obj.read()
+
+    def run_main():
+        #/
+        ret_v = exp_main([
+            '--if', in_path, '--ife', encoding, '--of', out_path, '--ofe', encoding])
+
+        assert ret_v == 0, ret_v
+
+    def run_main_sp():
+        #/
+        ret_v = exp_main([
+            '--if', in_path, '--ife', encoding, '--of', out_path, '--ofe', encoding,
+            '--sp', 'cat', '--spie', encoding, '--spoe', encoding])
+
+        assert ret_v == 0, ret_v
+
+    #/
+    case_s = [
+        ('to_u', noop, lambda: SixyIO.to_u(btxt, encoding=encoding, errors=errors)),
+        ('to_b', noop, lambda: SixyIO.to_b(utxt, encoding=encoding, errors=errors)),
+        ('sio.ife_to_u', noop, lambda: sio.ife_to_u(btxt, errors=errors)),
+        ('sio.spoe_to_u', noop, lambda: sio.spoe_to_u(btxt, errors=errors)),
+        ('sio.spee_to_u', noop, lambda: sio.spee_to_u(btxt, errors=errors)),
+        ('sio.spie_to_b', noop, lambda: sio.spie_to_b(utxt, errors=errors)),
+        ('sio.spce_to_b', noop, lambda: sio.spce_to_b(utxt, errors=errors)),
+        ('stdout_write', noop, run_stdout_write),
+        ('stdout_print', noop, run_stdout_print),
+        ('wrapper.write', noop, run_wrapper_write),
+        ('wrapper.write_fmt', noop, run_wrapper_write_fmt),
+        ('open_out', noop, run_open_out),
+    ]
+
+    case_s.extend(
+        ('open_out atomic=' + fsync, noop, make_run_open_out_atomic(fsync))
+        for fsync in SixyIO.FSYNC_POLICY_S
+    )
+
+    case_s.append(('open_in', write_in_file, run_open_in))
+
+    #/
+    if errors == 'strict':
+        case_s.append(('main', write_in_file, run_main))
+
+        case_s.append(('main --sp', write_in_file, run_main_sp))
+
+    #/
+    return case_s
+
+def time_case(setup, func, min_time):
+    """
+    Run |func| until |min_time| seconds have passed, at least once.
+    Return a tuple of run count, best time, and mean time.
+    """
+    #/
+    time_s = []
+
+    total_time = 0.0
+
+    #/
+    while not time_s or total_time < min_time:
+        #/
+        setup()
+
+        #/
+        start = time.perf_counter()
+
+        func()
+
+        run_time = time.perf_counter() - start
+
+        #/
+        time_s.append(run_time)
+
+        total_time += run_time
+
+    #/
+    return len(time_s), min(time_s), total_time / len(time_s)
+
+def result_key(res_d):
+    return (res_d['case'], res_d['size'], res_d['encoding'], res_d['errors'])
+
+def compare(res_d_s, old_file_path, threshold):
+    """
+    Print the ratio of each case's best time to that in an earlier result
+    file. Return the number of cases slower than |threshold|.
+    """
+    #/
+    with open(old_file_path) as file_obj:
+        old_res_d_s = json.load(file_obj)['results']
+
+    old_res_d_d = dict((result_key(x), x) for x in old_res_d_s)
+
+    #/
+    slow_count = 0
+
+    print('')
+
+    print('{:<26}{:>12}{:>10}{:>9}{:>12}{:>12}{:>8}'.format(
+        'case', 'size', 'encoding', 'errors', 'old ms', 'new ms', 'ratio'))
+
+    for res_d in res_d_s:
+        #/
+        old_res_d = old_res_d_d.get(result_key(res_d))
+
+        if old_res_d is None:
+            continue
+
+        #/
+        ratio = res_d['best_s'] / old_res_d['best_s'] if old_res_d['best_s'] else 1.0
+
+        mark = ''
+
+        if ratio > threshold:
+            slow_count += 1
+
+            mark = ' !'
+
+        #/
+        print('{:<26}{:>12}{:>10}{:>9}{:>12.3f}{:>12.3f}{:>8.2f}{}'.format(
+            res_d['case'], res_d['size'], res_d['encoding'], res_d['errors'],
+            old_res_d['best_s'] * 1000, res_d['best_s'] * 1000, ratio, mark))
+
+    #/
+    return slow_count
+
+def main():
+    #/
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('--size', dest='size_s', default=SIZE_S_DFT)
+
+    parser.add_argument('--encoding', dest='encoding_s', default=ENCODING_S_DFT)
+
+    parser.add_argument('--errors', dest='errors_s', default=ERRORS_S_DFT)
+
+    parser.add_argument('--case', dest='case_s', default=None,
+        help='Comma-separated case names to run. By default all.')
+
+    parser.add_argument('--min-time', dest='min_time', type=float, default=0.2)
+
+    parser.add_argument('--out', dest='out_file_path', default='bench_suite.json')
+
+    parser.add_argument('--cmp', dest='cmp_file_path', default=None)
+
+    parser.add_argument('--threshold', type=float, default=1.2)
+
+    args_obj = parser.parse_args()
+
+    #/
+    size_s = [parse_size(x) for x in args_obj.size_s.split(',')]
+
+    encoding_s = args_obj.encoding_s.split(',')
+
+    errors_s = args_obj.errors_s.split(',')
+
+    case_name_s = set(args_obj.case_s.split(',')) if args_obj.case_s else None
+
+    #/
+    tmp_dir = tempfile.mkdtemp(prefix='bench_suite_')
+
+    res_d_s = []
+
+    #/
+    print('{:<26}{:>12}{:>10}{:>9}{:>7}{:>12}{:>10}'.format(
+        'case', 'size', 'encoding', 'errors', 'runs', 'best ms', 'MB/s'))
+
+    try:
+        for encoding in encoding_s:
+            #/
+            sio = SixyIOObj(
+                stdoe=encoding,
+                ife=encoding,
+                ofe=encoding,
+                spce=encoding,
+                spie=encoding,
+                spoe=encoding,
+                spee=encoding,
+            )
+
+            for errors in errors_s:
+                for size in size_s:
+                    #/
+                    utxt, btxt = make_payload(size, encoding, errors)
+
+                    ctx = {
+                        'utxt': utxt,
+                        'btxt': btxt,
+                        'encoding': encoding,
+                        'errors': errors,
+                        'sio': sio,
+                        'tmp_dir': tmp_dir,
+                    }
+
+                    #/
+                    for case_name, setup, func in make_case_s(ctx):
+                        #/
+                        if case_name_s is not None and case_name not in case_name_s:
+                            continue
+
+                        #/
+                        run_count, best_time, mean_time = time_case(setup, func, args_obj.min_time)
+
+                        mb_per_s = len(btxt) / best_time / (1024 * 1024) if best_time else 0.0
+
+                        #/
+                        res_d = {
+                            'case': case_name,
+                            'size': size,
+                            'encoding': encoding,
+                            'errors': errors,
+                            'byte_count': len(btxt),
+                            'char_count': len(utxt),
+                            'runs': run_count,
+                            'best_s': best_time,
+                            'mean_s': mean_time,
+                            'mb_per_s': mb_per_s,
+                        }
+
+                        res_d_s.append(res_d)
+
+                        #/
+                        print('{:<26}{:>12}{:>10}{:>9}{:>7}{:>12.3f}{:>10.1f}'.format(
+                            case_name, size, encoding, errors, run_count, best_time * 1000, mb_per_s))
+
+                    #/
+                    ## Free the payload before making the next one.
+                    del utxt, btxt, ctx
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    #/
+    doc = {
+        'meta': {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': sys.version.split()[0],
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'argv': sys.argv[1:],
+        },
+        'results': res_d_s,
+    }
+
+    #/
+    with open(args_obj.out_file_path, 'w') as file_obj:
+        json.dump(doc, file_obj, indent=1)
+
+    print('')
+
+    print('Results written to {}'.format(args_obj.out_file_path))
+
+    #/
+    if args_obj.cmp_file_path:
+        #/
+        slow_count = compare(res_d_s, args_obj.cmp_file_path, args_obj.threshold)
+
+        #/
+        if slow_count:
+            print('{} cases slower than {}x.'.format(slow_count, args_obj.threshold))
+
+            sys.exit(1)
+
+#/
+if __name__ == '__main__':
+    main()
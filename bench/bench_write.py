@@ -0,0 +1,110 @@
+# coding: utf-8
+"""
+File ID: 5Vb9Rt2
+
+Benchmark many short |SixyIO.stdout_print| calls, unbuffered and in
+buffered mode, against builtin |print|. Output goes to |/dev/null|, where
+the per-call overhead shows most.
+
+Each case runs in a child process with stdout on |/dev/null|, which
+reports its time on stderr.
+
+Run from the repo root:
+    python bench/bench_write.py [-n LINES] [--encoding ENC]
+"""
+
+import argparse
+import os.path
+import subprocess
+import sys
+import time
+
+#/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from aoiksixyio import SixyIO
+
+#/
+LINE_UTXT = 'log line é 0123'
+
+CASE_S = (
+    'builtin print',
+    'stdout_print',
+    'stdout_print buffered',
+    'stdout_print line-buffered',
+)
+
+def run_case(case, count, encoding):
+    #/
+    if case == 'builtin print':
+        #/
+        start = time.perf_counter()
+
+        for _ in range(count):
+            print(LINE_UTXT)
+
+        sys.stdout.flush()
+
+        return time.perf_counter() - start
+
+    #/
+    if case == 'stdout_print buffered':
+        SixyIO.stdout_set_buffered()
+    elif case == 'stdout_print line-buffered':
+        SixyIO.stdout_set_buffered(line_buffered=True)
+
+    #/
+    stdout_print = SixyIO.stdout_print
+
+    start = time.perf_counter()
+
+    for _ in range(count):
+        stdout_print(LINE_UTXT, encoding=encoding)
+
+    SixyIO.stdout_flush()
+
+    return time.perf_counter() - start
+
+def main():
+    #/
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('-n', dest='count', type=int, default=1000000)
+
+    parser.add_argument('--encoding', default='utf-8')
+
+    parser.add_argument('--case', default=None, help=argparse.SUPPRESS)
+
+    args_obj = parser.parse_args()
+
+    #/
+    if args_obj.case is not None:
+        #/
+        time_s = run_case(args_obj.case, args_obj.count, args_obj.encoding)
+
+        sys.stderr.write('{}\n'.format(time_s))
+
+        return
+
+    #/
+    print('lines: {}, encoding: {}'.format(args_obj.count, args_obj.encoding))
+
+    print('{:<30}{:>10}'.format('case', 'time s'))
+
+    for case in CASE_S:
+        #/
+        with open(os.devnull, 'wb') as null_file:
+            res = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--case', case,
+                    '-n', str(args_obj.count), '--encoding', args_obj.encoding],
+                stdout=null_file,
+                stderr=subprocess.PIPE,
+                check=True,
+            )
+
+        #/
+        print('{:<30}{:>10.3f}'.format(case, float(res.stderr)))
+
+#/
+if __name__ == '__main__':
+    main()
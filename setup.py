@@ -25,22 +25,26 @@ setup(
         'Intended Audience :: Developers',
         'License :: OSI Approved :: MIT License',
         'Operating System :: OS Independent',
-        'Programming Language :: Python :: 2',
-        'Programming Language :: Python :: 2.7',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.3',
-        'Programming Language :: Python :: 3.4',
+        'Programming Language :: Python :: 3 :: Only',
+        'Programming Language :: Python :: 3.7',
     ],
 
+    python_requires='>=3.7',
+
     keywords='',
 
     package_dir={'':'src'},
 
     packages=find_packages('src'),
 
+    py_modules=['aoiksixyiocli'],
+
     entry_points={
         'console_scripts': [
             'aoiksixyioexp=aoiksixyio.aoiksixyioexp:main',
+            'aoiksixyiosrv=aoiksixyio.aoiksixyiosrv:main',
+            'aoiksixyiocli=aoiksixyiocli:main',
         ],
     },
 )
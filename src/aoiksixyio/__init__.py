@@ -1,3 +1,10 @@
 # coding: utf-8
+from .aoiksixyio_ import AtomicFileWriter
+from .aoiksixyio_ import CodecErrStats
+from .aoiksixyio_ import PrescanStats
 from .aoiksixyio_ import SixyIO
 from .aoiksixyio_ import SixyIOObj
+from .aoiksixyio_ import StageStats
+from .aoiksixyio_ import SubprocPool
+from .aoiksixyio_ import SubprocPump
+from .aoiksixyio_ import ThreadedWriter
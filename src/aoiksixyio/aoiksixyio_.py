@@ -3,11 +3,17 @@
 File ID: 8yVHVsZ
 """
 
+import atexit
 import codecs
-import locale
+import encodings
+import encodings.aliases
+import errno
+import functools
+import io
+import itertools
 import os
+import stat
 import sys
-import traceback
 
 #/ define a raisex func that is compatible with both Py2 and Py3.
 ##
@@ -42,6 +48,45 @@ def reraisex(exc):
     raisex(exc, tb=sys.exc_info()[2])
 ## ---END
 
+class LazyClassAttr(object):
+    """
+    Class attribute computed by |func(cls)| on first access.
+
+    On first access the descriptor replaces itself in the class with the
+    computed value, so later accesses cost a plain attribute lookup.
+    |SixyIO.refresh| puts the descriptors back to compute again.
+    """
+
+    def __init__(self, func):
+        #/
+        self.func = func
+
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        #/
+        self.name = name
+
+        #/
+        lazy_attr_d = owner.__dict__.get('_LAZY_ATTR_D')
+
+        if lazy_attr_d is None:
+            lazy_attr_d = {}
+
+            setattr(owner, '_LAZY_ATTR_D', lazy_attr_d)
+
+        lazy_attr_d[name] = self
+
+    def __get__(self, obj, cls):
+        #/
+        value = self.func(cls)
+
+        #/
+        setattr(cls, self.name, value)
+
+        #/
+        return value
+
 class SixyIO(object):
     
     #/
@@ -56,49 +101,53 @@ class SixyIO(object):
     UTXT_CLS = str if IS_PY2 else str
     
     #/
-    _LCE = locale.getdefaultlocale()[1]
+    ## Encodings probed from the environment are computed on first access.
+    ##  See |LazyClassAttr| and |refresh|.
+
+    #/
+    _LCE = LazyClassAttr(lambda cls: __import__('locale').getdefaultlocale()[1])
     ## stxt or None
     
-    LCE = _LCE or 'utf-8'
+    LCE = LazyClassAttr(lambda cls: cls._LCE or 'utf-8')
     ## stxt
 
-    LCE_UTXT = LCE.decode('ascii', 'replace') if IS_PY2 else LCE
+    LCE_UTXT = LazyClassAttr(lambda cls: cls.stxt_to_u(cls.LCE))
     
     #/
-    _STDIE = sys.stdin.encoding
+    _STDIE = LazyClassAttr(lambda cls: getattr(sys.stdin, 'encoding', None))
     ## stxt or None
     
-    STDIE = _STDIE or LCE
+    STDIE = LazyClassAttr(lambda cls: cls._STDIE or cls.LCE)
 
-    STDIE_UTXT = STDIE.decode('ascii', 'replace') if IS_PY2 else STDIE
+    STDIE_UTXT = LazyClassAttr(lambda cls: cls.stxt_to_u(cls.STDIE))
     
     #/
-    _STDOE = sys.stdout.encoding
+    _STDOE = LazyClassAttr(lambda cls: getattr(sys.stdout, 'encoding', None))
     ## stxt or None
     
-    STDOE = _STDOE or STDIE
+    STDOE = LazyClassAttr(lambda cls: cls._STDOE or cls.STDIE)
     ## stxt
 
-    STDOE_UTXT = STDOE.decode('ascii', 'replace') if IS_PY2 else STDOE
+    STDOE_UTXT = LazyClassAttr(lambda cls: cls.stxt_to_u(cls.STDOE))
     
     #/
-    _STDEE = sys.stderr.encoding
+    _STDEE = LazyClassAttr(lambda cls: getattr(sys.stderr, 'encoding', None))
     ## stxt or None
     
-    STDEE = _STDEE or STDIE
+    STDEE = LazyClassAttr(lambda cls: cls._STDEE or cls.STDIE)
     ## stxt
 
-    STDEE_UTXT = STDEE.decode('ascii', 'replace') if IS_PY2 else STDEE
+    STDEE_UTXT = LazyClassAttr(lambda cls: cls.stxt_to_u(cls.STDEE))
     
     #/
-    CAE = STDIE
+    CAE = LazyClassAttr(lambda cls: cls.STDIE)
     ## stxt
 
-    CAE_UTXT = CAE.decode('ascii', 'replace') if IS_PY2 else CAE
+    CAE_UTXT = LazyClassAttr(lambda cls: cls.stxt_to_u(cls.CAE))
     
-    FSE = sys.getfilesystemencoding() or 'utf-8'
+    FSE = LazyClassAttr(lambda cls: sys.getfilesystemencoding() or 'utf-8')
     
-    FSE_UTXT = FSE.decode('ascii', 'replace') if IS_PY2 else FSE
+    FSE_UTXT = LazyClassAttr(lambda cls: cls.stxt_to_u(cls.FSE))
     
     IFE = 'utf-8'
     
@@ -123,7 +172,181 @@ class SixyIO(object):
     SPEE = 'utf-8'
     
     SPEE_UTXT = SPEE.decode('ascii', 'replace') if IS_PY2 else SPEE
-    
+
+    #/
+    CHUNK_SIZE = 64 * 1024
+    ## Bytes read per chunk in streaming mode.
+
+    #/
+    RECORD_QUEUE_SIZE = 8
+    ## Max number of chunks held in each queue between the reading,
+    ##  converting, and writing threads of record mode.
+
+    #/
+    WRITE_BUF_SIZE = 64 * 1024
+    ## Buffer size of stdout and stderr in buffered mode.
+
+    #/
+    FILE_ENGINE = 'codecs'
+    ## Default engine of |SixyIOObj.open_in| and |SixyIOObj.open_out|.
+    ## |io| for |UnicodeTextFile|, |codecs| for |codecs.open|.
+    ## |codecs| by default, which takes |codecs.open|'s keyword arguments,
+    ##  e.g. |buffering|. The |io| engine is faster. Pass |engine='io'|, or
+    ##  set this to |io| where all callers use |open_text|'s arguments.
+
+    FILE_BUF_SIZE = 256 * 1024
+    ## Buffer size of files opened by the |io| engine.
+
+    #/
+    FSYNC_NONE = 'none'
+
+    FSYNC_FILE = 'file'
+
+    FSYNC_FILE_DIR = 'file+dir'
+
+    FSYNC_POLICY_S = (FSYNC_NONE, FSYNC_FILE, FSYNC_FILE_DIR)
+    ## Fsync policies of |AtomicFileWriter|. Fsync nothing, the file's data,
+    ##  or the file's data and then its directory after the rename.
+
+    ATOMIC_FSYNC = FSYNC_FILE
+    ## Default fsync policy of |AtomicFileWriter|. The data is on disk before
+    ##  the rename, so a crash leaves either the old file or the new one.
+
+    #/
+    _stdout_writer = None
+    ## EncodedBufferWriter in buffered mode, otherwise None.
+
+    _stderr_writer = None
+    ## EncodedBufferWriter in buffered mode, otherwise None.
+
+    _flush_at_exit_on = False
+
+    #/
+    CODEC_CACHE_SIZE = 256
+    ## Max number of encoding names kept in the codec registry.
+
+    _codec_info_d = {}
+    ## Map encoding name normalized by |codec_key| to CodecInfo.
+
+    _encoding_valid_d = {}
+    ## Map encoding name as given to whether it is valid.
+
+    _cp65001_registered = False
+
+    #/
+    ENCODING_AUTO = 'auto'
+    ## Encoding name meaning detect the encoding from a sample of the data.
+    ##  See |detect_encodings|.
+
+    DETECT_SAMPLE_SIZE = 64 * 1024
+    ## Max bytes read from input for encoding detection.
+
+    DETECT_BOM_ENCODING_S = (
+        (codecs.BOM_UTF32_LE, 'utf-32'),
+        (codecs.BOM_UTF32_BE, 'utf-32'),
+        (codecs.BOM_UTF8, 'utf-8-sig'),
+        (codecs.BOM_UTF16_LE, 'utf-16'),
+        (codecs.BOM_UTF16_BE, 'utf-16'),
+    )
+    ## UTF-32 BOMs go first because the UTF-16 LE BOM is a prefix of the
+    ##  UTF-32 LE BOM. The codecs given consume the BOM.
+
+    DETECT_FALLBACK_ENCODING_S = (
+        'gbk',
+        'big5',
+        'shift_jis',
+        'euc-jp',
+        'euc-kr',
+        'cp1252',
+        'latin-1',
+    )
+    ## Candidates tried when data is not UTF-8. Multi-byte codecs go first,
+    ##  because single-byte codecs accept almost any data. |latin-1| accepts
+    ##  all data, so the result is never empty.
+
+    _DETECT_ASCII_BTXT = bytes(bytearray(range(128)))
+
+    #/
+    BUILTIN_FAST_CODEC_NAME_S = frozenset(['utf-8', 'ascii', 'iso8859-1'])
+    ## Canonical names of codecs that |str.encode| and |bytes.decode| handle
+    ##  without a codec lookup.
+
+    #/
+    _ascii_prescan_d = {}
+    ## Map encoding name as given to whether the ASCII pre-scan is used for
+    ##  it. See |ascii_prescan_on|.
+
+    _prescan_stats = None
+    ## PrescanStats if enabled by |prescan_stats_enable|, otherwise None.
+    ##  Checked once per call, so disabled counts cost nothing more.
+
+    _DECODER_INIT_STATE = (b'', 0)
+
+    #/
+    COUNT_ERRORS_PREFIX = 'sixyio_count_'
+    ## Prefix of error handler names registered by |count_errors|.
+
+    ERR_STATS_SAMPLE_SIZE = 16
+    ## Number of error offsets kept by |CodecErrStats|.
+
+    _count_errors_d = {}
+    ## Map error handler name to the counting handler name registered for it.
+
+    _err_stats_local = None
+    ## Thread-local |scope| of the |CodecErrStats| counting the decode run by
+    ##  the thread. Set by |count_errors| on first use. While None, decodes
+    ##  skip the offset tracking.
+
+    #/
+    FILENAME_INVALID_CHAR_S = '\\/<>:*?"|'
+    ## Characters not allowed in file names on Windows. Includes both path
+    ##  separators.
+
+    FILENAME_ESC_EMPTY = 'empty'
+
+    FILENAME_ESC_SPACE = 'space'
+
+    FILENAME_ESC_NOTATION = 'notation'
+    ## Modes of |filename_esc|. Convert invalid characters to empty, to
+    ##  spaces, or to % notation, e.g. |:| to |%3A|.
+
+    FILENAME_INVALID_CHAR_SET = frozenset(FILENAME_INVALID_CHAR_S)
+
+    FILENAME_ESC_MODE_S = frozenset([FILENAME_ESC_EMPTY, FILENAME_ESC_SPACE, FILENAME_ESC_NOTATION])
+
+    FILENAME_ESC_BTABLE_D = {
+        FILENAME_ESC_EMPTY: (None, FILENAME_INVALID_CHAR_S.encode('ascii')),
+        FILENAME_ESC_SPACE: (
+            bytes.maketrans(
+                FILENAME_INVALID_CHAR_S.encode('ascii'),
+                b' ' * len(FILENAME_INVALID_CHAR_S),
+            ),
+            b'',
+        ),
+    }
+    ## Map mode to |bytes.translate| arguments, for modes converting a
+    ##  character to at most one character. See |filename_esc|.
+
+    FILENAME_ESC_NOTATION_PAIR_S = tuple(
+        (char, '%{:02X}'.format(ord(char))) for char in FILENAME_INVALID_CHAR_S
+    )
+    ## Pairs of invalid character and its % notation.
+
+    #/
+    PASSTHROUGH_CODEC_NAME_S = frozenset([
+        'ascii',
+        'utf-8',
+        'utf-16-be',
+        'utf-16-le',
+        'utf-32-be',
+        'utf-32-le',
+    ])
+    ## Canonical names of codecs for which decoding valid bytes and encoding
+    ##  them back gives the same bytes. Codecs that add or strip a BOM, e.g.
+    ##  |utf-16| and |utf-8-sig|, are not included. Nor are multi-byte legacy
+    ##  codecs, some of which map several byte sequences to one character.
+    ## Single-byte |iso8859-*| and |cp125*| codecs are checked by prefix.
+
     SIXYIO_CLS_NOT_ALLOW_CREATING_OBJ = '9gwa3bx'
     STDEE_NOT_VALID = '5jNUcjC'
     STDOE_NOT_VALID = '2bGFZgx'
@@ -165,6 +388,8 @@ class SixyIO(object):
         exc_cls, exc_obj, tb_obj = sys.exc_info()
         
         #/
+        import traceback
+
         txt_s = traceback.format_exception(exc_cls, exc_obj, tb_obj)
     
         #/
@@ -189,6 +414,8 @@ class SixyIO(object):
     @staticmethod
     def get_default_locale(self, lower=False):
         #/
+        import locale
+
         lang, encoding = locale.getdefaultlocale()
         ## can both be None
         
@@ -219,6 +446,8 @@ class SixyIO(object):
         txt_s.append(SixyIO.format('{:<25}{}', 'PYTHONIOENCODING', SixyIO.cae_to_u_safe(os.environ.get('PYTHONIOENCODING') or '')))
         
         #/
+        import locale
+
         loc_lang, loc_encoding = locale.getdefaultlocale()
         
         txt_s.append(SixyIO.format('{:<25}{}', 'locale lang', SixyIO.to_u_safe(loc_lang or '')))
@@ -240,14 +469,81 @@ class SixyIO(object):
         
         return res
     
+    @staticmethod
+    def stxt_to_u(stxt):
+        """
+        Convert an encoding name of str type to unicode.
+        """
+        return stxt.decode('ascii', 'replace') if SixyIO.IS_PY2 else stxt
+
+    @staticmethod
+    def refresh():
+        """
+        Probe the environment again on next access of |LCE|, |STDIE|,
+        |STDOE|, |STDEE|, |CAE|, |FSE|, and their |_UTXT| variants, and
+        rebind |stdout_write_b| and |stderr_write_b| to the current streams,
+        and forget program paths found by |which|.
+
+        Call this after replacing |sys.stdin|, |sys.stdout|, or |sys.stderr|,
+        or after changing the locale.
+        """
+        #/
+        for name, lazy_attr in SixyIO._LAZY_ATTR_D.items():
+            setattr(SixyIO, name, lazy_attr)
+
+        #/
+        SixyIO._which_d.clear()
+
+        #/
+        ## In buffered mode, flush to the old stream and retarget the buffer.
+        writer = SixyIO._stdout_writer
+
+        if writer is not None:
+            writer.flush()
+
+            writer.file_b = SixyIO.stdout_get_b()
+
+            SixyIO.stdout_write_b = writer.write_b
+
+        #/
+        writer = SixyIO._stderr_writer
+
+        if writer is not None:
+            writer.flush()
+
+            writer.file_b = SixyIO.stderr_get_b()
+
+            SixyIO.stderr_write_b = writer.write_b
+
     @staticmethod
     def encoding_is_valid(encoding):
+        """
+        Result is memoized process-wide. Registering a codec search function
+        via |register_special_codecs| resets the memo.
+        """
+        #/
+        valid = SixyIO._encoding_valid_d.get(encoding)
+
+        if valid is not None:
+            return valid
+
         #/
         try:
-            codecs.lookup(encoding)
-            return True
+            SixyIO.codec_info(encoding)
+            valid = True
         except Exception:
-            return False
+            valid = False
+
+        #/
+        valid_d = SixyIO._encoding_valid_d
+
+        if len(valid_d) >= SixyIO.CODEC_CACHE_SIZE:
+            valid_d.clear()
+
+        valid_d[encoding] = valid
+
+        #/
+        return valid
     
     @staticmethod
     def reload_default_encoding(encoding):
@@ -257,13 +553,24 @@ class SixyIO(object):
     
     @staticmethod
     def register_codec_cp65001():
-        try:
-            codecs.lookup('cp65001')
-        except Exception:
+        #/
+        ## Register once. A search function is called on every codec miss.
+        if SixyIO._cp65001_registered:
+            return
+
+        SixyIO._cp65001_registered = True
+
+        #/
+        if not SixyIO.encoding_is_valid('cp65001'):
+            #/
             def lookup_func(name):
                 if name.lower() == 'cp65001':
                     return codecs.lookup('utf-8')
             codecs.register(lookup_func)
+
+            #/
+            ## Drop the memoized miss of |cp65001|.
+            SixyIO._encoding_valid_d.clear()
     
     @staticmethod
     def register_special_codecs():
@@ -278,15 +585,51 @@ class SixyIO(object):
         
         #/
         buf = sys.stdin if SixyIO.IS_PY2 else sys.stdin.buffer
+
+        #/
+        if encoding == SixyIO.ENCODING_AUTO:
+            encoding, buf = SixyIO.detect_stream_encoding(buf, wait=True)
         
         #/
-        reader = codecs.getreader(encoding)(buf, errors)
+        reader = SixyIO.codec_info(encoding).streamreader(buf, errors)
         
         return reader
         
     #/   
-    stdout_write_b = sys.stdout.write if IS_PY2 else sys.stdout.buffer.write
+    stdout_write_b = LazyClassAttr(lambda cls: cls.stdout_get_b().write)
     
+    @staticmethod
+    def stdin_get_b():
+        return sys.stdin if SixyIO.IS_PY2 else sys.stdin.buffer
+
+    @staticmethod
+    def stdout_get_b():
+        return sys.stdout if SixyIO.IS_PY2 else sys.stdout.buffer
+
+    @staticmethod
+    def stderr_get_b():
+        return sys.stderr if SixyIO.IS_PY2 else sys.stderr.buffer
+
+    @staticmethod
+    def _register_flush_at_exit():
+        #/
+        if SixyIO._flush_at_exit_on:
+            return
+
+        #/
+        def flush_at_exit():
+            for writer in (SixyIO._stdout_writer, SixyIO._stderr_writer):
+                if writer is not None:
+                    try:
+                        writer.flush()
+                    except Exception:
+                        pass
+
+        atexit.register(flush_at_exit)
+
+        #/
+        SixyIO._flush_at_exit_on = True
+
     @staticmethod
     def stdout_write(utxt, encoding=None, errors=None):
         #/
@@ -298,6 +641,15 @@ class SixyIO(object):
             
         errors = errors or 'strict'
         
+        #/
+        ## In buffered mode, the writer encodes once per batch.
+        writer = SixyIO._stdout_writer
+
+        if writer is not None:
+            writer.write(utxt, encoding, errors)
+
+            return
+
         #/
         btxt = utxt.encode(encoding, errors)
         
@@ -306,8 +658,7 @@ class SixyIO(object):
         
     @staticmethod
     def stdout_print(utxt, encoding=None, errors=None):
-        SixyIO.stdout_write(utxt, encoding=encoding, errors=errors)
-        SixyIO.stdout_write('\n', encoding=encoding, errors=errors)
+        SixyIO.stdout_write(utxt + '\n', encoding=encoding, errors=errors)
         
     @staticmethod
     def stdout_write_safe(utxt, encoding=None, errors=None):
@@ -323,8 +674,7 @@ class SixyIO(object):
         errors = errors or 'replace'
         
         #/
-        SixyIO.stdout_write(utxt, encoding=encoding, errors=errors)
-        SixyIO.stdout_write('\n', encoding=encoding, errors=errors)
+        SixyIO.stdout_write(utxt + '\n', encoding=encoding, errors=errors)
         
     @staticmethod
     def stdout_write_fmt(fmt, *args, **kwargs):
@@ -350,8 +700,7 @@ class SixyIO(object):
         utxt = SixyIO.format(fmt, *args, **kwargs)
         
         #/
-        SixyIO.stdout_write(utxt, encoding=_encoding, errors=_errors)
-        SixyIO.stdout_write('\n', encoding=_encoding, errors=_errors)
+        SixyIO.stdout_write(utxt + '\n', encoding=_encoding, errors=_errors)
         
     @staticmethod
     def stdout_write_fmt_safe(fmt, *args, **kwargs):
@@ -392,6 +741,54 @@ class SixyIO(object):
         #/
         SixyIO.stdout_write_safe(res_utxt, encoding=encoding)
         
+    @staticmethod
+    def stdout_set_buffered(on=True, buf_size=None, line_buffered=None):
+        """
+        Turn buffered mode of |stdout_write| and friends on or off.
+
+        In buffered mode, output is gathered in a buffer, and encoded and
+        written out when the buffer is full, on |stdout_flush|, and at exit.
+        |line_buffered| means also write out after each newline. It defaults
+        to whether stdout is a TTY.
+        """
+        #/
+        writer = SixyIO._stdout_writer
+
+        if writer is not None:
+            writer.flush()
+
+        #/
+        if on:
+            #/
+            writer = EncodedBufferWriter(
+                SixyIO.stdout_get_b(),
+                buf_size=buf_size,
+                line_buffered=line_buffered,
+            )
+
+            SixyIO._stdout_writer = writer
+
+            SixyIO.stdout_write_b = writer.write_b
+
+            #/
+            SixyIO._register_flush_at_exit()
+        else:
+            #/
+            SixyIO._stdout_writer = None
+
+            SixyIO.stdout_write_b = SixyIO.stdout_get_b().write
+
+    @staticmethod
+    def stdout_flush():
+        #/
+        writer = SixyIO._stdout_writer
+
+        #/
+        if writer is not None:
+            writer.flush()
+        else:
+            SixyIO.stdout_get_b().flush()
+
     @staticmethod
     def stdout_make_writer(encoding=None, errors=None):
         #/
@@ -399,14 +796,20 @@ class SixyIO(object):
         
         errors = errors or 'strict'
         
+        #/
+        ## The returned writer bypasses the buffer. Write out buffered data
+        ##  first to keep the order.
+        if SixyIO._stdout_writer is not None:
+            SixyIO._stdout_writer.flush()
+
         #/
         buf = sys.stdout if SixyIO.IS_PY2 else sys.stdout.buffer
         
         #/
-        return codecs.getwriter(encoding)(buf, errors)
+        return SixyIO.codec_info(encoding).streamwriter(buf, errors)
     
     #/
-    stderr_write_b = sys.stderr.write if IS_PY2 else sys.stderr.buffer.write
+    stderr_write_b = LazyClassAttr(lambda cls: cls.stderr_get_b().write)
         
     @staticmethod
     def stderr_write(utxt, encoding=None, errors=None):
@@ -419,6 +822,15 @@ class SixyIO(object):
             
         errors = errors or 'strict'
         
+        #/
+        ## In buffered mode, the writer encodes once per batch.
+        writer = SixyIO._stderr_writer
+
+        if writer is not None:
+            writer.write(utxt, encoding, errors)
+
+            return
+
         #/
         btxt = utxt.encode(encoding, errors)
         
@@ -427,8 +839,7 @@ class SixyIO(object):
         
     @staticmethod
     def stderr_print(utxt, encoding=None, errors=None):
-        SixyIO.stderr_write(utxt, encoding=encoding, errors=errors)
-        SixyIO.stderr_write('\n', encoding=encoding, errors=errors)
+        SixyIO.stderr_write(utxt + '\n', encoding=encoding, errors=errors)
         
     @staticmethod
     def stderr_write_safe(utxt, encoding=None, errors=None):
@@ -444,8 +855,7 @@ class SixyIO(object):
         errors = errors or 'replace'
         
         #/
-        SixyIO.stderr_write(utxt, encoding=encoding, errors=errors)
-        SixyIO.stderr_write('\n', encoding=encoding, errors=errors)
+        SixyIO.stderr_write(utxt + '\n', encoding=encoding, errors=errors)
         
     @staticmethod
     def stderr_write_fmt(fmt, *args, **kwargs):
@@ -471,8 +881,7 @@ class SixyIO(object):
         utxt = SixyIO.format(fmt, *args, **kwargs)
         
         #/
-        SixyIO.stderr_write(utxt, encoding=_encoding, errors=_errors)
-        SixyIO.stderr_write('\n', encoding=_encoding, errors=_errors)
+        SixyIO.stderr_write(utxt + '\n', encoding=_encoding, errors=_errors)
         
     @staticmethod
     def stderr_write_fmt_safe(fmt, *args, **kwargs):
@@ -513,6 +922,54 @@ class SixyIO(object):
         #/
         SixyIO.stderr_write_safe(res_utxt, encoding=encoding)
         
+    @staticmethod
+    def stderr_set_buffered(on=True, buf_size=None, line_buffered=None):
+        """
+        Turn buffered mode of |stderr_write| and friends on or off.
+
+        In buffered mode, output is gathered in a buffer, and encoded and
+        written out when the buffer is full, on |stderr_flush|, and at exit.
+        |line_buffered| means also write out after each newline. It defaults
+        to whether stderr is a TTY.
+        """
+        #/
+        writer = SixyIO._stderr_writer
+
+        if writer is not None:
+            writer.flush()
+
+        #/
+        if on:
+            #/
+            writer = EncodedBufferWriter(
+                SixyIO.stderr_get_b(),
+                buf_size=buf_size,
+                line_buffered=line_buffered,
+            )
+
+            SixyIO._stderr_writer = writer
+
+            SixyIO.stderr_write_b = writer.write_b
+
+            #/
+            SixyIO._register_flush_at_exit()
+        else:
+            #/
+            SixyIO._stderr_writer = None
+
+            SixyIO.stderr_write_b = SixyIO.stderr_get_b().write
+
+    @staticmethod
+    def stderr_flush():
+        #/
+        writer = SixyIO._stderr_writer
+
+        #/
+        if writer is not None:
+            writer.flush()
+        else:
+            SixyIO.stderr_get_b().flush()
+
     @staticmethod
     def stderr_make_writer(encoding=None, errors=None):
         #/
@@ -520,295 +977,3503 @@ class SixyIO(object):
         
         errors = errors or 'strict'
         
+        #/
+        ## The returned writer bypasses the buffer. Write out buffered data
+        ##  first to keep the order.
+        if SixyIO._stderr_writer is not None:
+            SixyIO._stderr_writer.flush()
+
         #/
         buf = sys.stderr if SixyIO.IS_PY2 else sys.stderr.buffer
         
         #/
-        return codecs.getwriter(encoding)(buf, errors)
-    
-    @staticmethod
-    def is_u(obj):
-        if SixyIO.IS_PY2:
-            unicode_cls = str
-        else:
-            unicode_cls = str
-        
-        return isinstance(obj, unicode_cls)
-    
+        return SixyIO.codec_info(encoding).streamwriter(buf, errors)
+
     @staticmethod
-    def to_u(obj, encoding=None, errors=None):
+    def codec_info(encoding):
+        """
+        Codec registry. Return the CodecInfo of |encoding|, looking it up
+        only on first use. Raise LookupError if |encoding| is unknown.
+
+        The CodecInfo carries the codec's incremental and stream factories,
+        so these are resolved once too. Spellings of the same encoding, e.g.
+        |UTF8| and |utf_8|, share one entry. See |codec_key|.
+
+        One-shot conversions, e.g. |to_u| and |to_b|, keep using |str.encode|
+        and |bytes.decode|. CPython caches their lookups and has C fast paths
+        for common codecs, which a lookup here would only slow down.
+        """
         #/
-        encoding = encoding or 'utf-8'
-        
-        errors = errors or 'strict'
-        
+        key = SixyIO.codec_key(encoding)
+
+        info = SixyIO._codec_info_d.get(key)
+
+        if info is not None:
+            return info
+
         #/
-        if isinstance(obj, SixyIO.UTXT_CLS):
-            res = obj
-        elif isinstance(obj, SixyIO.BTXT_CLS):
-            res = SixyIO.UTXT_CLS(obj, encoding=encoding, errors=errors)
-        else:
-            res = SixyIO.UTXT_CLS(obj)
-        
-        return res
-        
-    @staticmethod
-    def to_u_safe(obj, encoding=None, errors=None):
+        try:
+            info = codecs.lookup(encoding)
+        except LookupError:
+            #/
+            ## Special codecs are registered on the first miss, not at start.
+            if SixyIO._cp65001_registered:
+                raise
+
+            SixyIO.register_special_codecs()
+
+            info = codecs.lookup(encoding)
+
         #/
-        errors = errors or 'replace'
-        
+        info_d = SixyIO._codec_info_d
+
+        ## Bounded. Drop the oldest entry when full.
+        if len(info_d) >= SixyIO.CODEC_CACHE_SIZE:
+            try:
+                del info_d[next(iter(info_d))]
+            except (KeyError, StopIteration, RuntimeError):
+                pass
+
         #/
-        return SixyIO.to_u(obj, encoding=encoding, errors=errors)
-    
+        info_d[key] = info
+
+        #/
+        return info
+
     @staticmethod
-    def to_b(txt, encoding=None, errors=None):
+    def codec_key(encoding):
+        """
+        Normalized name of |encoding| as looked up by |codecs.lookup|, with
+        aliases resolved, e.g. |utf_8| for |UTF-8|, |utf8|, and |u8|.
+        """
         #/
-        encoding = encoding or 'utf-8'
-        
+        key = encodings.normalize_encoding(encoding).lower()
+
         #/
-        errors = errors or 'strict'
-        
-        #/
-        if isinstance(txt, SixyIO.UTXT_CLS):
-            res = txt.encode(encoding, errors)
-        elif isinstance(txt, SixyIO.BTXT_CLS):
-            res = txt
-        else:
-            assert False
-        
-        return res
-    
+        return encodings.aliases.aliases.get(key, key)
+
     @staticmethod
-    def to_b_safe(txt, encoding=None, errors=None):
+    def codec_info_clear():
+        """
+        Empty the codec registry, e.g. after registering a codec search
+        function that changes the result of a lookup.
+        """
+        SixyIO._codec_info_d.clear()
+
+    @staticmethod
+    def codec_name(encoding):
+        """
+        Canonical name of an encoding, e.g. |utf-8| for both |UTF8| and |u8|.
+        """
+        return SixyIO.codec_info(encoding).name
+
+    @staticmethod
+    def codec_is_passthrough_safe(encoding):
+        """
+        Whether data in |encoding| can be copied as bytes instead of being
+        decoded and encoded back, when input and output use |encoding|.
+        """
         #/
-        errors = errors or 'replace'
-            
+        name = SixyIO.codec_name(encoding)
+
         #/
-        return SixyIO.to_b(txt=txt, encoding=encoding, errors=errors)
-    
+        return name in SixyIO.PASSTHROUGH_CODEC_NAME_S \
+            or name.startswith('iso8859-') \
+            or name.startswith('cp125')
+
     @staticmethod
-    def to_str(obj, encoding=None, errors=None):
-        #/
-        if encoding is None:
-            encoding = 'utf-8'
-        
+    def codec_accepts_all_bytes(encoding):
+        """
+        Whether any byte sequence is valid in |encoding|, e.g. |latin-1|.
+        Data in such an encoding needs no validation when copied.
+        """
         #/
-        if errors is None:
-            errors = 'strict'
-        
+        if not SixyIO.codec_is_passthrough_safe(encoding):
+            return False
+
         #/
-        if SixyIO.IS_PY2:
-            if isinstance(obj, str):
-                res = obj
-            elif isinstance(obj, str):
-                res = obj.decode(encoding, errors)
-            else:
-                res = str(obj)
-        else:
-            if isinstance(obj, str):
-                res = obj
-            else:
-                res = str(obj)
-        
-        return res
-    
-    @staticmethod
-    def to_str_safe(obj, encoding=None, errors=None):
+        ## Only single-byte codecs are checked this way. For them, if every
+        ##  byte value decodes, so does every byte sequence.
+        if SixyIO.codec_name(encoding).startswith('utf-'):
+            return False
+
         #/
-        errors = errors or 'replace'
-            
+        try:
+            SixyIO.codec_info(encoding).decode(bytes(bytearray(range(256))))
+        except Exception:
+            return False
+
         #/
-        return SixyIO.to_str(obj=obj, encoding=encoding, errors=errors)
-        
+        return True
+
     @staticmethod
-    def cae_to_u(txt, encoding=None, errors=None):
+    def codec_is_ascii_compatible(encoding):
+        """
+        Whether |encoding| decodes each ASCII byte to the same character, so
+        that bytes all in ASCII can be decoded as ASCII. Not true for e.g.
+        |utf-16|, |utf-7|, and |iso2022_jp|, nor for non-text codecs, e.g.
+        |rot13| and |hex|.
+        """
         #/
-        encoding = encoding or SixyIO.CAE
-        
+        info = SixyIO.codec_info(encoding)
+
         #/
-        return SixyIO.to_u(txt, encoding=encoding, errors=errors)
-        
-    @staticmethod
-    def cae_to_u_safe(txt, encoding=None, errors=None):
+        ## Non-text codecs are refused by |bytes.decode| with LookupError.
+        ##  Let that error through instead of skipping the codec.
+        if not getattr(info, '_is_text_encoding', True):
+            return False
+
         #/
-        encoding = encoding or SixyIO.CAE
-        
-        errors = errors or 'replace'
-        
+        ## All ASCII bytes, then shift sequences of 7-bit stateful codecs
+        ##  |iso2022_*|, |hz|, and |utf-7|, which give other characters in
+        ##  those codecs.
+        btxt = bytes(bytearray(range(128))) + b'\x1b$B0!\x1b(B~{0!~}+AGE-'
+
         #/
-        return SixyIO.to_u(txt, encoding=encoding, errors=errors)
-        
+        try:
+            return info.decode(btxt)[0] == btxt.decode('ascii')
+        except Exception:
+            ## E.g. a third-party codec raising its own error type.
+            return False
+
     @staticmethod
-    def fse_to_u(txt, encoding=None, errors=None):
+    def ascii_prescan_on(encoding):
+        """
+        Whether bytes in |encoding| are pre-scanned for being all ASCII, and
+        then decoded as ASCII, skipping the codec.
+
+        Off for codecs in |BUILTIN_FAST_CODEC_NAME_S|. Their C decoders have
+        an ASCII fast path already, so the scan would only add a pass.
+        """
         #/
-        encoding = encoding or SixyIO.FSE
-        
+        prescan_on = SixyIO._ascii_prescan_d.get(encoding)
+
+        if prescan_on is not None:
+            return prescan_on
+
         #/
-        return SixyIO.to_u(txt, encoding=encoding, errors=errors)
-        
-    @staticmethod
-    def fse_to_u_safe(txt, encoding=None, errors=None):
+        prescan_on = SixyIO.codec_name(encoding) not in SixyIO.BUILTIN_FAST_CODEC_NAME_S \
+            and SixyIO.codec_is_ascii_compatible(encoding)
+
         #/
-        encoding = encoding or SixyIO.FSE
-        
-        errors = errors or 'replace'
-        
+        prescan_d = SixyIO._ascii_prescan_d
+
+        if len(prescan_d) >= SixyIO.CODEC_CACHE_SIZE:
+            prescan_d.clear()
+
+        prescan_d[encoding] = prescan_on
+
         #/
-        return SixyIO.to_u(txt, encoding=encoding, errors=errors)
+        return prescan_on
 
     @staticmethod
-    def spce_to_b(txt, encoding=None, errors=None):
+    def ascii_decode(btxt):
+        """
+        Return |btxt| decoded as ASCII if it is all ASCII, otherwise None.
+        |btxt| can be bytes or a memoryview.
+        """
         #/
-        encoding = encoding or SixyIO.SPCE
-        
+        isascii = getattr(btxt, 'isascii', None)
+
+        if isascii is not None:
+            return btxt.decode('ascii') if isascii() else None
+
         #/
-        return SixyIO.to_b(txt, encoding=encoding, errors=errors)
-        
+        ## Memoryview, or bytes before Python 3.7. The decode stops at the
+        ##  first non-ASCII byte.
+        try:
+            return codecs.ascii_decode(btxt)[0]
+        except UnicodeDecodeError:
+            return None
+
     @staticmethod
-    def spce_to_b_safe(txt, encoding=None, errors=None):
+    def decode_chunk(decoder, btxt, prescan_on=False, final=False):
+        """
+        Decode chunk |btxt| with incremental decoder |decoder|.
+
+        If |prescan_on|, e.g. as given by |ascii_prescan_on|, a chunk that is
+        all ASCII is decoded as ASCII without the codec, as long as the
+        decoder holds no partial character from the previous chunk.
+
+        final: Whether this is the last chunk, e.g. the empty chunk at end of
+            data that flushes the decoder.
+        """
         #/
-        encoding = encoding or SixyIO.SPCE
-        
-        errors = errors or 'replace'
-        
+        ## In a |CodecErrStats| scope, track the stream offset of the bytes
+        ##  the decoder works on, i.e. its pending bytes then |btxt|, so that
+        ##  error offsets are from the start of the stream.
+        if SixyIO._err_stats_local is not None:
+            #/
+            scope = getattr(SixyIO._err_stats_local, 'scope', None)
+
+            if scope is not None:
+                #/
+                pending_btxt = decoder.getstate()[0]
+
+                scope[2] = scope[1] - len(pending_btxt)
+
+                scope[1] += len(btxt)
+
         #/
-        return SixyIO.to_b(txt, encoding=encoding, errors=errors)
+        if final:
+            return decoder.decode(btxt, True)
 
-    @staticmethod
-    def spie_to_b(txt, encoding=None, errors=None):
         #/
-        encoding = encoding or SixyIO.SPIE
-        
+        if prescan_on:
+            #/
+            utxt = None
+
+            if decoder.getstate() == SixyIO._DECODER_INIT_STATE:
+                utxt = SixyIO.ascii_decode(btxt)
+
+            #/
+            prescan_stats = SixyIO._prescan_stats
+
+            if prescan_stats is not None:
+                prescan_stats.add(1, len(btxt), utxt is not None)
+
+            #/
+            if utxt is not None:
+                return utxt
+
         #/
-        return SixyIO.to_b(txt, encoding=encoding, errors=errors)
-        
+        return decoder.decode(btxt)
+
     @staticmethod
-    def spie_to_b_safe(txt, encoding=None, errors=None):
-        #/
-        encoding = encoding or SixyIO.SPIE
-        
-        errors = errors or 'replace'
-        
+    def prescan_stats_enable(on=True):
+        """
+        Turn counting of the ASCII pre-scan on or off. Off by default.
+        Turning it on again keeps the counts.
+        """
         #/
-        return SixyIO.to_b(txt, encoding=encoding, errors=errors)
-    
+        if not on:
+            SixyIO._prescan_stats = None
+        elif SixyIO._prescan_stats is None:
+            SixyIO._prescan_stats = PrescanStats()
+
     @staticmethod
-    def spoe_to_u(txt, encoding=None, errors=None):
+    def prescan_stats():
+        """
+        Return a dict of ASCII pre-scan counts since |prescan_stats_enable|
+        or the last |prescan_stats_reset|. See |PrescanStats.to_dict|. All
+        zero if counting is off.
+        """
         #/
-        encoding = encoding or SixyIO.SPOE
-        
+        prescan_stats = SixyIO._prescan_stats or PrescanStats()
+
         #/
-        return SixyIO.to_u(txt, encoding=encoding, errors=errors)
-        
+        return prescan_stats.to_dict()
+
     @staticmethod
-    def spoe_to_u_safe(txt, encoding=None, errors=None):
-        #/
-        encoding = encoding or SixyIO.SPOE
-        
-        errors = errors or 'replace'
-        
+    def prescan_stats_reset():
         #/
-        return SixyIO.to_u(txt, encoding=encoding, errors=errors)
-    
+        if SixyIO._prescan_stats is not None:
+            SixyIO._prescan_stats.reset()
+
     @staticmethod
-    def spee_to_u(txt, encoding=None, errors=None):
+    def make_decoder(encoding=None, errors=None):
         #/
-        encoding = encoding or SixyIO.SPEE
-        
+        encoding = encoding or 'utf-8'
+
+        errors = errors or 'strict'
+
         #/
-        return SixyIO.to_u(txt, encoding=encoding, errors=errors)
-        
+        return SixyIO.codec_info(encoding).incrementaldecoder(errors)
+
     @staticmethod
-    def spee_to_u_safe(txt, encoding=None, errors=None):
+    def make_encoder(encoding=None, errors=None):
         #/
-        encoding = encoding or SixyIO.SPEE
-        
-        errors = errors or 'replace'
-        
+        encoding = encoding or 'utf-8'
+
+        errors = errors or 'strict'
+
         #/
-        return SixyIO.to_u(txt, encoding=encoding, errors=errors)
-    
+        return SixyIO.codec_info(encoding).incrementalencoder(errors)
+
     @staticmethod
-    def format(fmt, *args, **kwargs):
+    def count_errors(errors=None):
+        """
+        Return the name of an error handler that acts as error handler
+        |errors|, by default |strict|, and also counts each error in the
+        |CodecErrStats| whose scope the decode runs in. Register it on first
+        use.
+
+        Outside any scope, the handler acts as |errors| only. See
+        |CodecErrStats.call| and |CodecErrStats.wrap_iter|.
+        """
         #/
-        if SixyIO.DEBUG_ON:
-            assert SixyIO.is_u(fmt)
-        
-            if args:
-                for arg in args:
-                    assert SixyIO.is_u(arg)
-            
-            if kwargs:
-                for key, val in list(kwargs.items()):
-                    assert SixyIO.is_u(key)
-                    assert SixyIO.is_u(val)
-        
+        errors = errors or 'strict'
+
         #/
-        txt = fmt.format(*args, **kwargs)
-        
-        return txt
-    
-    @staticmethod
-    def open(filename, mode, **kwargs):
+        name = SixyIO._count_errors_d.get(errors)
+
+        if name is not None:
+            return name
+
         #/
-        assert SixyIO.is_u(filename)
-        
+        if errors.startswith(SixyIO.COUNT_ERRORS_PREFIX):
+            return errors
+
         #/
-        return codecs.open(filename, mode, **kwargs)
-    
-class FileForceWriteUnicodeWrapper(object):
-    
-    def __init__(self, file_obj, debug_on):
-        self.file = file_obj
-        self.debug_on = debug_on
-                
-    def __getattr__(self, name):
-        return getattr(self.file, name)
-    
-    def __enter__(self, *args, **kwargs):
-        """
-        __enter__ is special that __getattr__ does not cover
-        """
-        return self.file.__enter__(*args, **kwargs)
+        ## Raise LookupError if unknown.
+        handler = codecs.lookup_error(errors)
 
-    def __exit__(self, *args, **kwargs):
-        """
-        __exit__ is special that __getattr__ does not cover
-        """
-        return self.file.__exit__(*args, **kwargs)
-     
-    def write(self, txt):
+        #/
+        if SixyIO._err_stats_local is None:
+            #/
+            import threading
+
+            SixyIO._err_stats_local = threading.local()
+
+        local = SixyIO._err_stats_local
+
+        #/
+        def count_handler(exc):
+            #/
+            scope = getattr(local, 'scope', None)
+
+            if scope is not None:
+                scope[0].add(exc, scope[2])
+
+            #/
+            return handler(exc)
+
+        #/
+        name = SixyIO.COUNT_ERRORS_PREFIX + errors
+
+        codecs.register_error(name, count_handler)
+
+        SixyIO._count_errors_d[errors] = name
+
+        #/
+        return name
+
+    @staticmethod
+    def is_broken_pipe(exc):
+        #/
+        return isinstance(exc, (IOError, OSError)) \
+            and getattr(exc, 'errno', None) in (errno.EPIPE, errno.EINVAL)
+
+    @staticmethod
+    def iter_split(utxt, chunk_size=None):
+        #/
+        chunk_size = chunk_size or SixyIO.CHUNK_SIZE
+
+        #/
+        for idx in range(0, len(utxt), chunk_size):
+            yield utxt[idx:idx + chunk_size]
+
+    @staticmethod
+    def iter_decode(file_b, encoding=None, errors=None, chunk_size=None):
+        """
+        Read bytes from binary file object |file_b| in chunks of at most
+        |chunk_size| bytes, decode them incrementally, and yield unicode chunks.
+        """
+        #/
+        encoding = encoding or 'utf-8'
+
+        errors = errors or 'strict'
+
+        chunk_size = chunk_size or SixyIO.CHUNK_SIZE
+
+        #/
+        if encoding == SixyIO.ENCODING_AUTO:
+            ## Do not wait for a full sample, so a slow pipe is not blocked.
+            encoding, file_b = SixyIO.detect_stream_encoding(file_b)
+
+        #/
+        ## |read1| returns what is available instead of waiting for a full
+        ## chunk, so data from a pipe is forwarded as soon as it arrives.
+        read_b = getattr(file_b, 'read1', None) or file_b.read
+
+        #/
+        ## The incremental decoder keeps a partial multi-byte character at the
+        ## end of a chunk until the next chunk completes it.
+        decoder = SixyIO.make_decoder(encoding, errors)
+
+        prescan_on = SixyIO.ascii_prescan_on(encoding)
+
+        #/
+        while True:
+            #/
+            btxt = read_b(chunk_size)
+
+            if not btxt:
+                break
+
+            #/
+            utxt = SixyIO.decode_chunk(decoder, btxt, prescan_on)
+
+            if utxt:
+                yield utxt
+
+        #/
+        utxt = SixyIO.decode_chunk(decoder, b'', final=True)
+
+        if utxt:
+            yield utxt
+
+    @staticmethod
+    def iter_decode_mmap(file_b, encoding=None, errors=None, chunk_size=None):
+        """
+        Same as |iter_decode|, but decode straight from the pages of regular
+        file |file_b| mapped into memory, without copying them into read
+        buffers first. The file may be larger than RAM.
+
+        Fall back to |iter_decode| if |file_b| can not be mapped, e.g. is a
+        pipe or is empty.
+        """
+        #/
+        encoding = encoding or 'utf-8'
+
+        errors = errors or 'strict'
+
+        chunk_size = chunk_size or SixyIO.CHUNK_SIZE
+
+        #/
+        import mmap
+
+        #/
+        try:
+            mmap_obj = mmap.mmap(file_b.fileno(), 0, access=mmap.ACCESS_READ)
+        except (AttributeError, ValueError, OSError, io.UnsupportedOperation):
+            ## An empty file can not be mapped. Neither can a pipe.
+            for utxt in SixyIO.iter_decode(file_b, encoding=encoding, errors=errors, chunk_size=chunk_size):
+                yield utxt
+
+            return
+
+        #/
+        try:
+            #/
+            if hasattr(mmap_obj, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mmap_obj.madvise(mmap.MADV_SEQUENTIAL)
+
+            #/
+            if encoding == SixyIO.ENCODING_AUTO:
+                encoding = SixyIO.detect_encoding(
+                    mmap_obj[:SixyIO.DETECT_SAMPLE_SIZE],
+                    is_final=len(mmap_obj) <= SixyIO.DETECT_SAMPLE_SIZE,
+                )
+
+            #/
+            ## Chunk ends may split a multi-byte character. The incremental
+            ##  decoder keeps the partial character until the next chunk.
+            decoder = SixyIO.make_decoder(encoding, errors)
+
+            prescan_on = SixyIO.ascii_prescan_on(encoding)
+
+            #/
+            mv = memoryview(mmap_obj)
+
+            try:
+                #/
+                size = len(mv)
+
+                pos = 0
+
+                while pos < size:
+                    #/
+                    chunk_mv = mv[pos:pos + chunk_size]
+
+                    try:
+                        utxt = SixyIO.decode_chunk(decoder, chunk_mv, prescan_on)
+                    finally:
+                        ## A traceback may keep the view alive. Release it so
+                        ##  that the map can be closed.
+                        chunk_mv.release()
+
+                    pos += chunk_size
+
+                    #/
+                    if utxt:
+                        yield utxt
+            finally:
+                ## The map can not be closed while exported to a memoryview.
+                mv.release()
+
+            #/
+            utxt = SixyIO.decode_chunk(decoder, b'', final=True)
+
+            if utxt:
+                yield utxt
+        finally:
+            mmap_obj.close()
+
+    @staticmethod
+    def iter_encode(utxt_s, encoding=None, errors=None):
+        #/
+        encoding = encoding or 'utf-8'
+
+        errors = errors or 'strict'
+
+        #/
+        encoder = SixyIO.make_encoder(encoding, errors)
+
+        #/
+        for utxt in utxt_s:
+            #/
+            btxt = encoder.encode(utxt)
+
+            if btxt:
+                yield btxt
+
+        #/
+        btxt = encoder.encode('', True)
+
+        if btxt:
+            yield btxt
+
+    @staticmethod
+    def iter_transcode(file_b, from_encoding, to_encoding, errors=None, chunk_size=None):
+        """
+        Read bytes in |from_encoding| from binary file object |file_b|, and
+        yield them re-encoded in |to_encoding|, chunk by chunk.
+        """
+        #/
+        utxt_s = SixyIO.iter_decode(file_b, encoding=from_encoding, errors=errors, chunk_size=chunk_size)
+
+        #/
+        return SixyIO.iter_encode(utxt_s, encoding=to_encoding, errors=errors)
+
+    @staticmethod
+    def iter_validate(file_b, encoding=None, chunk_size=None):
+        """
+        Yield bytes chunks read from binary file object |file_b| unchanged,
+        after checking that they are valid in |encoding|.
+        Raise UnicodeDecodeError on invalid data.
+        """
+        #/
+        encoding = encoding or 'utf-8'
+
+        chunk_size = chunk_size or SixyIO.CHUNK_SIZE
+
+        #/
+        read_b = getattr(file_b, 'read1', None) or file_b.read
+
+        #/
+        decoder = None
+
+        if SixyIO.codec_accepts_all_bytes(encoding):
+            ## No check needed.
+            check = None
+        elif SixyIO.codec_name(encoding) == 'ascii' and hasattr(bytes, 'isascii'):
+            #/
+            def check(btxt):
+                ## |decode| is only called to raise the error.
+                if not btxt.isascii():
+                    btxt.decode('ascii')
+        else:
+            #/
+            ## Decoded result is discarded. The incremental decoder checks
+            ##  multi-byte characters split across chunks.
+            decoder = SixyIO.make_decoder(encoding)
+
+            check = decoder.decode
+
+        #/
+        while True:
+            #/
+            btxt = read_b(chunk_size)
+
+            if not btxt:
+                break
+
+            #/
+            if check is not None:
+                check(btxt)
+
+            #/
+            yield btxt
+
+        #/
+        ## Raise if data ends with an incomplete character.
+        if decoder is not None:
+            decoder.decode(b'', True)
+
+    @staticmethod
+    def iter_read(file_b, chunk_size=None):
+        """
+        Yield bytes chunks of at most |chunk_size| bytes read from binary file
+        object |file_b|, as soon as they are available.
+        """
+        #/
+        chunk_size = chunk_size or SixyIO.CHUNK_SIZE
+
+        #/
+        read_b = getattr(file_b, 'read1', None) or file_b.read
+
+        #/
+        while True:
+            #/
+            btxt = read_b(chunk_size)
+
+            if not btxt:
+                break
+
+            #/
+            yield btxt
+
+    @staticmethod
+    def iter_records(txt_s, sep):
+        """
+        Split chunks from iterable |txt_s| at separator |sep| and yield the
+        records, without the separator. Chunks and |sep| are either all
+        unicode or all bytes.
+
+        A record may span many chunks. Its parts are joined once, when its
+        end is found, so long records cost linear time. Text after the last
+        separator is yielded as a last record if not empty.
+        """
+        #/
+        sep_len = len(sep)
+
+        assert sep_len > 0
+
+        #/
+        part_s = []
+        ## Parts of the record not ended yet.
+
+        #/
+        for txt in txt_s:
+            #/
+            if not txt:
+                continue
+
+            #/
+            ## A separator of several characters may span two chunks. Search
+            ##  again from the last characters of the previous chunk.
+            if part_s and sep_len > 1:
+                #/
+                last_part = part_s.pop()
+
+                txt = last_part[-(sep_len - 1):] + txt
+
+                last_part = last_part[:-(sep_len - 1)]
+
+                if last_part:
+                    part_s.append(last_part)
+
+            #/
+            start = 0
+
+            while True:
+                #/
+                end = txt.find(sep, start)
+
+                if end < 0:
+                    break
+
+                #/
+                if part_s:
+                    part_s.append(txt[start:end])
+
+                    yield txt[:0].join(part_s)
+
+                    part_s = []
+                else:
+                    yield txt[start:end]
+
+                #/
+                start = end + sep_len
+
+            #/
+            if start < len(txt):
+                part_s.append(txt[start:] if start else txt)
+
+        #/
+        if part_s:
+            yield part_s[0][:0].join(part_s)
+
+    RECORD_LEN_SIZE = 4
+    ## Size of the big-endian length prefix made by |frame_len|.
+
+    @staticmethod
+    def frame_len(btxt):
+        """
+        Prefix bytes record |btxt| with its length. See |iter_len_records|.
+        """
+        #/
+        return len(btxt).to_bytes(SixyIO.RECORD_LEN_SIZE, 'big') + btxt
+
+    @staticmethod
+    def iter_len_records(file_b):
+        """
+        Yield bytes records read from binary file object |file_b|, each
+        prefixed with its length by |frame_len|.
+
+        Raise EOFError if data ends inside a record.
+        """
+        #/
+        len_size = SixyIO.RECORD_LEN_SIZE
+
+        #/
+        while True:
+            #/
+            ## |read| of a buffered file waits for all bytes asked for, unless
+            ##  at end of file.
+            len_btxt = file_b.read(len_size)
+
+            if not len_btxt:
+                break
+
+            #/
+            if len(len_btxt) < len_size:
+                raise EOFError('Data ends inside a record length.')
+
+            #/
+            record_len = int.from_bytes(len_btxt, 'big')
+
+            btxt = file_b.read(record_len)
+
+            if len(btxt) < record_len:
+                raise EOFError('Data ends inside a record.')
+
+            #/
+            yield btxt
+
+    @staticmethod
+    def record_sep_is_byte_safe(sep, encoding):
+        """
+        Whether bytes in |encoding| can be split at unicode separator |sep|
+        encoded, without decoding them first.
+
+        True for separators of ASCII control characters and punctuation
+        below |@| in ASCII compatible encodings, because multi-byte
+        characters of e.g. |gbk| and |shift_jis| may have a second byte from
+        |@| on. True for any ASCII separator in |utf-8|.
+        """
+        #/
+        if encoding == SixyIO.ENCODING_AUTO \
+        or not SixyIO.codec_is_ascii_compatible(encoding):
+            return False
+
+        #/
+        if SixyIO.codec_name(encoding) == 'utf-8':
+            return all(ord(char) < 0x80 for char in sep)
+
+        #/
+        return all(ord(char) < 0x40 for char in sep)
+
+    @staticmethod
+    def iter_decode_records(btxt_s, sep, encoding=None, errors=None):
+        """
+        Decode bytes chunks from iterable |btxt_s| incrementally, and yield
+        unicode chunks that each end with separator |sep|, i.e. hold whole
+        records. Text after the last separator is yielded at the end.
+
+        A record may span many chunks. Its parts are joined once, when its
+        end is found, so long records cost linear time.
+        """
+        #/
+        encoding = encoding or 'utf-8'
+
+        sep_len = len(sep)
+
+        assert sep_len > 0
+
+        #/
+        decoder = SixyIO.make_decoder(encoding, errors)
+
+        prescan_on = SixyIO.ascii_prescan_on(encoding)
+
+        #/
+        part_s = []
+        ## Parts after the last separator found.
+
+        #/
+        for btxt in btxt_s:
+            #/
+            utxt = SixyIO.decode_chunk(decoder, btxt, prescan_on)
+
+            if not utxt:
+                continue
+
+            #/
+            ## A separator of several characters may span two chunks. Search
+            ##  again from the last characters of the parts.
+            if part_s and sep_len > 1:
+                #/
+                if len(part_s[-1]) < sep_len - 1:
+                    part_s = [''.join(part_s)]
+
+                #/
+                last_part = part_s.pop()
+
+                utxt = last_part[-(sep_len - 1):] + utxt
+
+                last_part = last_part[:-(sep_len - 1)]
+
+                if last_part:
+                    part_s.append(last_part)
+
+            #/
+            end = utxt.rfind(sep)
+
+            if end < 0:
+                part_s.append(utxt)
+
+                continue
+
+            #/
+            end += sep_len
+
+            if part_s:
+                part_s.append(utxt[:end])
+
+                yield ''.join(part_s)
+
+                part_s = []
+            else:
+                yield utxt[:end]
+
+            #/
+            if end < len(utxt):
+                part_s.append(utxt[end:])
+
+        #/
+        utxt = SixyIO.decode_chunk(decoder, b'', final=True)
+
+        if utxt:
+            part_s.append(utxt)
+
+        if part_s:
+            yield ''.join(part_s)
+
+    @staticmethod
+    def iter_read_records(file_b, sep, encoding=None, errors=None, chunk_size=None, queue_size=None):
+        """
+        Read bytes from binary file object |file_b| in a background thread,
+        and yield unicode chunks of whole records split by |sep|. See
+        |iter_decode_records| and |iter_prefetch|.
+        """
+        #/
+        if encoding == SixyIO.ENCODING_AUTO:
+            encoding, file_b = SixyIO.detect_stream_encoding(file_b)
+
+        #/
+        btxt_s = SixyIO.iter_prefetch(SixyIO.iter_read(file_b, chunk_size), queue_size)
+
+        #/
+        for utxt in SixyIO.iter_decode_records(btxt_s, sep, encoding=encoding, errors=errors):
+            yield utxt
+
+    @staticmethod
+    def iter_prefetch(item_s, queue_size=None):
+        """
+        Pull items from iterable |item_s| in a background thread, at most
+        |queue_size| items ahead of the caller, and yield them. An exception
+        raised by |item_s| is raised to the caller.
+
+        Reading from a file this way overlaps the reads with the work done on
+        the items.
+        """
+        #/
+        import threading
+
+        try:
+            import queue
+        except ImportError:
+            import Queue as queue
+
+        #/
+        item_queue = queue.Queue(queue_size or SixyIO.RECORD_QUEUE_SIZE)
+
+        stop_event = threading.Event()
+
+        end_item = object()
+
+        #/
+        def put(item):
+            #/
+            ## Give up if the caller stopped pulling.
+            while not stop_event.is_set():
+                try:
+                    item_queue.put(item, timeout=0.1)
+
+                    return True
+                except queue.Full:
+                    pass
+
+            return False
+
+        #/
+        def pull():
+            #/
+            try:
+                for item in item_s:
+                    if not put((item, None)):
+                        return
+            except Exception:
+                put((end_item, sys.exc_info()))
+            else:
+                put((end_item, None))
+
+        #/
+        thread = threading.Thread(target=pull)
+
+        ## Do not keep the program alive if the caller exits early.
+        thread.daemon = True
+
+        thread.start()
+
+        #/
+        try:
+            while True:
+                #/
+                item, exc_info = item_queue.get()
+
+                if item is end_item:
+                    break
+
+                #/
+                yield item
+
+            #/
+            if exc_info is not None:
+                raisex(exc_info[1], exc_info[2])
+        finally:
+            stop_event.set()
+
+    @staticmethod
+    def copy_fd(in_fd, out_fd):
+        """
+        Copy all data from |in_fd| to |out_fd| inside the kernel, using
+        |copy_file_range|, |sendfile|, or |splice|, whichever works for the
+        two file descriptors.
+
+        Return number of bytes copied, or None if none of them works. In that
+        case nothing has been copied.
+        """
+        #/
+        in_stat = os.fstat(in_fd)
+
+        ## |copy_file_range| and |sendfile| need a regular input file.
+        ## Files in e.g. /proc report size 0 and can not be copied this way.
+        in_is_file = stat.S_ISREG(in_stat.st_mode) and in_stat.st_size > 0
+
+        #/
+        count = 1 << 30
+
+        #/
+        for func_name in ('copy_file_range', 'sendfile', 'splice'):
+            #/
+            func = getattr(os, func_name, None)
+
+            if func is None:
+                continue
+
+            if func_name != 'splice' and not in_is_file:
+                continue
+
+            #/
+            total = 0
+
+            try:
+                while True:
+                    #/
+                    if func_name == 'sendfile':
+                        cnt = func(out_fd, in_fd, None, count)
+                    else:
+                        cnt = func(in_fd, out_fd, count)
+
+                    #/
+                    if not cnt:
+                        return total
+
+                    total += cnt
+            except OSError as e:
+                #/
+                ## Not supported for these file descriptors. Try the next one.
+                if total == 0 and e.errno in (
+                    errno.EINVAL, errno.EXDEV, errno.ENOSYS, errno.EBADF,
+                    errno.ESPIPE, errno.EOPNOTSUPP,
+                ):
+                    continue
+
+                raise
+
+        #/
+        return None
+
+    _detect_unlikely_regex_obj = None
+
+    @staticmethod
+    def _detect_unlikely_regex():
+        """
+        Regex matching characters unlikely in text: control characters other
+        than whitespace, C1 controls, private use characters, and the
+        replacement character. Wrong single-byte or multi-byte candidates
+        tend to give these.
+        """
+        #/
+        if SixyIO._detect_unlikely_regex_obj is None:
+            #/
+            ## Imported on use to keep import time low.
+            import re
+
+            SixyIO._detect_unlikely_regex_obj = re.compile(
+                '[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f\ue000-\uf8ff\ufffd]')
+
+        #/
+        return SixyIO._detect_unlikely_regex_obj
+
+    @staticmethod
+    def _decodes(btxt, encoding, is_final):
+        """
+        Return the decoded unicode if |btxt| is valid in |encoding|, else None.
+        If not |is_final|, a character cut at the end of |btxt| is allowed.
+        """
+        #/
+        try:
+            return SixyIO.make_decoder(encoding).decode(btxt, is_final)
+        except (UnicodeDecodeError, LookupError):
+            return None
+
+    @staticmethod
+    def detect_encodings(sample_btxt, candidate_s=None, is_final=False):
+        """
+        Return a list of encodings that |sample_btxt| may be in, most likely
+        first. Never empty.
+
+        sample_btxt: Bytes at the start of the data, e.g. at most
+            |DETECT_SAMPLE_SIZE| bytes.
+        candidate_s: Encodings tried if the sample has no BOM and is not
+            UTF-8. By default the locale encoding, then
+            |DETECT_FALLBACK_ENCODING_S|.
+        is_final: Whether the sample is the whole data. If not, a character
+            cut at the end of the sample is allowed.
+        """
+        #/
+        sample_btxt = bytes(sample_btxt)
+
+        sample_len = len(sample_btxt)
+
+        #/
+        if not sample_len:
+            return ['utf-8']
+
+        #/ 5mRd8Kv
+        for bom, encoding in SixyIO.DETECT_BOM_ENCODING_S:
+            if sample_btxt.startswith(bom):
+                return [encoding]
+
+        #/
+        res_s = []
+
+        #/ 7pWc2Ha
+        ## UTF-16 without BOM. Text in other encodings rarely has NUL bytes.
+        ##  In UTF-16 they come mostly from ASCII and Latin-1 characters, at
+        ##  odd positions in little endian, at even positions in big endian.
+        if sample_len >= 4:
+            #/
+            even_nul_count = sample_btxt[0::2].count(b'\0')
+
+            odd_nul_count = sample_btxt[1::2].count(b'\0')
+
+            #/
+            if (even_nul_count + odd_nul_count) * 10 >= sample_len // 2:
+                #/
+                if odd_nul_count > even_nul_count * 3:
+                    res_s.append('utf-16-le')
+                elif even_nul_count > odd_nul_count * 3:
+                    res_s.append('utf-16-be')
+
+            #/
+            res_s = [x for x in res_s if SixyIO._decodes(sample_btxt, x, is_final) is not None]
+
+        #/ 3xNh6Qe
+        ## Bytes outside ASCII. Deleting ASCII bytes is done in C.
+        non_ascii_count = len(sample_btxt.translate(None, SixyIO._DETECT_ASCII_BTXT))
+
+        #/
+        if non_ascii_count == 0:
+            #/
+            ## Pure ASCII sample. UTF-8 is the most likely superset for the
+            ##  rest of the data.
+            if 'utf-8' not in res_s:
+                res_s.append('utf-8')
+        #/
+        elif SixyIO._decodes(sample_btxt, 'utf-8', is_final) is not None:
+            res_s.append('utf-8')
+
+        #/ 9bTf4Zs
+        if candidate_s is None:
+            #/
+            candidate_s = list(SixyIO.DETECT_FALLBACK_ENCODING_S)
+
+            lce = SixyIO.LCE
+
+            if lce and SixyIO.encoding_is_valid(lce) and SixyIO.codec_name(lce) != 'utf-8':
+                candidate_s.insert(0, lce)
+
+        #/
+        ## Rank the candidates that decode the sample by the ratio of
+        ##  unlikely characters. Equal ratios keep the given order.
+        score_s = []
+
+        unlikely_regex = SixyIO._detect_unlikely_regex()
+
+        for index, candidate in enumerate(candidate_s):
+            #/
+            if candidate in res_s:
+                continue
+
+            #/
+            utxt = SixyIO._decodes(sample_btxt, candidate, is_final)
+
+            if utxt is None:
+                continue
+
+            #/
+            if utxt:
+                ratio = float(len(unlikely_regex.findall(utxt))) / len(utxt)
+            else:
+                ratio = 0.0
+
+            #/
+            score_s.append((ratio, index, candidate))
+
+        #/
+        score_s.sort()
+
+        res_s.extend(x[2] for x in score_s)
+
+        #/
+        if not res_s:
+            res_s.append('latin-1')
+
+        #/
+        return res_s
+
+    @staticmethod
+    def detect_encoding(sample_btxt, candidate_s=None, is_final=False):
+        """
+        Most likely encoding of |sample_btxt|. See |detect_encodings|.
+        """
+        return SixyIO.detect_encodings(sample_btxt, candidate_s=candidate_s, is_final=is_final)[0]
+
+    @staticmethod
+    def detect_stream_encoding(file_b, sample_size=None, candidate_s=None, wait=False):
+        """
+        Detect the encoding of binary file object |file_b| from a sample read
+        from it. Only the sample is read.
+
+        Return a tuple of the encoding, and a binary file object to read the
+        data from, including the sample. It is |file_b| rewound if seekable,
+        otherwise a |PrefixedReader|.
+
+        wait: If true, read until |sample_size| bytes or end of data. If
+            false, do only one read, so that a pipe with little data
+            available does not block.
+        """
+        #/
+        sample_size = sample_size or SixyIO.DETECT_SAMPLE_SIZE
+
+        #/
+        try:
+            start_pos = file_b.tell() if file_b.seekable() else None
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            start_pos = None
+
+        #/
+        read_b = getattr(file_b, 'read1', None) or file_b.read
+
+        #/
+        btxt_s = []
+
+        read_len = 0
+
+        is_final = False
+
+        while read_len < sample_size:
+            #/
+            btxt = read_b(sample_size - read_len)
+
+            if not btxt:
+                is_final = True
+
+                break
+
+            #/
+            btxt_s.append(btxt)
+
+            read_len += len(btxt)
+
+            #/
+            if not wait:
+                break
+
+        #/
+        sample_btxt = b''.join(btxt_s)
+
+        encoding = SixyIO.detect_encoding(sample_btxt, candidate_s=candidate_s, is_final=is_final)
+
+        #/
+        if start_pos is not None:
+            file_b.seek(start_pos)
+        else:
+            file_b = PrefixedReader(sample_btxt, file_b)
+
+        #/
+        return encoding, file_b
+
+    @staticmethod
+    def detect_file_encoding(filename, sample_size=None, candidate_s=None):
+        """
+        Detect the encoding of a file from a sample read from its start.
+        """
+        #/
+        with io.open(filename, 'rb') as file_b:
+            return SixyIO.detect_stream_encoding(
+                file_b,
+                sample_size=sample_size,
+                candidate_s=candidate_s,
+                wait=True,
+            )[0]
+
+    @staticmethod
+    def stdin_read(encoding=None, errors=None):
+        """
+        Read stdin to end and return the decoded unicode.
+        """
+        #/
+        encoding = encoding or SixyIO.STDIE
+
+        #/
+        buf = sys.stdin if SixyIO.IS_PY2 else sys.stdin.buffer
+
+        #/
+        ## Decoded as a whole by |to_u|, which uses the ASCII pre-scan.
+        return SixyIO.to_u(buf.read(), encoding=encoding, errors=errors)
+
+    @staticmethod
+    def stdin_iter(encoding=None, errors=None, chunk_size=None):
+        #/
+        encoding = encoding or SixyIO.STDIE
+
+        #/
+        buf = sys.stdin if SixyIO.IS_PY2 else sys.stdin.buffer
+
+        #/
+        return SixyIO.iter_decode(buf, encoding=encoding, errors=errors, chunk_size=chunk_size)
+
+    @staticmethod
+    def is_u(obj):
+        if SixyIO.IS_PY2:
+            unicode_cls = str
+        else:
+            unicode_cls = str
+        
+        return isinstance(obj, unicode_cls)
+    
+    @staticmethod
+    def to_u(obj, encoding=None, errors=None):
+        #/
+        encoding = encoding or 'utf-8'
+        
+        errors = errors or 'strict'
+        
+        #/
+        if isinstance(obj, SixyIO.UTXT_CLS):
+            res = obj
+        elif isinstance(obj, SixyIO.BTXT_CLS):
+            #/
+            if encoding == SixyIO.ENCODING_AUTO:
+                encoding = SixyIO.detect_encoding(
+                    obj[:SixyIO.DETECT_SAMPLE_SIZE],
+                    is_final=len(obj) <= SixyIO.DETECT_SAMPLE_SIZE,
+                )
+
+            #/
+            res = None
+
+            if SixyIO.ascii_prescan_on(encoding):
+                #/
+                res = SixyIO.ascii_decode(obj)
+
+                #/
+                prescan_stats = SixyIO._prescan_stats
+
+                if prescan_stats is not None:
+                    prescan_stats.add(1, len(obj), res is not None)
+
+            #/
+            if res is None:
+                res = SixyIO.UTXT_CLS(obj, encoding=encoding, errors=errors)
+        else:
+            res = SixyIO.UTXT_CLS(obj)
+        
+        return res
+        
+    @staticmethod
+    def to_u_safe(obj, encoding=None, errors=None):
+        #/
+        errors = errors or 'replace'
+        
+        #/
+        return SixyIO.to_u(obj, encoding=encoding, errors=errors)
+    
+    @staticmethod
+    def to_b(txt, encoding=None, errors=None):
+        #/
+        encoding = encoding or 'utf-8'
+        
+        #/
+        errors = errors or 'strict'
+        
+        #/
+        if isinstance(txt, SixyIO.UTXT_CLS):
+            res = txt.encode(encoding, errors)
+        elif isinstance(txt, SixyIO.BTXT_CLS):
+            res = txt
+        else:
+            assert False
+        
+        return res
+    
+    @staticmethod
+    def to_b_safe(txt, encoding=None, errors=None):
+        #/
+        errors = errors or 'replace'
+            
+        #/
+        return SixyIO.to_b(txt=txt, encoding=encoding, errors=errors)
+
+    @staticmethod
+    def _make_convert_funcs(encoding, errors, src_cls, to_b):
+        """
+        Return a function that converts one object of exact type |src_cls|,
+        and a function that converts a list of them, with |encoding| and
+        |errors| resolved once. Raise LookupError if either is unknown.
+        """
+        #/
+        info = SixyIO.codec_info(encoding)
+
+        codecs.lookup_error(errors)
+
+        #/
+        ## |str.encode| and |bytes.decode| have C fast paths for some codecs
+        ##  when given the canonical name. Other codecs would be looked up on
+        ##  each call, so call the codec's function directly instead.
+        if info.name in SixyIO.BUILTIN_FAST_CODEC_NAME_S:
+            #/
+            method = src_cls.encode if to_b else src_cls.decode
+
+            name = info.name
+
+            #/
+            def convert_one(obj):
+                return method(obj, name, errors)
+
+            def convert_list(obj_s):
+                return list(map(method, obj_s, itertools.repeat(name), itertools.repeat(errors)))
+        elif not to_b and SixyIO.ascii_prescan_on(encoding):
+            #/
+            func = info.decode
+
+            ascii_decode = SixyIO.ascii_decode
+
+            #/
+            def convert_one(obj):
+                #/
+                utxt = ascii_decode(obj)
+
+                #/
+                prescan_stats = SixyIO._prescan_stats
+
+                if prescan_stats is not None:
+                    prescan_stats.add(1, len(obj), utxt is not None)
+
+                #/
+                if utxt is not None:
+                    return utxt
+
+                #/
+                return func(obj, errors)[0]
+
+            def convert_list(obj_s):
+                #/
+                utxt_s = []
+
+                fast_count = 0
+
+                fast_byte_count = 0
+
+                #/
+                for obj in obj_s:
+                    #/
+                    utxt = ascii_decode(obj)
+
+                    if utxt is not None:
+                        fast_count += 1
+
+                        fast_byte_count += len(obj)
+                    else:
+                        utxt = func(obj, errors)[0]
+
+                    #/
+                    utxt_s.append(utxt)
+
+                #/
+                ## Counted once per list.
+                prescan_stats = SixyIO._prescan_stats
+
+                if prescan_stats is not None:
+                    prescan_stats.add_many(
+                        len(obj_s), sum(map(len, obj_s)), fast_count, fast_byte_count)
+
+                #/
+                return utxt_s
+        else:
+            #/
+            func = info.encode if to_b else info.decode
+
+            #/
+            def convert_one(obj):
+                return func(obj, errors)[0]
+
+            def convert_list(obj_s):
+                return [func(obj, errors)[0] for obj in obj_s]
+
+        #/
+        return convert_one, convert_list
+
+    @staticmethod
+    def to_u_many(obj_s, encoding=None, errors=None, lazy=False):
+        """
+        Batch version of |to_u|. Convert each object of iterable |obj_s|.
+
+        Return a list, or a generator if |lazy| is true.
+        """
+        #/
+        encoding = encoding or 'utf-8'
+
+        errors = errors or 'strict'
+
+        #/
+        decode, decode_list = SixyIO._make_convert_funcs(encoding, errors, SixyIO.BTXT_CLS, to_b=False)
+
+        #/
+        btxt_cls = SixyIO.BTXT_CLS
+
+        utxt_cls = SixyIO.UTXT_CLS
+
+        to_u = SixyIO.to_u
+
+        def convert(obj):
+            #/
+            obj_cls = type(obj)
+
+            #/
+            if obj_cls is btxt_cls:
+                return decode(obj)
+            elif obj_cls is utxt_cls:
+                return obj
+            else:
+                return to_u(obj, encoding=encoding, errors=errors)
+
+        #/
+        if lazy:
+            return (convert(obj) for obj in obj_s)
+
+        #/
+        if not isinstance(obj_s, (list, tuple)):
+            obj_s = list(obj_s)
+
+        #/ 6sWq1Xe
+        ## Fast paths for all bytes and all unicode. The type check runs in C.
+        cls_s = set(map(type, obj_s))
+
+        if cls_s == set([btxt_cls]):
+            return decode_list(obj_s)
+        elif cls_s == set([utxt_cls]):
+            return list(obj_s)
+
+        #/
+        return list(map(convert, obj_s))
+
+    @staticmethod
+    def to_b_many(txt_s, encoding=None, errors=None, lazy=False):
+        """
+        Batch version of |to_b|. Convert each object of iterable |txt_s|.
+
+        Return a list, or a generator if |lazy| is true.
+        """
+        #/
+        encoding = encoding or 'utf-8'
+
+        errors = errors or 'strict'
+
+        #/
+        encode, encode_list = SixyIO._make_convert_funcs(encoding, errors, SixyIO.UTXT_CLS, to_b=True)
+
+        #/
+        btxt_cls = SixyIO.BTXT_CLS
+
+        utxt_cls = SixyIO.UTXT_CLS
+
+        to_b = SixyIO.to_b
+
+        def convert(txt):
+            #/
+            txt_cls = type(txt)
+
+            #/
+            if txt_cls is utxt_cls:
+                return encode(txt)
+            elif txt_cls is btxt_cls:
+                return txt
+            else:
+                return to_b(txt, encoding=encoding, errors=errors)
+
+        #/
+        if lazy:
+            return (convert(txt) for txt in txt_s)
+
+        #/
+        if not isinstance(txt_s, (list, tuple)):
+            txt_s = list(txt_s)
+
+        #/ 2kPv9Rn
+        ## Fast paths for all unicode and all bytes. The type check runs in C.
+        cls_s = set(map(type, txt_s))
+
+        if cls_s == set([utxt_cls]):
+            return encode_list(txt_s)
+        elif cls_s == set([btxt_cls]):
+            return list(txt_s)
+
+        #/
+        return list(map(convert, txt_s))
+    
+    @staticmethod
+    def filename_esc(name, mode=None):
+        """
+        Convert characters not allowed in file names, e.g. |:| and |/|, in
+        unicode |name|.
+
+        mode: |FILENAME_ESC_EMPTY|, |FILENAME_ESC_SPACE|, or
+            |FILENAME_ESC_NOTATION|. By default |FILENAME_ESC_NOTATION|.
+            Raise ValueError if unknown.
+        """
+        #/
+        mode = mode or SixyIO.FILENAME_ESC_NOTATION
+
+        if mode not in SixyIO.FILENAME_ESC_MODE_S:
+            raise ValueError('Unknown file name escape mode |{}|.'.format(mode))
+
+        #/
+        ## Most names have nothing to convert.
+        if SixyIO.FILENAME_INVALID_CHAR_SET.isdisjoint(name):
+            return name
+
+        #/
+        if mode == SixyIO.FILENAME_ESC_NOTATION:
+            #/
+            ## |str.translate| takes a slow path when a character is
+            ##  converted to several ones. One |replace| per character present
+            ##  is faster.
+            for char, notation in SixyIO.FILENAME_ESC_NOTATION_PAIR_S:
+                if char in name:
+                    name = name.replace(char, notation)
+
+            #/
+            return name
+
+        #/
+        ## Invalid characters are ASCII and UTF-8 never uses ASCII bytes in a
+        ##  multi-byte sequence, so one |bytes.translate| pass over the UTF-8
+        ##  bytes does it. It is much faster than |str.translate|.
+        ## |surrogatepass| keeps lone surrogates from |os.fsdecode|.
+        return name.encode('utf-8', 'surrogatepass')\
+            .translate(*SixyIO.FILENAME_ESC_BTABLE_D[mode])\
+            .decode('utf-8', 'surrogatepass')
+
+    @staticmethod
+    def filename_esc_many(name_s, mode=None):
+        """
+        Batch version of |filename_esc|. Convert each unicode name of
+        iterable |name_s|. Return a list.
+
+        The names are joined by NUL, which can not be in a file name, and
+        converted in one call, so the cost per name is small.
+        """
+        #/
+        name_s = list(name_s)
+
+        #/
+        ## Called for no names too, so that |mode| is checked.
+        res_s = SixyIO.filename_esc('\0'.join(name_s), mode).split('\0')
+
+        #/
+        ## A name contains NUL, or there are no names.
+        if len(res_s) != len(name_s):
+            #/
+            res_s = [SixyIO.filename_esc(name, mode) for name in name_s]
+
+        #/
+        return res_s
+
+    @staticmethod
+    def to_str(obj, encoding=None, errors=None):
+        #/
+        if encoding is None:
+            encoding = 'utf-8'
+        
+        #/
+        if errors is None:
+            errors = 'strict'
+        
+        #/
+        if SixyIO.IS_PY2:
+            if isinstance(obj, str):
+                res = obj
+            elif isinstance(obj, str):
+                res = obj.decode(encoding, errors)
+            else:
+                res = str(obj)
+        else:
+            if isinstance(obj, str):
+                res = obj
+            else:
+                res = str(obj)
+        
+        return res
+    
+    @staticmethod
+    def to_str_safe(obj, encoding=None, errors=None):
+        #/
+        errors = errors or 'replace'
+            
+        #/
+        return SixyIO.to_str(obj=obj, encoding=encoding, errors=errors)
+        
+    @staticmethod
+    def cae_to_u(txt, encoding=None, errors=None):
+        #/
+        encoding = encoding or SixyIO.CAE
+        
+        #/
+        return SixyIO.to_u(txt, encoding=encoding, errors=errors)
+        
+    @staticmethod
+    def cae_to_u_safe(txt, encoding=None, errors=None):
+        #/
+        encoding = encoding or SixyIO.CAE
+        
+        errors = errors or 'replace'
+        
+        #/
+        return SixyIO.to_u(txt, encoding=encoding, errors=errors)
+        
+    @staticmethod
+    def fse_to_u(txt, encoding=None, errors=None):
+        #/
+        encoding = encoding or SixyIO.FSE
+        
+        #/
+        return SixyIO.to_u(txt, encoding=encoding, errors=errors)
+        
+    @staticmethod
+    def fse_to_u_safe(txt, encoding=None, errors=None):
+        #/
+        encoding = encoding or SixyIO.FSE
+        
+        errors = errors or 'replace'
+        
+        #/
+        return SixyIO.to_u(txt, encoding=encoding, errors=errors)
+
+    @staticmethod
+    def spce_to_b(txt, encoding=None, errors=None):
+        #/
+        encoding = encoding or SixyIO.SPCE
+        
+        #/
+        return SixyIO.to_b(txt, encoding=encoding, errors=errors)
+        
+    @staticmethod
+    def spce_to_b_safe(txt, encoding=None, errors=None):
+        #/
+        encoding = encoding or SixyIO.SPCE
+        
+        errors = errors or 'replace'
+        
+        #/
+        return SixyIO.to_b(txt, encoding=encoding, errors=errors)
+
+    @staticmethod
+    def spie_to_b(txt, encoding=None, errors=None):
+        #/
+        encoding = encoding or SixyIO.SPIE
+        
+        #/
+        return SixyIO.to_b(txt, encoding=encoding, errors=errors)
+        
+    @staticmethod
+    def spie_to_b_safe(txt, encoding=None, errors=None):
+        #/
+        encoding = encoding or SixyIO.SPIE
+        
+        errors = errors or 'replace'
+        
+        #/
+        return SixyIO.to_b(txt, encoding=encoding, errors=errors)
+    
+    @staticmethod
+    def spoe_to_u(txt, encoding=None, errors=None):
+        #/
+        encoding = encoding or SixyIO.SPOE
+        
+        #/
+        return SixyIO.to_u(txt, encoding=encoding, errors=errors)
+        
+    @staticmethod
+    def spoe_to_u_safe(txt, encoding=None, errors=None):
+        #/
+        encoding = encoding or SixyIO.SPOE
+        
+        errors = errors or 'replace'
+        
+        #/
+        return SixyIO.to_u(txt, encoding=encoding, errors=errors)
+    
+    @staticmethod
+    def spee_to_u(txt, encoding=None, errors=None):
+        #/
+        encoding = encoding or SixyIO.SPEE
+        
+        #/
+        return SixyIO.to_u(txt, encoding=encoding, errors=errors)
+        
+    @staticmethod
+    def spee_to_u_safe(txt, encoding=None, errors=None):
+        #/
+        encoding = encoding or SixyIO.SPEE
+        
+        errors = errors or 'replace'
+        
+        #/
+        return SixyIO.to_u(txt, encoding=encoding, errors=errors)
+    
+    @staticmethod
+    def format(fmt, *args, **kwargs):
+        #/
+        if SixyIO.DEBUG_ON:
+            assert SixyIO.is_u(fmt)
+        
+            if args:
+                for arg in args:
+                    assert SixyIO.is_u(arg)
+            
+            if kwargs:
+                for key, val in list(kwargs.items()):
+                    assert SixyIO.is_u(key)
+                    assert SixyIO.is_u(val)
+        
+        #/
+        txt = fmt.format(*args, **kwargs)
+        
+        return txt
+    
+    @staticmethod
+    def open(filename, mode, **kwargs):
+        #/
+        assert SixyIO.is_u(filename)
+        
+        #/
+        return codecs.open(filename, mode, **kwargs)
+
+    @staticmethod
+    def open_text(filename, mode, encoding, errors=None, newline='', buf_size=None, debug_on=False,
+        atomic=False, fsync=None):
+        """
+        Open a text file with the |io| engine. Return a |UnicodeTextFile|.
+
+        newline: Same as |io.open|'s. The default |''| does no translation,
+            like |codecs.open|.
+        buf_size: Size of the binary buffer, and of the chunk read at a time
+            by the text layer. By default |SixyIO.FILE_BUF_SIZE|.
+        atomic: Whether write via |AtomicFileWriter|. Mode must be |w|.
+        fsync: Fsync policy of |AtomicFileWriter|.
+        """
+        #/
+        assert SixyIO.is_u(filename)
+
+        #/
+        buf_size = buf_size or SixyIO.FILE_BUF_SIZE
+
+        #/
+        ## The text layer is added below, so open in binary mode.
+        mode_b = mode.replace('b', '').replace('t', '') + 'b'
+
+        if atomic:
+            file_b = SixyIO.open_atomic(filename, mode_b, fsync=fsync, buf_size=buf_size)
+        else:
+            file_b = io.open(filename, mode_b, buffering=buf_size)
+
+        #/
+        try:
+            file_obj = UnicodeTextFile(
+                file_b,
+                encoding=encoding,
+                errors=errors,
+                newline=newline,
+                debug_on=debug_on,
+            )
+        except Exception:
+            file_b.close()
+
+            raise
+
+        #/
+        ## Size of the chunk the text layer reads and decodes at a time.
+        file_obj._CHUNK_SIZE = buf_size
+
+        #/
+        return file_obj
+
+    @staticmethod
+    def is_same_file(file_b, filename):
+        """
+        Whether open file object |file_b| and path |filename| are the same
+        file. False if |filename| does not exist.
+        """
+        #/
+        try:
+            path_stat = os.stat(filename)
+        except EnvironmentError:
+            return False
+
+        #/
+        file_stat = os.fstat(file_b.fileno())
+
+        #/
+        return (file_stat.st_dev, file_stat.st_ino) == (path_stat.st_dev, path_stat.st_ino)
+
+    @staticmethod
+    def open_atomic(filename, mode='wb', fsync=None, buf_size=None):
+        """
+        Open |filename| for writing via a temporary file that is renamed into
+        place on close. Return an |AtomicFileWriter|.
+
+        mode: Only |wb| is supported. Appending can not be atomic this way.
+        """
+        #/
+        if mode.replace('b', '') != 'w':
+            raise ValueError('Unsupported mode of atomic writing: {}'.format(mode))
+
+        #/
+        return AtomicFileWriter(filename, fsync=fsync, buf_size=buf_size)
+
+    _which_d = {}
+    ## Map (program name, PATH) to absolute path found by |which|.
+
+    @staticmethod
+    def which(name):
+        """
+        Absolute path of program |name|, looked up in env var |PATH| once per
+        |PATH| value. Return None if not found.
+
+        name: Bytes or unicode.
+        """
+        #/
+        env_path = os.environ.get('PATH')
+
+        key = (name, env_path)
+
+        #/
+        try:
+            return SixyIO._which_d[key]
+        except KeyError:
+            pass
+
+        #/
+        import shutil
+
+        #/
+        if SixyIO.is_u(name):
+            path = shutil.which(name, path=env_path)
+        else:
+            ## |shutil.which| wants the path in the same type as the name.
+            path = shutil.which(name, path=None if env_path is None else os.fsencode(env_path))
+
+        #/
+        ## Not found is not memoized, in case the program is installed later.
+        if path is not None:
+            path = os.path.abspath(path)
+
+            SixyIO._which_d[key] = path
+
+        #/
+        return path
+
+    @staticmethod
+    def spawn(cmd, shell=False, **kwargs):
+        """
+        Start a subproc. Return a |subprocess.Popen| object.
+
+        cmd: Command. A string run by the shell if |shell| is true, otherwise
+            a list of arguments run directly without a shell.
+        kwargs: Passed to |subprocess.Popen|, e.g. |stdin| and |stdout|.
+
+        Without a shell, the program is resolved to an absolute path and fds
+        are not closed in the child, so that |subprocess| can use
+        |posix_spawn|, or vfork, instead of fork and exec. This saves the
+        shell's own start too. Fds Python opens are not inherited anyway.
+        """
+        #/
+        import subprocess
+
+        #/
+        if shell:
+            return subprocess.Popen(cmd, shell=True, **kwargs)
+
+        #/
+        if os.name == 'posix' and cmd and 'executable' not in kwargs:
+            #/
+            prog = cmd[0]
+
+            #/
+            ## A name without a directory is looked up in |PATH|.
+            if not os.path.dirname(prog):
+                #/
+                path = SixyIO.which(prog)
+
+                ## If not found, let |Popen| raise the usual error.
+                if path is not None:
+                    kwargs['executable'] = path
+
+        #/
+        kwargs.setdefault('close_fds', False)
+
+        #/
+        return subprocess.Popen(cmd, **kwargs)
+    
+class EncodedBufferWriter(object):
+    """
+    Gather unicode written with the same encoding and error handler, and
+    encode and write it to binary file object |file_b| once per batch of
+    about |buf_size| characters. Joining and encoding a batch costs far less
+    than encoding and writing each short piece.
+
+    An encode error is raised by the call that writes out the batch, after
+    writing out the text before the failing piece. The pieces after it are
+    kept.
+    """
+
+    def __init__(self, file_b, buf_size=None, line_buffered=None):
+        #/
+        self.file_b = file_b
+
+        self.buf_size = buf_size or SixyIO.WRITE_BUF_SIZE
+
+        #/
+        if line_buffered is None:
+            try:
+                line_buffered = file_b.isatty()
+            except Exception:
+                line_buffered = False
+
+        self.line_buffered = line_buffered
+
+        #/
+        self._utxt_s = []
+
+        self._size = 0
+
+        self._encoding = None
+
+        self._errors = None
+
+    def write(self, utxt, encoding, errors):
+        #/
+        ## A batch is encoded in one go, so it has one encoding.
+        if encoding != self._encoding or errors != self._errors:
+            #/
+            self._write_buf()
+
+            self._encoding = encoding
+
+            self._errors = errors
+
+        #/
+        self._utxt_s.append(utxt)
+
+        self._size += len(utxt)
+
+        #/
+        if self._size >= self.buf_size:
+            self._write_buf()
+
+            if self.line_buffered:
+                self.file_b.flush()
+        elif self.line_buffered and '\n' in utxt:
+            self.flush()
+
+    def write_b(self, btxt):
+        """
+        Write bytes after the unicode gathered so far.
+        """
+        #/
+        self._write_buf()
+
+        #/
+        self.file_b.write(btxt)
+
+        #/
+        if self.line_buffered and b'\n' in btxt:
+            self.file_b.flush()
+
+    def _write_buf(self):
+        #/
+        utxt_s = self._utxt_s
+
+        if not utxt_s:
+            return
+
+        #/
+        self._utxt_s = []
+
+        self._size = 0
+
+        #/
+        try:
+            btxt = ''.join(utxt_s).encode(self._encoding, self._errors)
+        except UnicodeEncodeError:
+            #/
+            ## Find the failing piece. Write out the pieces before it, and
+            ##  keep the pieces after it.
+            for index, utxt in enumerate(utxt_s):
+                try:
+                    utxt.encode(self._encoding, self._errors)
+                except UnicodeEncodeError:
+                    break
+
+            #/
+            self._utxt_s = utxt_s[index + 1:]
+
+            self._size = sum(len(x) for x in self._utxt_s)
+
+            #/
+            self.file_b.write(''.join(utxt_s[:index]).encode(self._encoding, self._errors))
+
+            #/
+            utxt_s[index].encode(self._encoding, self._errors)
+
+            ## Not reached unless the error depends on the neighbouring
+            ##  pieces, e.g. a surrogate pair split across two writes.
+            raise
+
+        #/
+        self.file_b.write(btxt)
+
+    def flush(self):
+        #/
+        self._write_buf()
+
+        #/
+        self.file_b.flush()
+
+class ThreadedWriter(object):
+    """
+    Write bytes to binary file object |file_b| in a background thread, with
+    at most |queue_size| writes waiting. Writing overlaps the caller's work.
+
+    An error raised by |file_b| is raised by the next |write|, |flush|, or
+    |close|. Writes after the error are dropped.
+    """
+
+    def __init__(self, file_b, queue_size=None):
+        #/
+        import threading
+
+        try:
+            import queue
+        except ImportError:
+            import Queue as queue
+
+        #/
+        self.file_b = file_b
+
+        self.exc_info = None
+
+        #/
+        self._queue = queue.Queue(queue_size or SixyIO.RECORD_QUEUE_SIZE)
+
+        self._abort_on = False
+
+        #/
+        self._thread = threading.Thread(target=self._run)
+
+        ## Do not keep the program alive if the main thread exits early.
+        self._thread.daemon = True
+
+        self._thread.start()
+
+    _FLUSH = object()
+
+    _END = object()
+
+    def _run(self):
+        #/
+        while True:
+            #/
+            btxt = self._queue.get()
+
+            if btxt is ThreadedWriter._END:
+                break
+
+            #/
+            ## Keep taking items after an error, so the caller never blocks.
+            if self.exc_info is not None or self._abort_on:
+                continue
+
+            #/
+            try:
+                if btxt is ThreadedWriter._FLUSH:
+                    self.file_b.flush()
+                else:
+                    self.file_b.write(btxt)
+            except Exception:
+                self.exc_info = sys.exc_info()
+
+    def _raise_if_err(self):
+        #/
+        exc_info = self.exc_info
+
+        if exc_info is not None:
+            raisex(exc_info[1], exc_info[2])
+
+    def write(self, btxt):
+        #/
+        self._raise_if_err()
+
+        #/
+        self._queue.put(btxt)
+
+    def flush(self):
+        """
+        Flush |file_b| after the writes waiting. Does not wait for them.
+        """
+        #/
+        self._raise_if_err()
+
+        #/
+        self._queue.put(ThreadedWriter._FLUSH)
+
+    def close(self, abort=False):
+        """
+        Wait for the writes waiting, and stop the thread. |file_b| is not
+        closed. If |abort| is true, drop the writes waiting instead, and do
+        not raise.
+        """
+        #/
+        if self._thread is None:
+            return
+
+        #/
+        if abort:
+            self._abort_on = True
+
+        #/
+        self._queue.put(ThreadedWriter._END)
+
+        self._thread.join()
+
+        self._thread = None
+
+        #/
+        if not abort:
+            self._raise_if_err()
+
+class PrefixedReader(object):
+    """
+    Binary reader that returns bytes |prefix_btxt| first, then reads on from
+    binary file object |file_b|. Puts back a sample read from input that can
+    not seek, e.g. a pipe.
+
+    Has no |fileno|, so that callers do not read |file_b| directly and skip
+    the prefix.
+    """
+
+    def __init__(self, prefix_btxt, file_b):
+        #/
+        self.file_b = file_b
+
+        #/
+        self._prefix_btxt = prefix_btxt
+
+        self._pos = 0
+
+    def _read_prefix(self, size):
+        #/
+        prefix_len = len(self._prefix_btxt)
+
+        #/
+        if self._pos >= prefix_len:
+            return b''
+
+        #/
+        if size is None or size < 0:
+            end_pos = prefix_len
+        else:
+            end_pos = min(prefix_len, self._pos + size)
+
+        #/
+        btxt = self._prefix_btxt[self._pos:end_pos]
+
+        self._pos = end_pos
+
+        #/
+        ## Free the prefix once used up.
+        if end_pos == prefix_len:
+            self._prefix_btxt = b''
+
+            self._pos = 0
+
+        #/
+        return btxt
+
+    def read(self, size=-1):
+        #/
+        btxt = self._read_prefix(size)
+
+        #/
+        if size is None or size < 0:
+            return btxt + self.file_b.read()
+
+        #/
+        if len(btxt) < size:
+            btxt += self.file_b.read(size - len(btxt))
+
+        #/
+        return btxt
+
+    def read1(self, size=-1):
+        #/
+        btxt = self._read_prefix(size)
+
+        if btxt:
+            return btxt
+
+        #/
+        read_b = getattr(self.file_b, 'read1', None) or self.file_b.read
+
+        return read_b(size)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return False
+
+    @property
+    def closed(self):
+        return self.file_b.closed
+
+    def close(self):
+        self.file_b.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+class AtomicFileWriter(object):
+    """
+    Binary output file that writes to a temporary file in the directory of
+    |filename|, then on |close| fsyncs it as |fsync| says and renames it to
+    |filename|. Readers see either the old file or the whole new one, never
+    a partial one, without locks.
+
+    Writes are buffered in |buf_size| bytes, and fsync is done once per
+    file, at |close|.
+
+    If the |with| block raises, or |abort| is called, the temporary file is
+    removed and |filename| is untouched. A file not closed, e.g. on a crash,
+    is not renamed.
+
+    If |filename| is a symlink, the file it points to is replaced and the
+    link is kept, same as writing through the link.
+
+    Create via |SixyIO.open_atomic|.
+    """
+
+    mode = 'wb'
+
+    def __init__(self, filename, fsync=None, buf_size=None):
+        #/
+        fsync = fsync or SixyIO.ATOMIC_FSYNC
+
+        if fsync not in SixyIO.FSYNC_POLICY_S:
+            raise ValueError('Unknown fsync policy: {}'.format(fsync))
+
+        #/
+        self.name = filename
+
+        self.fsync = fsync
+
+        #/
+        self._path = os.path.realpath(filename)
+
+        #/
+        dir_path, file_name = os.path.split(self._path)
+
+        self._dir_path = dir_path or os.curdir
+
+        #/
+        ## Keep the mode of an existing file. Otherwise the umask applies,
+        ##  same as |io.open|, because the file is created with mode 0666.
+        try:
+            self._st_mode = stat.S_IMODE(os.stat(self._path).st_mode)
+        except OSError:
+            self._st_mode = None
+
+        #/
+        ## Hidden, with a random part, so that it does not clash with another
+        ##  writer of the same file.
+        while True:
+            #/
+            self._tmp_path = os.path.join(
+                dir_path,
+                '.{}.{}.tmp'.format(file_name, SixyIO.to_u(codecs.encode(os.urandom(6), 'hex'), 'ascii')),
+            )
+
+            #/
+            try:
+                fd = os.open(
+                    self._tmp_path,
+                    os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0),
+                    0o666,
+                )
+            except OSError as e:
+                if e.errno == errno.EEXIST:
+                    continue
+
+                raise
+
+            #/
+            break
+
+        #/
+        try:
+            #/
+            if self._st_mode is not None and hasattr(os, 'fchmod'):
+                os.fchmod(fd, self._st_mode)
+
+            #/
+            self.file = io.open(fd, 'wb', buffering=buf_size or SixyIO.FILE_BUF_SIZE)
+        except Exception:
+            #/
+            os.close(fd)
+
+            self._remove_tmp()
+
+            raise
+
+        #/
+        self._done = False
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+    @property
+    def closed(self):
+        return self._done
+
+    def readable(self):
+        return False
+
+    def writable(self):
+        return True
+
+    def write(self, btxt):
+        return self.file.write(btxt)
+
+    def _remove_tmp(self):
+        #/
+        try:
+            os.remove(self._tmp_path)
+        except OSError:
+            pass
+
+    def close(self):
+        """
+        Flush, fsync as |self.fsync| says, and rename into place. Nothing is
+        done if already closed or aborted.
+        """
+        #/
+        if self._done:
+            return
+
+        self._done = True
+
+        #/
+        try:
+            #/
+            try:
+                #/
+                self.file.flush()
+
+                #/
+                if self.fsync != SixyIO.FSYNC_NONE:
+                    os.fsync(self.file.fileno())
+            finally:
+                self.file.close()
+
+            #/
+            os.replace(self._tmp_path, self._path)
+        except Exception:
+            #/
+            self._remove_tmp()
+
+            raise
+
+        #/
+        ## Make the rename itself durable. Directories can not be opened on
+        ##  Windows, where |os.replace| is durable already.
+        if self.fsync == SixyIO.FSYNC_FILE_DIR and os.name != 'nt':
+            #/
+            dir_fd = os.open(self._dir_path, os.O_RDONLY)
+
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+
+    def abort(self):
+        """
+        Discard the data written and remove the temporary file.
+        """
+        #/
+        if self._done:
+            return
+
+        self._done = True
+
+        #/
+        try:
+            self.file.close()
+        except Exception:
+            ## E.g. flushing the buffer to a full disk fails.
+            pass
+
+        #/
+        self._remove_tmp()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *args):
+        #/
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+class FileForceWriteUnicodeWrapper(object):
+    
+    def __init__(self, file_obj, debug_on):
+        self.file = file_obj
+        self.debug_on = debug_on
+                
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+    
+    def __enter__(self, *args, **kwargs):
+        """
+        __enter__ is special that __getattr__ does not cover
+        """
+        return self.file.__enter__(*args, **kwargs)
+
+    def __exit__(self, *args, **kwargs):
+        """
+        __exit__ is special that __getattr__ does not cover
+        """
+        #/
+        ## Do not rename a partial file into place.
+        if args and args[0] is not None:
+            abort = getattr(getattr(self.file, 'stream', None), 'abort', None)
+
+            if abort is not None:
+                abort()
+
+        #/
+        return self.file.__exit__(*args, **kwargs)
+     
+    def write(self, txt):
         #/
         if self.debug_on:
             assert SixyIO.is_u(txt)
         
         #/
-        return self.file.write(txt)
-     
-    def write_fmt(self, fmt, *args, **kwargs):
+        return self.file.write(txt)
+     
+    def write_fmt(self, fmt, *args, **kwargs):
+        #/
+        if self.debug_on:
+            assert SixyIO.is_u(fmt)
+        
+            if args:
+                for arg in args:
+                    assert SixyIO.is_u(arg)
+            
+            if kwargs:
+                for key, val in list(kwargs.items()):
+                    assert SixyIO.is_u(key)
+                    assert SixyIO.is_u(val)
+                    
+        #/
+        if not args and not kwargs:
+            txt = fmt
+        else:
+            txt = fmt.format(*args, **kwargs)
+        
+        #/
+        return self.file.write(txt)
+
+class UnicodeTextFile(io.TextIOWrapper):
+    """
+    Text file of the |io| engine. Reading and writing are done by the C
+    implemented |io.TextIOWrapper|, which accepts unicode only on write.
+
+    Create via |SixyIO.open_text|.
+    """
+
+    def __init__(self, file_b, encoding, errors=None, newline='', debug_on=False):
+        #/
+        io.TextIOWrapper.__init__(self, file_b, encoding=encoding, errors=errors, newline=newline)
+
+        #/
+        self.debug_on = debug_on
+
+    def abort(self):
+        """
+        Discard the data written, if the binary file is an
+        |AtomicFileWriter|. Otherwise do nothing.
+        """
+        #/
+        abort = getattr(self.buffer, 'abort', None)
+
+        if abort is not None:
+            abort()
+
+    def __exit__(self, exc_type, *args):
+        #/
+        ## Do not rename a partial file into place.
+        if exc_type is not None:
+            self.abort()
+
+        #/
+        return io.TextIOWrapper.__exit__(self, exc_type, *args)
+
+    def write_fmt(self, fmt, *args, **kwargs):
+        #/
+        if self.debug_on:
+            assert SixyIO.is_u(fmt)
+        
+            if args:
+                for arg in args:
+                    assert SixyIO.is_u(arg)
+            
+            if kwargs:
+                for key, val in list(kwargs.items()):
+                    assert SixyIO.is_u(key)
+                    assert SixyIO.is_u(val)
+                    
+        #/
+        if not args and not kwargs:
+            txt = fmt
+        else:
+            txt = fmt.format(*args, **kwargs)
+        
+        #/
+        return self.write(txt)
+    
+class SubprocPump(object):
+    """
+    Feed a subproc's stdin and drain its stderr in background threads, so that
+    the caller can read its stdout at the same time without deadlock.
+    Data is moved in chunks so memory use stays bounded.
+    """
+
+    def __init__(self, proc_obj, chunk_size=None):
+        #/
+        self.proc = proc_obj
+
+        self.chunk_size = chunk_size or SixyIO.CHUNK_SIZE
+
+        #/
+        self.stdin_exc_info = None
+        ## Set if feeding stdin failed for a reason other than broken pipe.
+
+        self.stderr_exc_info = None
+        ## Set if the stderr consumer raised.
+
+        #/
+        self._thread_s = []
+
+    def start(self, stdin_btxt_s=None, stderr_consume=None):
+        """
+        stdin_btxt_s: Iterable of bytes chunks to send to the subproc's stdin.
+        stderr_consume: Function called with the subproc's stderr file object,
+            in the stderr thread. Anything it leaves unread is discarded.
+        """
+        #/
+        if self.proc.stdin is not None:
+            self._start_thread(self._feed_stdin, stdin_btxt_s or ())
+
+        #/
+        if self.proc.stderr is not None:
+            self._start_thread(self._drain_stderr, stderr_consume)
+
+    def _start_thread(self, func, *args):
+        #/
+        import threading
+
+        thread = threading.Thread(target=func, args=args)
+
+        ## Do not keep the program alive if the main thread exits early.
+        thread.daemon = True
+
+        thread.start()
+
+        #/
+        self._thread_s.append(thread)
+
+    def _feed_stdin(self, btxt_s):
+        #/
+        stdin_file = self.proc.stdin
+
+        #/
+        try:
+            for btxt in btxt_s:
+                stdin_file.write(btxt)
+
+                stdin_file.flush()
+        except Exception as e:
+            #/
+            ## Broken pipe means the subproc exited without reading all input,
+            ##  e.g. |head|. This is not an error.
+            if not SixyIO.is_broken_pipe(e):
+                self.stdin_exc_info = sys.exc_info()
+        finally:
+            #/
+            try:
+                stdin_file.close()
+            except Exception:
+                pass
+
+    def _drain_stderr(self, consume):
+        #/
+        stderr_file = self.proc.stderr
+
+        #/
+        try:
+            if consume is not None:
+                consume(stderr_file)
+        except Exception:
+            self.stderr_exc_info = sys.exc_info()
+
+        #/
+        ## Discard what is left so the subproc never blocks on a full pipe.
+        try:
+            while stderr_file.read(self.chunk_size):
+                pass
+        except Exception:
+            pass
+
+    def wait(self):
+        #/
+        for thread in self._thread_s:
+            thread.join()
+
+        #/
+        return self.proc.wait()
+
+    def abort(self):
+        #/
+        try:
+            self.proc.kill()
+        except Exception:
+            pass
+
+        #/
+        return self.proc.wait()
+
+class SubprocPool(object):
+    """
+    Run a command in |worker_count| long-lived subprocs, send bytes records
+    to them, and read back one result record per record, in input order.
+
+    Each worker must write the result of a record, and flush it, before it
+    waits for the next record, e.g. |sed -u| or |awk| with |fflush()|. A
+    worker that waits for more input before writing a result stalls the
+    pool.
+
+    Records are framed by |sep|, or by a length prefix if |sep| is None. See
+    |SixyIO.frame_len|.
+
+    A worker takes the next record when its stdin can take more, so a slow
+    worker gets fewer records. The order the records are taken in is kept in
+    a queue, and results are read from the workers in the same order.
+    """
+
+    def __init__(self, cmd, worker_count, sep=None, shell=False, chunk_size=None):
+        """
+        cmd: Command, as taken by |SixyIO.spawn|.
+        sep: Separator in bytes, or None for length prefix framing.
+        """
+        #/
+        import threading
+
+        try:
+            import queue
+        except ImportError:
+            import Queue as queue
+
+        #/
+        assert worker_count > 0
+
+        #/
+        self.cmd = cmd
+
+        self.worker_count = worker_count
+
+        self.sep = sep
+
+        self.shell = shell
+
+        self.chunk_size = chunk_size or SixyIO.CHUNK_SIZE
+
+        #/
+        self.pump_s = []
+        ## |SubprocPump| of each worker.
+
+        self._result_iter_s = []
+        ## Iterator of result records of each worker.
+
+        #/
+        self._lock = threading.Lock()
+
+        self._order_queue = queue.Queue()
+        ## Index of the worker each record is sent to, in input order. None
+        ##  at end of input.
+
+        self._record_s = None
+
+        self._input_done = False
+
+    def start(self, record_s, stderr_consume=None, **kwargs):
+        """
+        Start the workers.
+
+        record_s: Iterator of bytes records. Pulled by the workers' stdin
+            threads. To report an error, handle it and stop iteration.
+        stderr_consume: Function called with the worker index and the
+            worker's stderr file object. See |SubprocPump.start|.
+        kwargs: Passed to |SixyIO.spawn|.
+
+        If starting a worker fails, the ones started are killed and the
+        error is raised.
+        """
+        #/
+        import subprocess
+
+        #/
+        self._record_s = record_s
+
+        #/
+        try:
+            for worker_idx in range(self.worker_count):
+                #/
+                proc_obj = SixyIO.spawn(self.cmd,
+                    shell=self.shell,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    **kwargs
+                )
+
+                #/
+                if self.sep is None:
+                    result_iter = SixyIO.iter_len_records(proc_obj.stdout)
+                else:
+                    result_iter = SixyIO.iter_records(
+                        SixyIO.iter_read(proc_obj.stdout, self.chunk_size), self.sep)
+
+                self._result_iter_s.append(result_iter)
+
+                #/
+                pump = SubprocPump(proc_obj, chunk_size=self.chunk_size)
+
+                self.pump_s.append(pump)
+
+                #/
+                pump.start(
+                    stdin_btxt_s=self._iter_feed(worker_idx),
+                    stderr_consume=None if stderr_consume is None
+                        else functools.partial(stderr_consume, worker_idx),
+                )
+        except Exception:
+            #/
+            self.abort()
+
+            raise
+
+    def _iter_feed(self, worker_idx):
+        """
+        Yield framed records for worker |worker_idx|. Run in the worker's
+        stdin thread.
+        """
+        #/
+        sep = self.sep
+
+        #/
+        while True:
+            #/
+            ## Taking a record and queueing the worker index is done under
+            ##  the lock, so the queue has the input order.
+            with self._lock:
+                #/
+                if self._input_done:
+                    return
+
+                #/
+                try:
+                    record = next(self._record_s)
+                except StopIteration:
+                    #/
+                    self._input_done = True
+
+                    self._order_queue.put(None)
+
+                    return
+
+                #/
+                self._order_queue.put(worker_idx)
+
+            #/
+            if sep is None:
+                yield SixyIO.frame_len(record)
+            else:
+                yield record + sep
+
+    def __iter__(self):
+        """
+        Yield result records in input order.
+
+        Raise EOFError if a worker exits before returning a result.
+        """
+        #/
+        while True:
+            #/
+            worker_idx = self._order_queue.get()
+
+            if worker_idx is None:
+                break
+
+            #/
+            try:
+                yield next(self._result_iter_s[worker_idx])
+            except StopIteration:
+                raise EOFError('Worker {} exited before returning a result.'.format(worker_idx + 1))
+
+    def pending_count(self):
+        """
+        Number of records sent whose results have not been read yet.
+        Approximate while the workers' stdin threads run.
+        """
+        #/
+        return self._order_queue.qsize()
+
+    def wait(self):
+        """
+        Wait for all workers to exit. Return their exit codes.
+        """
+        #/
+        return [pump.wait() for pump in self.pump_s]
+
+    def abort(self):
+        #/
+        ## Unblock the stdin threads waiting for the lock.
+        self._input_done = True
+
+        #/
+        for pump in self.pump_s:
+            pump.abort()
+
+class StageStats(object):
+    """
+    Wall time, CPU time, sizes in and out, and decode and encode error counts
+    of processing stages, e.g. |read|, |decode|, |subproc|, |encode|, and
+    |write|. Can be updated from several threads.
+
+    Error counts are of exceptions raised in a stage, plus errors handled
+    without raising, e.g. by |replace|, in streams whose |CodecErrStats| is
+    linked to the stage by |CodecErrStats.link_stage|.
+
+    Sizes are in bytes on the bytes side of a stage, and in characters on the
+    unicode side. CPU time is that of the thread doing the work.
+
+    Create via |SixyIOObj.stats_enable|.
+    """
+
+    FIELD_NAME_S = (
+        'call_count',
+        'wall_s',
+        'cpu_s',
+        'in_size',
+        'out_size',
+        'decode_err_count',
+        'encode_err_count',
+    )
+
+    def __init__(self):
+        #/
+        ## Imported on use to keep import time low.
+        import threading
+        import time
+
+        #/
+        self.stage_d = {}
+        ## Map stage name to dict of fields. In order of first use.
+
+        #/
+        self._lock = threading.Lock()
+
+        self._wall_time = time.perf_counter
+
+        self._cpu_time = getattr(time, 'thread_time', time.process_time)
+
+    def add(self, name, **kwargs):
+        """
+        Add field values in |kwargs| to stage |name|.
+        """
+        #/
+        with self._lock:
+            #/
+            stage = self.stage_d.get(name)
+
+            if stage is None:
+                #/
+                stage = dict.fromkeys(self.FIELD_NAME_S, 0)
+
+                stage['wall_s'] = 0.0
+
+                stage['cpu_s'] = 0.0
+
+                #/
+                self.stage_d[name] = stage
+
+            #/
+            for key, val in kwargs.items():
+                stage[key] += val
+
+    def add_err(self, name, e):
+        """
+        Count exception |e| in stage |name| if it is a decode or encode error.
+        """
+        self.add(name, **self._err_count_d(e))
+
+    @staticmethod
+    def _err_count_d(e):
+        #/
+        ## Counted already by a linked |CodecErrStats|.
+        if getattr(e, 'stage_counted_on', False):
+            return {}
+
+        #/
+        if isinstance(e, UnicodeDecodeError):
+            return {'decode_err_count': 1}
+        elif isinstance(e, UnicodeEncodeError):
+            return {'encode_err_count': 1}
+        else:
+            return {}
+
+    def wrap_func(self, name, func, in_on=True, out_on=True):
+        """
+        Return a function that calls |func| and adds the call to stage |name|.
+
+        in_on: Add the length of the first argument as size in.
+        out_on: Add the length of the result as size out.
+        """
+        #/
+        add = self.add
+
+        wall_time = self._wall_time
+
+        cpu_time = self._cpu_time
+
+        err_count_d = self._err_count_d
+
+        #/
+        def timed_func(*args, **kwargs):
+            #/
+            wall_start = wall_time()
+
+            cpu_start = cpu_time()
+
+            #/
+            try:
+                res = func(*args, **kwargs)
+            except Exception as e:
+                #/
+                add(name,
+                    call_count=1,
+                    wall_s=wall_time() - wall_start,
+                    cpu_s=cpu_time() - cpu_start,
+                    **err_count_d(e)
+                )
+
+                raise
+
+            #/
+            add(name,
+                call_count=1,
+                wall_s=wall_time() - wall_start,
+                cpu_s=cpu_time() - cpu_start,
+                in_size=len(args[0]) if in_on else 0,
+                out_size=len(res) if out_on and res is not None else 0,
+            )
+
+            #/
+            return res
+
+        #/
+        return timed_func
+
+    def wrap_iter(self, name, iterable):
+        """
+        Yield items of |iterable|. Add the time spent getting each item to
+        stage |name|, and the item's length as size out.
+        """
+        #/
+        add = self.add
+
+        wall_time = self._wall_time
+
+        cpu_time = self._cpu_time
+
+        #/
+        iterator = iter(iterable)
+
+        while True:
+            #/
+            wall_start = wall_time()
+
+            cpu_start = cpu_time()
+
+            #/
+            try:
+                item = next(iterator)
+            except StopIteration:
+                #/
+                add(name, wall_s=wall_time() - wall_start, cpu_s=cpu_time() - cpu_start)
+
+                return
+            except Exception as e:
+                #/
+                add(name,
+                    wall_s=wall_time() - wall_start,
+                    cpu_s=cpu_time() - cpu_start,
+                    **self._err_count_d(e)
+                )
+
+                raise
+
+            #/
+            add(name,
+                call_count=1,
+                wall_s=wall_time() - wall_start,
+                cpu_s=cpu_time() - cpu_start,
+                out_size=len(item),
+            )
+
+            #/
+            yield item
+
+    def wrap_reader(self, name, file_b, parent=None):
+        """
+        Return a binary reader over |file_b| that adds reads to stage |name|.
+
+        parent: Stage whose time includes the reads, e.g. |decode| when the
+            decoder reads the input. Read time is moved out of it, and bytes
+            read are added to its size in.
+        """
+        return StageStatsReader(self, name, file_b, parent)
+
+    def to_dict(self):
+        """
+        Return a dict mapping stage name to a dict of fields.
+        """
+        #/
+        with self._lock:
+            return dict((name, dict(stage)) for name, stage in self.stage_d.items())
+
+    def format(self):
+        """
+        Return the stats as a unicode table.
+        """
+        #/
+        line_s = [
+            '{:<16}{:>8}{:>10}{:>10}{:>14}{:>14}{:>9}{:>9}'.format(
+                'stage', 'calls', 'wall s', 'cpu s', 'in size', 'out size', 'dec err', 'enc err'),
+        ]
+
+        #/
+        for name, stage in self.to_dict().items():
+            line_s.append(
+                '{:<16}{call_count:>8}{wall_s:>10.4f}{cpu_s:>10.4f}{in_size:>14}{out_size:>14}'
+                '{decode_err_count:>9}{encode_err_count:>9}'.format(name, **stage))
+
+        #/
+        return '\n'.join(line_s) + '\n'
+
+class StageStatsReader(object):
+    """
+    Binary reader that adds reads from |file_b| to a stage of |StageStats|.
+    Create via |StageStats.wrap_reader|.
+
+    Has no |fileno|, so that callers read through it instead of using the
+    file descriptor directly.
+    """
+
+    def __init__(self, stats, name, file_b, parent=None):
+        #/
+        self.file_b = file_b
+
+        #/
+        self._stats = stats
+
+        self._name = name
+
+        self._parent = parent
+
+    def _read(self, read_b, size):
+        #/
+        stats = self._stats
+
+        #/
+        wall_start = stats._wall_time()
+
+        cpu_start = stats._cpu_time()
+
+        #/
+        btxt = read_b(size)
+
+        #/
+        wall_s = stats._wall_time() - wall_start
+
+        cpu_s = stats._cpu_time() - cpu_start
+
+        #/
+        stats.add(self._name, call_count=1, wall_s=wall_s, cpu_s=cpu_s, out_size=len(btxt))
+
+        if self._parent is not None:
+            stats.add(self._parent, wall_s=-wall_s, cpu_s=-cpu_s, in_size=len(btxt))
+
+        #/
+        return btxt
+
+    def read(self, size=-1):
+        return self._read(self.file_b.read, size)
+
+    def read1(self, size=-1):
+        #/
+        read_b = getattr(self.file_b, 'read1', None) or self.file_b.read
+
+        #/
+        return self._read(read_b, size)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return False
+
+    @property
+    def closed(self):
+        return self.file_b.closed
+
+    def close(self):
+        self.file_b.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+class PrescanStats(object):
+    """
+    Counts of chunks and bytes pre-scanned, and of those found all ASCII and
+    decoded on the fast path. Can be updated from several threads, e.g. a
+    |SubprocPump|'s and a worker pool's.
+
+    Create via |SixyIO.prescan_stats_enable|.
+    """
+
+    def __init__(self):
+        #/
+        import threading
+
+        #/
+        self._lock = threading.Lock()
+
+        #/
+        self.reset()
+
+    def add(self, chunk_count, byte_count, fast_on):
+        """
+        Count |chunk_count| chunks of |byte_count| bytes in total, all on the
+        fast path if |fast_on|.
+        """
+        #/
+        with self._lock:
+            #/
+            self.scan_chunk_count += chunk_count
+
+            self.scan_byte_count += byte_count
+
+            #/
+            if fast_on:
+                self.fast_chunk_count += chunk_count
+
+                self.fast_byte_count += byte_count
+
+    def add_many(self, chunk_count, byte_count, fast_chunk_count, fast_byte_count):
+        #/
+        with self._lock:
+            #/
+            self.scan_chunk_count += chunk_count
+
+            self.scan_byte_count += byte_count
+
+            self.fast_chunk_count += fast_chunk_count
+
+            self.fast_byte_count += fast_byte_count
+
+    def reset(self):
+        #/
+        with self._lock:
+            #/
+            self.scan_chunk_count = 0
+
+            self.scan_byte_count = 0
+
+            self.fast_chunk_count = 0
+
+            self.fast_byte_count = 0
+
+    def to_dict(self):
+        """
+        Return a dict of the counts, and |fast_ratio|, the share of scanned
+        bytes decoded on the fast path.
+        """
+        #/
+        with self._lock:
+            stat_d = {
+                'scan_chunk_count': self.scan_chunk_count,
+                'scan_byte_count': self.scan_byte_count,
+                'fast_chunk_count': self.fast_chunk_count,
+                'fast_byte_count': self.fast_byte_count,
+            }
+
+        #/
+        scan_byte_count = stat_d['scan_byte_count']
+
+        stat_d['fast_ratio'] = float(stat_d['fast_byte_count']) / scan_byte_count \
+            if scan_byte_count else 0.0
+
+        #/
+        return stat_d
+
+class CodecErrStats(object):
+    """
+    Count of decode errors of a stream, size of the bad bytes, and stream
+    offsets of the first |sample_size| errors. Can be updated from several
+    threads.
+
+    Errors are counted by the handlers of |SixyIO.count_errors| while a
+    decode runs in a scope of this object, i.e. via |call| or |wrap_iter|.
+
+    If linked by |link_stage|, errors are also counted in a stage of a
+    |StageStats|, including those the handler does not raise.
+
+    Create via |SixyIOObj.err_stats_enable|.
+    """
+
+    def __init__(self, name, sample_size=None):
+        #/
+        import threading
+
+        #/
+        self.name = name
+
+        self.sample_size = SixyIO.ERR_STATS_SAMPLE_SIZE if sample_size is None else sample_size
+
+        #/
+        self.err_count = 0
+
+        self.err_size = 0
+        ## Number of bad bytes, i.e. replaced by the error handler.
+
+        self.offset_s = []
+        ## Stream offsets of the first |sample_size| errors.
+
+        #/
+        self._lock = threading.Lock()
+
+        self._stage_stats = None
+
+        self._stage_name = None
+
+    def link_stage(self, stage_stats, stage_name):
+        """
+        Also count errors in stage |stage_name| of |StageStats| |stage_stats|.
+        """
+        #/
+        self._stage_stats = stage_stats
+
+        self._stage_name = stage_name
+
+    def add(self, exc, base=0):
+        """
+        Count error |exc|. |base| is the stream offset of |exc.object|.
+        """
+        #/
+        if self._stage_stats is not None:
+            #/
+            self._stage_stats.add(self._stage_name, decode_err_count=1)
+
+            #/
+            ## If the handler raises |exc|, the stage wrappers do not count
+            ##  it again.
+            exc.stage_counted_on = True
+
+        #/
+        with self._lock:
+            #/
+            self.err_count += 1
+
+            self.err_size += exc.end - exc.start
+
+            #/
+            if len(self.offset_s) < self.sample_size \
+            and isinstance(exc, UnicodeDecodeError):
+                self.offset_s.append(base + exc.start)
+
+    def _scope_call(self, scope, func, *args, **kwargs):
+        #/
+        local = SixyIO._err_stats_local
+
+        old_scope = getattr(local, 'scope', None)
+
+        local.scope = scope
+
+        try:
+            return func(*args, **kwargs)
+        finally:
+            local.scope = old_scope
+
+    def call(self, func, *args, **kwargs):
+        """
+        Call |func|, e.g. |SixyIO.to_u|, counting errors in this object.
+        Offsets are from the start of the data decoded by the call.
+        """
+        #/
+        ## List of this object, bytes fed to the decoder, and stream offset of
+        ##  the bytes the decoder works on. See |SixyIO.decode_chunk|.
+        scope = [self, 0, 0]
+
+        #/
+        return self._scope_call(scope, func, *args, **kwargs)
+
+    def wrap_iter(self, item_s):
+        """
+        Yield items of iterable |item_s|, e.g. |SixyIO.iter_decode|, counting
+        errors of the decodes run in pulling them. Offsets are from the start
+        of the stream decoded.
+        """
+        #/
+        scope = [self, 0, 0]
+
+        next_item = functools.partial(next, iter(item_s))
+
         #/
-        if self.debug_on:
-            assert SixyIO.is_u(fmt)
-        
-            if args:
-                for arg in args:
-                    assert SixyIO.is_u(arg)
-            
-            if kwargs:
-                for key, val in list(kwargs.items()):
-                    assert SixyIO.is_u(key)
-                    assert SixyIO.is_u(val)
-                    
+        while True:
+            #/
+            try:
+                item = self._scope_call(scope, next_item)
+            except StopIteration:
+                return
+
+            #/
+            yield item
+
+    def to_dict(self):
+        #/
+        with self._lock:
+            return {
+                'err_count': self.err_count,
+                'err_size': self.err_size,
+                'offset_s': list(self.offset_s),
+            }
+
+    def format(self):
+        """
+        Return the stats as a unicode line, without line end.
+        """
         #/
-        if not args and not kwargs:
-            txt = fmt
-        else:
-            txt = fmt.format(*args, **kwargs)
-        
+        stat_d = self.to_dict()
+
         #/
-        return self.file.write(txt)
-    
+        return '{:<16}{:>9}{:>12}  {}'.format(
+            self.name,
+            stat_d['err_count'],
+            stat_d['err_size'],
+            ' '.join(str(x) for x in stat_d['offset_s']),
+        )
+
 class SixyIOObj(object):
+
+    #/
+    PROFILE_ATTR_NAME_S = (
+        'stdee', 'stdee_utxt',
+        'stdoe', 'stdoe_utxt',
+        'stdie', 'stdie_utxt',
+        'cae', 'cae_utxt',
+        'fse', 'fse_utxt',
+        'ife', 'ife_utxt',
+        'ofe', 'ofe_utxt',
+        'spce', 'spce_utxt',
+        'spie', 'spie_utxt',
+        'spoe', 'spoe_utxt',
+        'spee', 'spee_utxt',
+    )
+    ## Attributes set by encoding validation in |__init__|.
+
+    _profile_d = {}
+    ## Map tuple of encodings to a dict of validated profile attributes.
+    ## Shared by all objects with identical configs.
+
+    stats = None
+    ## StageStats if enabled by |stats_enable|, otherwise None. Callers check
+    ##  it once, so disabled stats cost nothing on hot paths.
+
+    ERR_STATS_NAME_S = ('stdin', 'input_file', 'subproc_stdout', 'subproc_stderr')
+    ## Streams of |err_stats_enable|.
+
+    err_stats_d = None
+    ## Map stream name to |CodecErrStats| if enabled by |err_stats_enable|,
+    ##  otherwise None.
+
+    err_stats_errors = None
+    ## Error handler of streams with stats, if the caller gives none.
             
     def __init__(self,
         stdioe=None,
@@ -826,6 +4491,7 @@ class SixyIOObj(object):
         exit_code=None,
         tt=None,
         debug_on=False,
+        default_check_on=True,
     ):
         """
         stdie: Stdin encoding.
@@ -840,6 +4506,9 @@ class SixyIOObj(object):
         spoe: Subproc stdout encoding.
         spee: Subproc stderr encoding.
         exit_code: Exit code on init error. If none, raise exception instead of exit. 
+        default_check_on: Whether validate the encodings not given, which
+            default to |SixyIO|'s, e.g. |SixyIO.STDOE|. Those come from the
+            environment, where Python has looked them up already.
         """
         #/
         self.exit_code = exit_code
@@ -855,6 +4524,31 @@ class SixyIOObj(object):
             def tt(key):
                 return SixyIO.TT_D[key]
         
+        #/ 8qTz3Lm
+        ## Encodings have been validated before for an identical config.
+        ##  Reuse the validated profile.
+        profile_key = (
+            stdee or stdioe or SixyIO.STDEE,
+            stdoe or stdioe or SixyIO.STDOE,
+            stdie or stdioe or SixyIO.STDIE,
+            cae or SixyIO.CAE,
+            fse or SixyIO.FSE,
+            ife or SixyIO.IFE,
+            ofe or SixyIO.OFE,
+            spce or SixyIO.SPCE,
+            spie or SixyIO.SPIE,
+            spoe or SixyIO.SPOE,
+            spee or SixyIO.SPEE,
+            default_check_on,
+        )
+
+        profile = SixyIOObj._profile_d.get(profile_key)
+
+        if profile is not None:
+            self.__dict__.update(profile)
+
+            return
+
         #/
         self.stdee = stdee or stdioe or SixyIO.STDEE
             
@@ -863,7 +4557,7 @@ class SixyIOObj(object):
         self.stdee_utxt = SixyIO.to_u_safe(self.stdee, encoding='ascii')
         
         #/
-        if not SixyIO.encoding_is_valid(self.stdee):
+        if (default_check_on or stdee or stdioe) and not SixyIO.encoding_is_valid(self.stdee):
             #/ 6xW0Tns
             msg = SixyIO.format(tt(SixyIO.STDEE_NOT_VALID), self.stdee_utxt)
             
@@ -886,7 +4580,7 @@ class SixyIOObj(object):
         self.stdoe_utxt = SixyIO.to_u_safe(self.stdoe, encoding='ascii')
         
         #/
-        if not SixyIO.encoding_is_valid(self.stdoe):
+        if (default_check_on or stdoe or stdioe) and not SixyIO.encoding_is_valid(self.stdoe):
             #/
             msg = SixyIO.format(tt(SixyIO.STDOE_NOT_VALID), self.stdoe_utxt)
             
@@ -908,7 +4602,9 @@ class SixyIOObj(object):
         self.stdie_utxt = SixyIO.to_u_safe(self.stdie, encoding='ascii')
         
         #/
-        if not SixyIO.encoding_is_valid(self.stdie):
+        ## |auto| means detect. See |SixyIO.detect_encodings|.
+        if self.stdie != SixyIO.ENCODING_AUTO and (default_check_on or stdie or stdioe) \
+        and not SixyIO.encoding_is_valid(self.stdie):
             #/
             msg = SixyIO.format(tt(SixyIO.STDIE_NOT_VALID), self.stdie_utxt)
             
@@ -930,7 +4626,7 @@ class SixyIOObj(object):
         self.cae_utxt = SixyIO.to_u_safe(self.cae, encoding='ascii')
         
         #/
-        if not SixyIO.encoding_is_valid(self.cae):
+        if (default_check_on or cae) and not SixyIO.encoding_is_valid(self.cae):
             #/
             msg = SixyIO.format(tt(SixyIO.CAE_NOT_VALID), self.cae_utxt)
             
@@ -952,7 +4648,7 @@ class SixyIOObj(object):
         self.fse_utxt = SixyIO.to_u_safe(self.fse, encoding='ascii')
         
         #/
-        if not SixyIO.encoding_is_valid(self.fse):
+        if (default_check_on or fse) and not SixyIO.encoding_is_valid(self.fse):
             #/
             msg = SixyIO.format(tt(SixyIO.FSE_NOT_VALID), self.fse_utxt)
             
@@ -973,7 +4669,9 @@ class SixyIOObj(object):
         
         self.ife_utxt = SixyIO.to_u_safe(self.ife, encoding='ascii')
         
-        if not SixyIO.encoding_is_valid(self.ife):
+        ## |auto| means detect. See |SixyIO.detect_encodings|.
+        if self.ife != SixyIO.ENCODING_AUTO and (default_check_on or ife) \
+        and not SixyIO.encoding_is_valid(self.ife):
             #/
             msg = SixyIO.format(tt(SixyIO.IFE_NOT_VALID), self.ife_utxt)
             
@@ -995,7 +4693,7 @@ class SixyIOObj(object):
         self.ofe_utxt = SixyIO.to_u_safe(self.ofe, encoding='ascii')
         
         #/
-        if not SixyIO.encoding_is_valid(self.ofe):
+        if (default_check_on or ofe) and not SixyIO.encoding_is_valid(self.ofe):
             #/
             msg = SixyIO.format(tt(SixyIO.OFE_NOT_VALID), self.ofe_utxt)
             
@@ -1017,7 +4715,7 @@ class SixyIOObj(object):
         self.spce_utxt = SixyIO.to_u_safe(self.spce, encoding='ascii')
         
         #/
-        if not SixyIO.encoding_is_valid(self.spce):
+        if (default_check_on or spce) and not SixyIO.encoding_is_valid(self.spce):
             #/
             msg = SixyIO.format(tt(SixyIO.SPCE_NOT_VALID), self.spce_utxt)
             
@@ -1039,7 +4737,7 @@ class SixyIOObj(object):
         self.spie_utxt = SixyIO.to_u_safe(self.spie, encoding='ascii')
         
         #/
-        if not SixyIO.encoding_is_valid(self.spie):
+        if (default_check_on or spie) and not SixyIO.encoding_is_valid(self.spie):
             #/
             msg = SixyIO.format(tt(SixyIO.SPIE_NOT_VALID), self.spie_utxt)
             
@@ -1061,7 +4759,9 @@ class SixyIOObj(object):
         self.spoe_utxt = SixyIO.to_u_safe(self.spoe, encoding='ascii')
         
         #/
-        if not SixyIO.encoding_is_valid(self.spoe):
+        ## |auto| means detect. See |SixyIO.detect_encodings|.
+        if self.spoe != SixyIO.ENCODING_AUTO and (default_check_on or spoe) \
+        and not SixyIO.encoding_is_valid(self.spoe):
             #/
             msg = SixyIO.format(tt(SixyIO.SPOE_NOT_VALID), self.spoe_utxt)
             
@@ -1083,7 +4783,7 @@ class SixyIOObj(object):
         self.spee_utxt = SixyIO.to_u_safe(self.spee, encoding='ascii')
         
         #/
-        if not SixyIO.encoding_is_valid(self.spee):
+        if (default_check_on or spee) and not SixyIO.encoding_is_valid(self.spee):
             #/
             msg = SixyIO.format(tt(SixyIO.SPEE_NOT_VALID), self.spee_utxt)
             
@@ -1096,6 +4796,15 @@ class SixyIOObj(object):
             
             #/
             sys.exit(self.exit_code)
+
+        #/ 3mVc7Ko
+        profile_d = SixyIOObj._profile_d
+
+        if len(profile_d) >= SixyIO.CODEC_CACHE_SIZE:
+            profile_d.clear()
+
+        profile_d[profile_key] = dict(
+            (name, getattr(self, name)) for name in SixyIOObj.PROFILE_ATTR_NAME_S)
             
     def __str__(self):
         #/
@@ -1137,6 +4846,103 @@ class SixyIOObj(object):
        "spoe:", self.spoe_utxt,
        )
     
+    def aio(self):
+        """
+        Return asyncio helpers using this object's encodings.
+        Requires Python 3.7+.
+        """
+        #/
+        from .aoiksixyioaio import AioSixyIO
+
+        #/
+        return AioSixyIO(self)
+
+    def stats_enable(self):
+        """
+        Start recording per-stage stats. Return the |StageStats| object, also
+        set as |stats|.
+        """
+        #/
+        if self.stats is None:
+            self.stats = StageStats()
+
+        #/
+        return self.stats
+
+    def stats_disable(self):
+        #/
+        self.stats = None
+
+    def err_stats_enable(self, errors=None, sample_size=None, err_stats_d=None):
+        """
+        Start counting decode errors per stream: |stdin|, |input_file|,
+        |subproc_stdout|, and |subproc_stderr|. Return the dict mapping stream
+        name to |CodecErrStats|, also set as |err_stats_d|.
+
+        Errors are counted in decodes done by this object's methods for these
+        streams, e.g. |stdin_read|, |iter_in|, and |spoe_iter_u|, with
+        handlers of |SixyIO.count_errors|. Text files of |open_in| are not
+        counted.
+
+        errors: Error handler of these methods when the caller gives none,
+            e.g. |replace| to keep going on bad data. By default each
+            method's own default, e.g. |strict|, which raises after counting.
+        sample_size: Number of error offsets kept per stream.
+        err_stats_d: Dict of another object to count into.
+        """
+        #/
+        if err_stats_d is None:
+            err_stats_d = dict(
+                (name, CodecErrStats(name, sample_size=sample_size))
+                for name in SixyIOObj.ERR_STATS_NAME_S)
+
+        #/
+        ## Register the handlers up front, raising LookupError if unknown.
+        SixyIO.count_errors(errors)
+
+        #/
+        self.err_stats_d = err_stats_d
+
+        self.err_stats_errors = errors
+
+        #/
+        return err_stats_d
+
+    def err_stats_disable(self):
+        #/
+        self.err_stats_d = None
+
+        self.err_stats_errors = None
+
+    def err_stats_format(self):
+        """
+        Return the per-stream error stats as a unicode table.
+        """
+        #/
+        line_s = ['{:<16}{:>9}{:>12}  {}'.format('stream', 'errors', 'bad size', 'offsets')]
+
+        #/
+        for name in SixyIOObj.ERR_STATS_NAME_S:
+            line_s.append(self.err_stats_d[name].format())
+
+        #/
+        return '\n'.join(line_s) + '\n'
+
+    def _err_stats_get(self, name, errors, default_errors='strict'):
+        """
+        Return a tuple of the |CodecErrStats| of stream |name|, or None if
+        not enabled, and the error handler to use.
+        """
+        #/
+        if self.err_stats_d is None:
+            return None, errors
+
+        #/
+        errors = errors or self.err_stats_errors or default_errors
+
+        #/
+        return self.err_stats_d[name], SixyIO.count_errors(errors)
+
     def stdin_make_reader(self, encoding=None, errors=None):
         #/
         encoding = encoding or self.stdie
@@ -1144,6 +4950,63 @@ class SixyIOObj(object):
         #/
         return SixyIO.stdin_make_reader(encoding=encoding, errors=errors)
 
+    def stdin_read(self, encoding=None, errors=None):
+        #/
+        encoding = encoding or self.stdie
+
+        #/
+        err_stats, errors = self._err_stats_get('stdin', errors)
+
+        if err_stats is not None:
+            return err_stats.call(SixyIO.stdin_read, encoding=encoding, errors=errors)
+
+        #/
+        return SixyIO.stdin_read(encoding=encoding, errors=errors)
+
+    def stdin_iter(self, encoding=None, errors=None, chunk_size=None, file_b=None):
+        """
+        file_b: Binary file object to read instead of stdin, e.g. a wrapper
+            of it.
+        """
+        #/
+        encoding = encoding or self.stdie
+
+        file_b = file_b or SixyIO.stdin_get_b()
+
+        #/
+        err_stats, errors = self._err_stats_get('stdin', errors)
+
+        utxt_s = SixyIO.iter_decode(file_b, encoding=encoding, errors=errors, chunk_size=chunk_size)
+
+        #/
+        if err_stats is not None:
+            return err_stats.wrap_iter(utxt_s)
+
+        #/
+        return utxt_s
+
+    def stdin_iter_records(self, sep, encoding=None, errors=None, chunk_size=None, file_b=None):
+        """
+        Same as |stdin_iter|, but read in a thread, and yield chunks of whole
+        records split by |sep|. See |SixyIO.iter_read_records|.
+        """
+        #/
+        encoding = encoding or self.stdie
+
+        file_b = file_b or SixyIO.stdin_get_b()
+
+        #/
+        err_stats, errors = self._err_stats_get('stdin', errors)
+
+        utxt_s = SixyIO.iter_read_records(file_b, sep, encoding=encoding, errors=errors, chunk_size=chunk_size)
+
+        #/
+        if err_stats is not None:
+            return err_stats.wrap_iter(utxt_s)
+
+        #/
+        return utxt_s
+
     def stdout_write(self, utxt, encoding=None, errors=None):
         #/
         encoding = encoding or self.stdoe
@@ -1207,6 +5070,15 @@ class SixyIOObj(object):
         #/
         SixyIO.stdout_write_tb_safe(utxt, fmt=fmt, encoding=encoding)
     
+    def stdout_set_buffered(self, on=True, buf_size=None, line_buffered=None):
+        """
+        stdout is shared by the process, so this affects all objects.
+        """
+        SixyIO.stdout_set_buffered(on=on, buf_size=buf_size, line_buffered=line_buffered)
+
+    def stdout_flush(self):
+        SixyIO.stdout_flush()
+
     def stdout_make_writer(self, encoding=None, errors=None):
         #/
         encoding = encoding or self.stdoe
@@ -1277,6 +5149,15 @@ class SixyIOObj(object):
         #/
         SixyIO.stderr_write_tb_safe(utxt, fmt=fmt, encoding=encoding)
     
+    def stderr_set_buffered(self, on=True, buf_size=None, line_buffered=None):
+        """
+        stderr is shared by the process, so this affects all objects.
+        """
+        SixyIO.stderr_set_buffered(on=on, buf_size=buf_size, line_buffered=line_buffered)
+
+    def stderr_flush(self):
+        SixyIO.stderr_flush()
+
     def stderr_make_writer(self, encoding=None, errors=None):
         #/
         encoding = encoding or self.stdee
@@ -1340,10 +5221,42 @@ class SixyIOObj(object):
         #/
         return SixyIO.spie_to_b_safe(txt, encoding=encoding, errors=errors)
         
+    def ife_to_u(self, txt, encoding=None, errors=None):
+        #/
+        encoding = encoding or self.ife
+        
+        #/
+        err_stats, errors = self._err_stats_get('input_file', errors)
+
+        if err_stats is not None:
+            return err_stats.call(SixyIO.to_u, txt, encoding=encoding, errors=errors)
+
+        #/
+        return SixyIO.to_u(txt, encoding=encoding, errors=errors)
+        
+    def stdie_to_u(self, txt, encoding=None, errors=None):
+        #/
+        encoding = encoding or self.stdie
+        
+        #/
+        err_stats, errors = self._err_stats_get('stdin', errors)
+
+        if err_stats is not None:
+            return err_stats.call(SixyIO.to_u, txt, encoding=encoding, errors=errors)
+
+        #/
+        return SixyIO.to_u(txt, encoding=encoding, errors=errors)
+        
     def spoe_to_u(self, txt, encoding=None, errors=None):
         #/
         encoding = encoding or self.spoe
         
+        #/
+        err_stats, errors = self._err_stats_get('subproc_stdout', errors)
+
+        if err_stats is not None:
+            return err_stats.call(SixyIO.spoe_to_u, txt, encoding=encoding, errors=errors)
+
         #/
         return SixyIO.spoe_to_u(txt, encoding=encoding, errors=errors)
         
@@ -1351,13 +5264,41 @@ class SixyIOObj(object):
         #/
         encoding = encoding or self.spoe
         
+        #/
+        err_stats, errors = self._err_stats_get('subproc_stdout', errors, 'replace')
+
+        if err_stats is not None:
+            return err_stats.call(SixyIO.spoe_to_u_safe, txt, encoding=encoding, errors=errors)
+
         #/
         return SixyIO.spoe_to_u_safe(txt, encoding=encoding, errors=errors)
         
+    def spoe_iter_u(self, file_b, encoding=None, errors=None, chunk_size=None):
+        #/
+        encoding = encoding or self.spoe
+
+        #/
+        err_stats, errors = self._err_stats_get('subproc_stdout', errors)
+
+        utxt_s = SixyIO.iter_decode(file_b, encoding=encoding, errors=errors, chunk_size=chunk_size)
+
+        #/
+        if err_stats is not None:
+            return err_stats.wrap_iter(utxt_s)
+
+        #/
+        return utxt_s
+
     def spee_to_u(self, txt, encoding=None, errors=None):
         #/
         encoding = encoding or self.spee
         
+        #/
+        err_stats, errors = self._err_stats_get('subproc_stderr', errors)
+
+        if err_stats is not None:
+            return err_stats.call(SixyIO.spee_to_u, txt, encoding=encoding, errors=errors)
+
         #/
         return SixyIO.spee_to_u(txt, encoding=encoding, errors=errors)
         
@@ -1365,22 +5306,180 @@ class SixyIOObj(object):
         #/
         encoding = encoding or self.spee
         
+        #/
+        err_stats, errors = self._err_stats_get('subproc_stderr', errors, 'replace')
+
+        if err_stats is not None:
+            return err_stats.call(SixyIO.spee_to_u_safe, txt, encoding=encoding, errors=errors)
+
         #/
         return SixyIO.spee_to_u_safe(txt, encoding=encoding, errors=errors)
     
-    def open_in(self, filename, mode='r', **kwargs):
+    def spee_iter_u(self, file_b, encoding=None, errors=None, chunk_size=None):
+        #/
+        encoding = encoding or self.spee
+
+        #/
+        err_stats, errors = self._err_stats_get('subproc_stderr', errors)
+
+        utxt_s = SixyIO.iter_decode(file_b, encoding=encoding, errors=errors, chunk_size=chunk_size)
+
+        #/
+        if err_stats is not None:
+            return err_stats.wrap_iter(utxt_s)
+
+        #/
+        return utxt_s
+
+    def open_in(self, filename, mode='r', engine=None, **kwargs):
+        """
+        engine: |io| or |codecs|. By default |SixyIO.FILE_ENGINE|.
+            See |SixyIO.open_text| for the |io| engine's keyword arguments,
+            and |codecs.open| for the |codecs| engine's.
+        """
         #/
         assert SixyIO.is_u(filename)
+
+        #/
+        engine = engine or SixyIO.FILE_ENGINE
+
+        #/
+        encoding = self.ife
+
+        if encoding == SixyIO.ENCODING_AUTO:
+            encoding = SixyIO.detect_file_encoding(filename)
+
+        #/
+        if engine == 'io':
+            return SixyIO.open_text(filename, mode, encoding, debug_on=self.debug_on, **kwargs)
         
         #/
-        return codecs.open(filename, mode, self.ife, **kwargs)
-    
-    def open_out(self, filename, mode='w', **kwargs):
+        assert engine == 'codecs', engine
+
+        return codecs.open(filename, mode, encoding, **kwargs)
+
+    def open_in_b(self, filename):
+        #/
+        assert SixyIO.is_u(filename)
+
+        #/
+        return io.open(filename, 'rb')
+
+    def open_out_b(self, filename, mode='wb', atomic=False, fsync=None):
+        """
+        atomic: Whether write via |AtomicFileWriter|. See |SixyIO.open_atomic|.
+        fsync: Fsync policy of |AtomicFileWriter|.
+        """
+        #/
+        assert SixyIO.is_u(filename)
+
+        #/
+        if atomic:
+            return SixyIO.open_atomic(filename, mode, fsync=fsync)
+
+        #/
+        return io.open(filename, mode)
+
+    def iter_in(self, file_b, encoding=None, errors=None, chunk_size=None):
+        """
+        Yield unicode chunks decoded from binary input file object |file_b|,
+        e.g. one returned by |open_in_b|.
+        """
+        #/
+        encoding = encoding or self.ife
+
+        #/
+        err_stats, errors = self._err_stats_get('input_file', errors)
+
+        utxt_s = SixyIO.iter_decode(file_b, encoding=encoding, errors=errors, chunk_size=chunk_size)
+
+        #/
+        if err_stats is not None:
+            return err_stats.wrap_iter(utxt_s)
+
+        #/
+        return utxt_s
+
+    def iter_in_records(self, file_b, sep, encoding=None, errors=None, chunk_size=None):
+        """
+        Same as |iter_in|, but read in a thread, and yield chunks of whole
+        records split by |sep|. See |SixyIO.iter_read_records|.
+        """
+        #/
+        encoding = encoding or self.ife
+
+        #/
+        err_stats, errors = self._err_stats_get('input_file', errors)
+
+        utxt_s = SixyIO.iter_read_records(file_b, sep, encoding=encoding, errors=errors, chunk_size=chunk_size)
+
+        #/
+        if err_stats is not None:
+            return err_stats.wrap_iter(utxt_s)
+
+        #/
+        return utxt_s
+
+    def iter_in_mmap(self, file_b, encoding=None, errors=None, chunk_size=None):
+        """
+        Same as |iter_in|, but decode from the file mapped into memory.
+        See |SixyIO.iter_decode_mmap|.
+        """
+        #/
+        encoding = encoding or self.ife
+
+        #/
+        err_stats, errors = self._err_stats_get('input_file', errors)
+
+        utxt_s = SixyIO.iter_decode_mmap(file_b, encoding=encoding, errors=errors, chunk_size=chunk_size)
+
+        #/
+        if err_stats is not None:
+            return err_stats.wrap_iter(utxt_s)
+
+        #/
+        return utxt_s
+
+    def open_out(self, filename, mode='w', engine=None, atomic=False, fsync=None, **kwargs):
+        """
+        engine: |io| or |codecs|. By default |SixyIO.FILE_ENGINE|.
+            See |SixyIO.open_text| for the |io| engine's keyword arguments,
+            and |codecs.open| for the |codecs| engine's.
+        atomic: Whether write via |AtomicFileWriter|. See |SixyIO.open_atomic|.
+        fsync: Fsync policy of |AtomicFileWriter|.
+        """
         #/
         assert SixyIO.is_u(filename)
+
+        #/
+        engine = engine or SixyIO.FILE_ENGINE
+
+        #/
+        if engine == 'io':
+            return SixyIO.open_text(filename, mode, self.ofe, debug_on=self.debug_on,
+                atomic=atomic, fsync=fsync, **kwargs)
+
+        #/
+        assert engine == 'codecs', engine
         
         #/
-        file_obj = codecs.open(filename, mode, self.ofe, **kwargs)
+        if atomic:
+            #/
+            ## Same as |codecs.open| does, on top of the atomic file.
+            file_b = SixyIO.open_atomic(filename, mode.replace('b', '') + 'b', fsync=fsync)
+
+            codec_info = codecs.lookup(self.ofe)
+
+            file_obj = codecs.StreamReaderWriter(
+                file_b,
+                codec_info.streamreader,
+                codec_info.streamwriter,
+                **kwargs
+            )
+
+            file_obj.encoding = self.ofe
+        else:
+            file_obj = codecs.open(filename, mode, self.ofe, **kwargs)
         
         #/
         file_obj = FileForceWriteUnicodeWrapper(file_obj, debug_on=self.debug_on)
@@ -0,0 +1,327 @@
+# coding: utf-8
+"""
+File ID: 6fQeT2w
+
+Asyncio counterparts of SixyIOObj's stdio and subproc helpers.
+Requires Python 3.7+.
+"""
+
+import asyncio
+import os
+import sys
+
+from .aoiksixyio_ import SixyIO
+
+class AioDecodingReader(object):
+    """
+    Read bytes from an |asyncio.StreamReader| and decode them incrementally.
+    """
+
+    def __init__(self, stream_reader, encoding, errors=None, chunk_size=None):
+        #/
+        self.stream_reader = stream_reader
+
+        self.encoding = encoding
+
+        self.chunk_size = chunk_size or SixyIO.CHUNK_SIZE
+
+        self.errors = errors
+
+        #/
+        self._decoder = None
+
+        self._prescan_on = False
+
+        ## Made on the first chunk when |encoding| is |auto|.
+        if encoding != SixyIO.ENCODING_AUTO:
+            self._make_decoder()
+
+        self._eof = False
+
+    def _make_decoder(self):
+        #/
+        self._decoder = SixyIO.make_decoder(self.encoding, self.errors)
+
+        self._prescan_on = SixyIO.ascii_prescan_on(self.encoding)
+
+    async def read_chunk(self):
+        """
+        Return the next decoded chunk, or empty unicode at end of stream.
+        """
+        #/
+        while not self._eof:
+            #/
+            btxt = await self.stream_reader.read(self.chunk_size)
+
+            #/
+            if self._decoder is None:
+                self.encoding = SixyIO.detect_encoding(btxt, is_final=not btxt)
+
+                self._make_decoder()
+
+            #/
+            if not btxt:
+                self._eof = True
+
+                return self._decoder.decode(b'', True)
+
+            #/
+            utxt = SixyIO.decode_chunk(self._decoder, btxt, self._prescan_on)
+
+            ## A chunk holding only part of a multi-byte character decodes
+            ##  to empty. Read on instead of signaling end of stream.
+            if utxt:
+                return utxt
+
+        #/
+        return ''
+
+    async def read(self):
+        #/
+        utxt_s = []
+
+        #/
+        while True:
+            utxt = await self.read_chunk()
+
+            if not utxt:
+                break
+
+            utxt_s.append(utxt)
+
+        #/
+        return ''.join(utxt_s)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        #/
+        utxt = await self.read_chunk()
+
+        if not utxt:
+            raise StopAsyncIteration
+
+        return utxt
+
+class AioEncodingWriter(object):
+    """
+    Encode unicode incrementally and write to an |asyncio.StreamWriter|.
+    """
+
+    def __init__(self, stream_writer, encoding, errors=None, debug_on=False):
+        #/
+        self.stream_writer = stream_writer
+
+        self.encoding = encoding
+
+        self.debug_on = debug_on
+
+        #/
+        self._encoder = SixyIO.make_encoder(encoding, errors)
+
+    def write(self, utxt):
+        #/
+        if self.debug_on:
+            assert SixyIO.is_u(utxt)
+
+        #/
+        btxt = self._encoder.encode(utxt)
+
+        if btxt:
+            self.stream_writer.write(btxt)
+
+    async def drain(self):
+        await self.stream_writer.drain()
+
+    async def close(self):
+        #/
+        btxt = self._encoder.encode('', True)
+
+        if btxt:
+            self.stream_writer.write(btxt)
+
+        #/
+        await self.stream_writer.drain()
+
+        #/
+        self.stream_writer.close()
+
+        #/
+        if hasattr(self.stream_writer, 'wait_closed'):
+            await self.stream_writer.wait_closed()
+
+class AioSubproc(object):
+
+    def __init__(self, proc_obj, stdin, stdout, stderr):
+        #/
+        self.proc = proc_obj
+
+        self.stdin = stdin
+        ## AioEncodingWriter or None
+
+        self.stdout = stdout
+        ## AioDecodingReader or None
+
+        self.stderr = stderr
+        ## AioDecodingReader or None
+
+    async def wait(self):
+        return await self.proc.wait()
+
+class AioSixyIO(object):
+    """
+    Asyncio helpers using the encodings of a SixyIOObj.
+    Create via |SixyIOObj.aio|.
+    """
+
+    def __init__(self, sio):
+        self.sio = sio
+
+    async def stdin_make_reader(self, encoding=None, errors=None, chunk_size=None):
+        """
+        Stdin must be a pipe or a terminal. Regular files are not supported
+        by the event loop.
+        """
+        #/
+        encoding = encoding or self.sio.stdie
+
+        #/
+        loop = asyncio.get_running_loop()
+
+        stream_reader = asyncio.StreamReader()
+
+        await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(stream_reader), self._dup_file(sys.stdin, 'rb'))
+
+        #/
+        return AioDecodingReader(stream_reader, encoding, errors=errors, chunk_size=chunk_size)
+
+    @staticmethod
+    def _dup_file(file_obj, mode):
+        """
+        Unbuffered file object on a dup of |file_obj|'s file descriptor.
+        The pipe transport closes its file on close, which must not close
+        the process' stdio file descriptor.
+        """
+        return os.fdopen(os.dup(file_obj.fileno()), mode, buffering=0)
+
+    async def _make_pipe_writer(self, file_obj, encoding, errors):
+        #/
+        loop = asyncio.get_running_loop()
+
+        #/
+        ## Data written before via |file_obj| goes out first.
+        file_obj.flush()
+
+        #/
+        ## |StreamReaderProtocol| with an unused reader is how |asyncio|'s
+        ##  own |open_connection| builds a writer. It provides flow control
+        ##  for |drain| and the close waiter for |wait_closed|.
+        stream_reader = asyncio.StreamReader()
+
+        transport, protocol = await loop.connect_write_pipe(
+            lambda: asyncio.StreamReaderProtocol(stream_reader),
+            self._dup_file(file_obj, 'wb'))
+
+        stream_writer = asyncio.StreamWriter(transport, protocol, stream_reader, loop)
+
+        #/
+        return AioEncodingWriter(stream_writer, encoding, errors=errors, debug_on=self.sio.debug_on)
+
+    async def stdout_make_writer(self, encoding=None, errors=None):
+        #/
+        encoding = encoding or self.sio.stdoe
+
+        #/
+        return await self._make_pipe_writer(sys.stdout, encoding, errors)
+
+    async def stderr_make_writer(self, encoding=None, errors=None):
+        #/
+        encoding = encoding or self.sio.stdee
+
+        #/
+        return await self._make_pipe_writer(sys.stderr, encoding, errors)
+
+    async def _create_subproc(self, cmd_part_s, shell, kwargs):
+        #/
+        cmd_btxt_part_s = [self.sio.spce_to_b(x) for x in cmd_part_s]
+
+        #/
+        for name in ('stdin', 'stdout', 'stderr'):
+            kwargs.setdefault(name, asyncio.subprocess.PIPE)
+
+        #/
+        if shell:
+            proc_obj = await asyncio.create_subprocess_shell(
+                b' '.join(cmd_btxt_part_s), **kwargs)
+        else:
+            proc_obj = await asyncio.create_subprocess_exec(
+                *cmd_btxt_part_s, **kwargs)
+
+        #/
+        return proc_obj
+
+    async def open_subproc(self, cmd_part_s, shell=False, chunk_size=None, **kwargs):
+        """
+        Start a subproc with pipes for stdin, stdout, and stderr.
+
+        cmd_part_s: Unicode command parts. Encoded with |spce|.
+        shell: If true, |cmd_part_s| is joined by spaces and run by the shell.
+
+        Data written to the subproc's stdin is encoded with |spie|.
+        Data read from its stdout and stderr is decoded with |spoe| and |spee|.
+        """
+        #/
+        proc_obj = await self._create_subproc(cmd_part_s, shell, kwargs)
+
+        #/
+        stdin = None
+
+        if proc_obj.stdin is not None:
+            stdin = AioEncodingWriter(proc_obj.stdin, self.sio.spie, debug_on=self.sio.debug_on)
+
+        #/
+        stdout = None
+
+        if proc_obj.stdout is not None:
+            stdout = AioDecodingReader(proc_obj.stdout, self.sio.spoe, chunk_size=chunk_size)
+
+        #/
+        stderr = None
+
+        if proc_obj.stderr is not None:
+            stderr = AioDecodingReader(proc_obj.stderr, self.sio.spee, chunk_size=chunk_size)
+
+        #/
+        return AioSubproc(proc_obj, stdin=stdin, stdout=stdout, stderr=stderr)
+
+    async def run_subproc(self, cmd_part_s, input_utxt=None, shell=False, **kwargs):
+        """
+        Run a subproc to completion, like |subprocess.Popen.communicate|.
+
+        Return a tuple of exit code, stdout unicode, and stderr unicode.
+        """
+        #/
+        if self.sio.debug_on:
+            assert input_utxt is None or SixyIO.is_u(input_utxt)
+
+        #/
+        proc_obj = await self._create_subproc(cmd_part_s, shell, kwargs)
+
+        #/
+        input_btxt = None
+
+        if input_utxt is not None:
+            input_btxt = self.sio.spie_to_b(input_utxt)
+
+        #/
+        stdout_btxt, stderr_btxt = await proc_obj.communicate(input_btxt)
+
+        #/
+        stdout_utxt = self.sio.spoe_to_u(stdout_btxt) if stdout_btxt else ''
+
+        stderr_utxt = self.sio.spee_to_u(stderr_btxt) if stderr_btxt else ''
+
+        #/
+        return proc_obj.returncode, stdout_utxt, stderr_utxt
@@ -5,17 +5,57 @@ File ID: 2ePeUHV
 
 from aoiksixyio import SixyIO
 from aoiksixyio import SixyIOObj
+from aoiksixyio import SubprocPool
+from aoiksixyio import SubprocPump
+from aoiksixyio import ThreadedWriter
+from aoiksixyio.aoiksixyio_ import raisex
+import functools
 import os.path
-import subprocess
 import sys
 
 #/
-def make_arg_parser(cls, tt=None):
+def get_help_width():
+    """
+    Same width as |argparse.HelpFormatter| uses by default, without importing
+    |shutil|, which is slow to import.
+    """
+    #/
+    try:
+        columns = int(os.environ['COLUMNS'])
+    except (KeyError, ValueError):
+        columns = 0
+
+    #/
+    if columns <= 0:
+        try:
+            columns = os.get_terminal_size(sys.__stdout__.fileno()).columns
+        except (AttributeError, ValueError, OSError):
+            columns = 0
+
+    #/
+    if columns <= 0:
+        columns = 80
+
+    #/
+    return columns - 2
+
+#/
+def make_arg_parser(cls, tt=None, formatter_cls=None):
     #/
     tt = tt or (lambda x: x)
 
+    #/
+    kwargs = {}
+
+    if formatter_cls is not None:
+        ## |argparse| makes a formatter in each |add_argument| call.
+        ##  Giving the width up front saves a terminal size query for each.
+        width = get_help_width()
+
+        kwargs['formatter_class'] = lambda prog: formatter_cls(prog, width=width)
+
     #/ 3grGCaw
-    parser = cls(prog='aoiksixyioexp', add_help=False)
+    parser = cls(prog='aoiksixyioexp', add_help=False, **kwargs)
 
     mutex_grp1 = parser.add_mutually_exclusive_group()
 
@@ -140,9 +180,105 @@ def make_arg_parser(cls, tt=None):
         help=tt('GeFIZQT'),
     )
 
+    parser.add_argument(
+        '--atomic',
+        dest='atomic_on',
+        action='store_true',
+        help=tt('Vd3qLs8'),
+    )
+
+    parser.add_argument(
+        '--fsync',
+        dest='fsync_policy',
+        default=None,
+        choices=SixyIO.FSYNC_POLICY_S,
+        metavar='POLICY',
+        help=tt('Tz6fKm1'),
+    )
+
+    parser.add_argument(
+        '--stream',
+        dest='stream_on',
+        action='store_true',
+        help=tt('Fq2mT8c'),
+    )
+
+    parser.add_argument(
+        '--chunk',
+        dest='chunk_size',
+        type=int,
+        default=None,
+        metavar='SIZE',
+        help=tt('Bw7xNe3'),
+    )
+
+    parser.add_argument(
+        '--nopt',
+        dest='passthrough_off',
+        action='store_true',
+        help=tt('CzT5hRw'),
+    )
+
+    parser.add_argument(
+        '--mmap',
+        dest='mmap_on',
+        action='store_true',
+        help=tt('Dq4nWx8'),
+    )
+
+    parser.add_argument(
+        '--stats',
+        dest='stats_on',
+        action='store_true',
+        help=tt('Hs4kTb7'),
+    )
+
+    parser.add_argument(
+        '--stats-file',
+        dest='stats_file_path',
+        default=None,
+        metavar='PATH',
+        help=tt('Nv2cWq5'),
+    )
+
+    parser.add_argument(
+        '--decerr',
+        dest='decode_errors',
+        default=None,
+        metavar='HANDLER',
+        help=tt('Wc8rYn2'),
+    )
+
+    parser.add_argument(
+        '--bif',
+        dest='batch_input_path_s',
+        action='append',
+        default=None,
+        metavar='PATH',
+        help=tt('Kb3xTq1'),
+    )
+
+    parser.add_argument(
+        '--bod',
+        dest='batch_output_dir',
+        default=None,
+        metavar='DIR',
+        help=tt('Rm8vZp2'),
+    )
+
+    parser.add_argument(
+        '--bj',
+        dest='batch_job_count',
+        type=int,
+        default=None,
+        metavar='N',
+        help=tt('Wc5jHn4'),
+    )
+
     parser.add_argument(
         '--sp',
-        dest='subproc_cmd',
+        dest='subproc_cmd_s',
+        action='append',
         default=None,
         metavar='CMD',
         help=tt('C5DLRzH'),
@@ -156,6 +292,44 @@ def make_arg_parser(cls, tt=None):
         help=tt('CcmEKpl'),
     )
 
+    parser.add_argument(
+        '--spsh',
+        dest='subproc_shell_on',
+        action='store_true',
+        help=tt('Ws4pHx6'),
+    )
+
+    parser.add_argument(
+        '--rec',
+        dest='record_on',
+        action='store_true',
+        help=tt('Gz5hLr2'),
+    )
+
+    parser.add_argument(
+        '--spw',
+        dest='worker_count',
+        type=int,
+        default=None,
+        metavar='N',
+        help=tt('Fp7wKd2'),
+    )
+
+    parser.add_argument(
+        '--rsep',
+        dest='record_sep_name',
+        default='nl',
+        metavar='SEP',
+        help=tt('Hm3rTs9'),
+    )
+
+    parser.add_argument(
+        '--spwlen',
+        dest='worker_len_on',
+        action='store_true',
+        help=tt('Bq5nVy4'),
+    )
+
     parser.add_argument(
         '--spce',
         dest='spce',
@@ -166,6 +340,7 @@ def make_arg_parser(cls, tt=None):
     parser.add_argument(
         '--spie',
         dest='spie',
+        action='append',
         default=None,
         help=tt('Ch8MLx8'),
     )
@@ -173,6 +348,7 @@ def make_arg_parser(cls, tt=None):
     parser.add_argument(
         '--spoe',
         dest='spoe',
+        action='append',
         default=None,
         help=tt('Gn5NkKf'),
     )
@@ -180,157 +356,30 @@ def make_arg_parser(cls, tt=None):
     parser.add_argument(
         '--spee',
         dest='spee',
+        action='append',
         default=None,
         help=tt('HxVZaBY'),
     )
 
     return parser
 
-MAIN_RET_V_OK = 0
-MAIN_RET_V_SHOW_HELP = 0
-MAIN_RET_V_PYTHON_VER_NOT_SUPPORTED = 1
-MAIN_RET_V_INIT_EASYIO_ERR = 2
-MAIN_RET_V_DECODE_INPUT_FILE_PATH_ERR = 3
-MAIN_RET_V_OPEN_INPUT_FILE_ERR = 4
-MAIN_RET_V_READ_INPUT_FILE_ERR = 5
-MAIN_RET_V_READ_STDIN_ERR = 6
-MAIN_RET_V_DECODE_SUBPROC_CMD_ERR = 7
-MAIN_RET_V_ENCODE_SUBPROC_CMD_ERR = 8
-MAIN_RET_V_ENCODE_SUBPROC_INPUT_ERR = 9
-MAIN_RET_V_RUN_SUBPROC_ERR = 10
-MAIN_RET_V_DECODE_SUBPROC_STDERR_ERR = 11
-MAIN_RET_V_WRITE_SUBPROC_STDERR_TO_STDERR_ERR = 12
-MAIN_RET_V_DECODE_SUBPROC_STDOUT_ERR = 13
-MAIN_RET_V_DECODE_OUTPUT_FILE_PATH_ERR = 14
-MAIN_RET_V_WRITE_STDOUT_ERR = 15
-
-TT_D = {
-    'BlY3BYu': """Error: Unsupported Python version.
-Make sure your Python 2 version is >=2.7 or Python 3 version is >=3.2""",
-    'A1sZVil': '#/ Native encoding settings',
-    '5tOBLf3': '#/ SixyIO encoding settings',
-    'ClrVxdw': """Error: Failed decoding input data from cmd arg.
-Encoding is |{}|.
-Please use cmd arg |--cae| to specify a correct encoding.""",
-    'IkN5JGx': 'Try if |--cae {}| works.',
-    'Ed6AdJ9': """Failed decoding input file path.
-Encoding is |{}|.
-Please use cmd arg |--cae| to specify a correct encoding.""",
-    'Ei1tnrR': 'Try if |--cae {}| works.',
-    'B6Lk4XI': """Error: Failed opening input file.
-Path is |{}|.""",
-    'AqphK0K': """Error: Failed decoding input file data.
-Encoding is |{}|.
-Path is |{}|.
-Please use cmd arg |--ife| to specify a correct encoding.""",
-    'B37msq7': """Error: Failed reading input file.
-Path is |{}|.""",
-    'IXybCAa': """Error: Failed decoding input data from stdin.
-Encoding is |{}|.
-Please use cmd arg |--stdie| to specify a correct encoding.""",
-    'AtkIgBP': 'Error: Failed reading input data from stdin.',
-    'CWhvSZG': """Error: Failed decoding subproc command.
-Encoding is |{}|.
-Please use cmd arg |--cae| to specify a correct encoding.""",
-    'FdgFTmj': 'Try if |--cae {}| works.',
-    'Dm3mIS3': """Error: Failed encoding subproc command.
-Encoding is |{}|.
-Please use cmd arg |--spce| to specify a correct encoding.""",
-    'BItk9r9': 'Try if |--spce {}| works.',
-    'BdLRCnr': """Error: Failed encoding data to subproc stdin.
-Encoding is |{}|.
-Please use cmd arg |--spie| to specify a correct encoding.""",
-    'BCK6oxA': 'Try if |--spie {}| works.',
-    'FsfEwqB': 'Error: Failed running subproc command.',
-    'DKm86F3': """Error: Failed decoding data from subproc stderr.
-Encoding is |{}|.
-Please use cmd arg |--spee| to specify a correct encoding.""",
-    'CnoJPoC': 'Try if |--spee {}| works.',
-    'E2z7epN': 'Error: Failed writing data from subproc stderr to stderr.',
-    'GRzLy3z': """Error: Failed decoding data from subproc stdout.
-Encoding is |{}|.
-Please use cmd arg |--spoe| to specify a correct encoding.""",
-    'Dl5ML6g': 'Try if |--spoe {}| works.',
-    'CmfwiAq': """Error: Failed decoding output file path.
-Encoding is |{}|.
-Please use cmd arg |--cae| to specify a correct encoding.""",
-    'GuCfy1d': 'Try if |--cae {}| works.',
-    'IRQoaLq': """Error: Failed opening output file.
-Path is |{}|.""",
-    'HshHpp0': """Error: Failed encoding output data to file.
-Encoding is |{}|.
-Path is |{}|.
-Please use cmd arg |--ofe| to specify a correct encoding.""",
-    'AGCSyfb': """Error: Failed writing to output file.
-Path is |{}|.""",
-    'ARUsbv8': """Error: Failed encoding output data to stdout.
-Encoding is |{}|.
-Please use cmd arg |--stdoe| to specify a correct encoding.""",
-    'DhY9aWc': 'Error: Failed writing to stdout',
-    'BUv9hsz': 'Show encoding info.',
-    'EOTuiRi': 'Show debugging info.',
-    'IfBWe0d': 'Show help info.',
-    'C3Q0xhN': 'Input file path.',
-    'Ido2f1l': 'Input cmd arg value.',
-    'EqJvFJ7': 'Output file path.',
-    'EXSjWRS': 'Convert invalid characters in output file name to empty.',
-    'AcLZD2I': 'Convert invalid characters in output file name to spaces.',
-    'GeFIZQT': 'Convert invalid characters in output file name to %% notation.',
-    'Ay0if1H': 'Stdin, stdout, and stderr encoding. Override env var |PYTHONIOENCODING|.',
-    'AQTcrPq': """Stdin encoding.
-Override env var |PYTHONIOENCODING| and cmd arg |--stdioe|.""",
-    'HTstQFo': """Stdout encoding.
-Override env var |PYTHONIOENCODING| and cmd arg |--stdioe|.""",
-    'DO2cvC9': """Stderr encoding.
-Override env var |PYTHONIOENCODING| and cmd arg |--stdioe|.""",
-    'Az6N4l7': 'Cmd arg encoding. By default selected automatically.',
-    'FVgnCju': 'File system encoding. By default selected automatically.',
-    'HdnJ115': 'Input file encoding. By default utf-8.',
-    'EQq5Nla': 'Output file encoding. By default utf-8.',
-    'C5DLRzH': 'Subproc command.',
-    'CcmEKpl': 'Subproc command argument separator.',
-    'BViterk': 'Subproc command encoding. By default utf-8.',
-    'Ch8MLx8': 'Subproc stdin encoding. By default utf-8.',
-    'Gn5NkKf': 'Subproc stdout encoding. By default utf-8.',
-    'HxVZaBY': 'Subproc stderr encoding. By default utf-8.',
-}
-
-def main():
-    #/ 9w4YZfi
-    SixyIO.reload_default_encoding('utf-8')
-
-    #/ 4ik08Ok
-    SixyIO.register_special_codecs()
-    
-    #/
-    def tt(key):
-        return TT_D[key]
-
-    #/ 5ueXs6y
-    if (sys.version_info[0] == 2 and sys.version_info < (2, 7))\
-    or (sys.version_info[0] > 2 and sys.version_info < (3, 2)):
-        #/ 2hF7IEj
-        SixyIO.stderr_print_safe(tt('BlY3BYu'))
-
-        #/ 6jGNubo
-        return MAIN_RET_V_PYTHON_VER_NOT_SUPPORTED
-
-    #/
-    from argparse import ArgumentParser
-
-    #/ 5qZ4gkT
-    tmp_parser = make_arg_parser(cls=ArgumentParser, tt=tt)
-
-    #/
-    tmp_args = list(sys.argv[1:])
-
-    #/ 7jgFMxP
-    tmp_args_obj = tmp_parser.parse_known_args(args=tmp_args)[0]
-
+#/
+def make_sixyio_obj(args_obj, stage_idx=0):
+    """
+    Create SixyIOObj from parsed args.
+
+    |--spie|, |--spoe|, and |--spee| can be given once per |--sp| stage.
+    |stage_idx| selects the values for that stage. The last value given is
+    used for the stages after it.
+    """
     #/
-    debug_on = tmp_args_obj.debug_on
+    def pick(val_s):
+        #/
+        if not val_s:
+            return None
 
-    SixyIO.DEBUG_ON = debug_on
+        #/
+        return val_s[min(stage_idx, len(val_s) - 1)]
 
     #/ 8dLNrwl
     ##
@@ -339,75 +388,936 @@ def main():
     ##
     #/ 9rkDyfz
     ## exit inside |init| if has error.
-    sio = SixyIOObj(
-        stdioe=tmp_args_obj.stdioe,
-        stdie=tmp_args_obj.stdie,
-        stdoe=tmp_args_obj.stdoe,
-        stdee=tmp_args_obj.stdee,
-        cae=tmp_args_obj.cae,
-        fse=tmp_args_obj.fse,
-        ife=tmp_args_obj.ife,
-        ofe=tmp_args_obj.ofe,
-        spce=tmp_args_obj.spce,
-        spie=tmp_args_obj.spie,
-        spoe=tmp_args_obj.spoe,
-        spee=tmp_args_obj.spee,
+    return SixyIOObj(
+        stdioe=args_obj.stdioe,
+        stdie=args_obj.stdie,
+        stdoe=args_obj.stdoe,
+        stdee=args_obj.stdee,
+        cae=args_obj.cae,
+        fse=args_obj.fse,
+        ife=args_obj.ife,
+        ofe=args_obj.ofe,
+        spce=args_obj.spce,
+        spie=pick(args_obj.spie),
+        spoe=pick(args_obj.spoe),
+        spee=pick(args_obj.spee),
         exit_code=MAIN_RET_V_INIT_EASYIO_ERR,
-        debug_on=debug_on,
+        debug_on=args_obj.debug_on,
+        ## Validate only the encodings given by cmd args.
+        default_check_on=False,
     )
 
-    #/
-    args = sys.argv[1:]
+#/
+def call_with_exc_info(func, exc_info, *args):
+    """
+    Call error handler |func| with the exception in |exc_info|, e.g. one
+    saved in another thread, as the current exception. This way handlers
+    print the right traceback.
+    """
+    try:
+        raisex(exc_info[1], exc_info[2])
+    except Exception as e:
+        return func(e, *args)
 
-    #/ 6pcwxTL
-    parser = make_arg_parser(cls=ArgumentParser, tt=tt)
+#/
+def write_utxt_s(utxt_s, write, on_read_err, on_write_err, flush=None):
+    """
+    Write unicode chunks from iterator |utxt_s| by calling |write|.
 
-    #/ 2hgn08k
-    ## Because of |add_help=False| at 3grGCaw, |-h| is no longer a special option.
-    ## |parse_args| will print usage message if positional arguments are not enough,
-    ##  even if |-h| is specified.
-    ## We do not want this behavior. So handle it before calling |parse_args| at 2pePlsG.
-    if tmp_args_obj.help_on:
+    Return None on success. On error, return the exit code from |on_read_err|
+    or |on_write_err|, depending on which side the error is raised.
+    """
+    #/
+    while True:
         #/
-        parser.print_help()
+        try:
+            utxt = next(utxt_s)
+        except StopIteration:
+            break
+        except Exception as e:
+            return on_read_err(e)
 
         #/
-        return MAIN_RET_V_SHOW_HELP
+        try:
+            write(utxt)
 
-    #/ 8ntpDyN
-    if tmp_args_obj.show_encoding_info:
+            if flush is not None:
+                flush()
+        except Exception as e:
+            return on_write_err(e)
+
+    #/
+    return None
+
+#/
+def copy_passthrough(
+    input_file_b,
+    output_file_b,
+    encoding,
+    on_read_err,
+    on_write_err,
+    chunk_size=None,
+    flush=False,
+    stats=None,
+):
+    """
+    Copy bytes from |input_file_b| to |output_file_b| unchanged, after
+    checking they are valid in |encoding|.
+
+    If |stats| is given, bytes copied are counted as size in and out of its
+    |passthrough| stage.
+
+    Return None on success, or the exit code from an error handler.
+    """
+    #/ 7bPq2Ls
+    ## Data needs no check. Let the kernel copy it if possible.
+    if SixyIO.codec_accepts_all_bytes(encoding):
         #/
-        sio.stderr_print_safe(tt('A1sZVil'))
-        sio.stderr_print_safe(SixyIO.get_native_encodings_info())
-        sio.stderr_print_safe('')
+        try:
+            fd_s = (input_file_b.fileno(), output_file_b.fileno())
+        except Exception:
+            ## E.g. a stream object replaced by an in-memory one.
+            fd_s = None
 
         #/
-        sio.stderr_print_safe(tt('5tOBLf3'))
-        sio.stderr_print_safe(sio.get_sixyio_encodings_info())
-        sio.stderr_print_safe('')
+        if fd_s is not None:
+            #/
+            try:
+                output_file_b.flush()
 
-    #/ 9qw2HGt
-    args_obj = parser.parse_args(args)
-    #/
-    ## exit inside |parse_args| if has errors
+                copied = SixyIO.copy_fd(*fd_s)
+            except Exception as e:
+                return on_write_err(e)
 
-    #/ 7mqi7PB
-    input_utxt = None
+            #/
+            if copied is not None:
+                #/
+                if stats is not None:
+                    stats.add('passthrough', in_size=copied, out_size=copied)
 
-    input_arg_val_stxt = args_obj.input_arg_val
-    ## can be None
-    ## |stxt| means bytes str on Py2, unicode str on Py3.
+                #/
+                return None
 
-    input_file_path_stxt = args_obj.input_file_path
-    ## can be None
-    ## |stxt| means bytes str on Py2, unicode str on Py3.
-    
-    #/ 4vMmBo5
-    if input_arg_val_stxt is not None:
-        #/ 4vMmBo5
+    #/
+    write = output_file_b.write
+
+    if stats is not None:
+        #/
+        def write(btxt, write=write):
+            #/
+            write(btxt)
+
+            #/
+            stats.add('passthrough', in_size=len(btxt), out_size=len(btxt))
+
+    #/ 2Vm9xTd
+    return write_utxt_s(
+        SixyIO.iter_validate(input_file_b, encoding=encoding, chunk_size=chunk_size),
+        write=write,
+        on_read_err=on_read_err,
+        on_write_err=on_write_err,
+        flush=output_file_b.flush if flush else None,
+    )
+
+#/
+def get_children_cpu_time():
+    """
+    CPU time of waited-for child processes. Zero if not supported.
+    """
+    #/
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+
+    #/
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    #/
+    return usage.ru_utime + usage.ru_stime
+
+#/
+def make_encode_write(encoding, file_b, flush_on=False, stats=None, thread_on=False):
+    """
+    Return a tuple of functions |write| and |close|.
+
+    |write| encodes unicode with |encoding| and writes the bytes to binary
+    file object |file_b|, timed as stages |encode| and |write| of |stats| if
+    given. If |thread_on| is true, the writes are done in a |ThreadedWriter|
+    thread, and stage |write| is the time waiting for it.
+
+    |close| writes the bytes still held by the encoder, and flushes. Call
+    |close(abort=True)| instead after an error, to only stop the thread.
+    """
+    #/
+    if thread_on:
+        file_b = ThreadedWriter(file_b)
+
+    #/
+    encode = SixyIO.make_encoder(encoding).encode
+
+    write_b = file_b.write
+
+    flush_b = file_b.flush
+
+    if stats is not None:
+        #/
+        encode = stats.wrap_func('encode', encode)
+
+        write_b = stats.wrap_func('write', write_b, out_on=False)
+
+        flush_b = stats.wrap_func('write', flush_b, in_on=False, out_on=False)
+
+    #/
+    def write(utxt):
+        #/
+        btxt = encode(utxt)
+
+        #/
+        if btxt:
+            write_b(btxt)
+
+            if flush_on:
+                flush_b()
+
+    def close(abort=False):
+        #/
+        if not abort:
+            #/
+            btxt = encode('', True)
+
+            if btxt:
+                write_b(btxt)
+
+            #/
+            flush_b()
+
+        #/
+        if thread_on:
+            file_b.close(abort=abort)
+
+    #/
+    return write, close
+
+#/
+def get_cpu_count():
+    """
+    Number of cores available to this process.
+    """
+    #/
+    try:
+        return len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
+
+#/
+def iter_batch_item(input_path_s, output_dir):
+    """
+    Yield a tuple of input file path and output file path for each file
+    given by batch mode input paths |input_path_s|.
+
+    A file is output to |output_dir| by its base name. Files in a directory
+    are output by their paths relative to the directory.
+    """
+    #/
+    for input_path in input_path_s:
+        #/
+        if not os.path.isdir(input_path):
+            #/
+            ## A path that does not exist is yielded too. Opening it fails
+            ##  and is reported for that file.
+            yield input_path, os.path.join(output_dir, os.path.basename(input_path))
+
+            continue
+
+        #/
+        for dir_path, dir_name_s, file_name_s in os.walk(input_path):
+            #/
+            ## Sort so that files are converted and reported in a stable order.
+            dir_name_s.sort()
+
+            #/
+            rel_dir_path = os.path.relpath(dir_path, input_path)
+
+            output_sub_dir = os.path.normpath(os.path.join(output_dir, rel_dir_path))
+
+            #/
+            for file_name in sorted(file_name_s):
+                yield os.path.join(dir_path, file_name), os.path.join(output_sub_dir, file_name)
+
+#/
+def run_batch_item(arg_s, item):
+    """
+    Convert one file of batch mode by calling |main| with the original cmd
+    args plus |--if| and |--of|. Run in a worker process.
+
+    Return the exit code.
+    """
+    #/
+    input_path, output_path = item
+
+    #/
+    output_dir = os.path.dirname(output_path)
+
+    if output_dir and not os.path.isdir(output_dir):
         try:
-            input_utxt = sio.cae_to_u(input_arg_val_stxt)
+            os.makedirs(output_dir)
+        except OSError:
+            ## Reported when opening the output file fails.
+            pass
+
+    #/
+    ## Use the |--if=PATH| form, so that a path starting with |-| is not taken
+    ##  as an option.
+    item_arg_s = list(arg_s) + ['--if=' + input_path, '--of=' + output_path]
+
+    #/
+    try:
+        return main(args=item_arg_s, batch_item_on=True)
+    except SystemExit as e:
+        ## Do not let a worker process exit, otherwise the pool waits for
+        ##  the lost result forever.
+        return e.code
+
+#/
+def run_batch(parser, args_obj, arg_s, sio, tt):
+    """
+    Batch mode. Convert each file given by |--bif| to an output file in
+    |--bod|, using a pool of |--bj| worker processes.
+
+    Errors are reported per file by the worker converting it. Return the
+    exit code of the first failed file in input order, or |MAIN_RET_V_OK|.
+    Colliding output paths fail before any file is converted.
+    """
+    #/ 3hWn7Qs
+    if args_obj.batch_output_dir is None:
+        parser.error(tt('Gt7kLs9'))
+
+    if args_obj.input_arg_val is not None \
+    or args_obj.input_file_path is not None \
+    or args_obj.output_file_path is not None:
+        parser.error(tt('Yh2nQw6'))
+
+    #/ 6dKs2Rv
+    try:
+        input_path_s = [sio.cae_to_u(x) for x in args_obj.batch_input_path_s]
+
+        output_dir = sio.cae_to_u(args_obj.batch_output_dir)
+    except Exception:
+        #/
+        sio.stderr_print_fmt_safe(tt('Ed6AdJ9'), sio.cae_utxt)
+
+        if sio.cae != SixyIO.STDIE:
+            sio.stderr_print_fmt_safe(tt('Ei1tnrR'), SixyIO.STDIE_UTXT)
+
+        #/
+        if args_obj.debug_on:
+            sio.stderr_write_tb_safe()
+
+        #/
+        return MAIN_RET_V_DECODE_INPUT_FILE_PATH_ERR
+
+    #/ 5rTb8Vz
+    ## An output dir inside an input dir would be walked too. The input dir
+    ##  itself is fine, converting its files in place.
+    output_real_dir = os.path.realpath(output_dir)
+
+    for input_path in input_path_s:
+        #/
+        if not os.path.isdir(input_path):
+            continue
+
+        #/
+        if output_real_dir.startswith(os.path.join(os.path.realpath(input_path), '')):
+            sio.stderr_print_fmt_safe(tt('Dm4wQk8'), output_dir, input_path)
+
+            return MAIN_RET_V_BATCH_OUTPUT_PATH_ERR
+
+    #/ 9xHn2Lc
+    ## Listed before any file is converted, so that files output into an
+    ##  input dir are not walked, and two inputs mapped to the same output
+    ##  path are found before either is written.
+    item_s = list(iter_batch_item(input_path_s, output_dir))
+
+    input_path_d = {}
+    ## Map output path to the input path mapped to it.
+
+    for input_path, output_path in item_s:
+        #/
+        output_key = os.path.normcase(os.path.abspath(output_path))
+
+        if output_key in input_path_d:
+            sio.stderr_print_fmt_safe(tt('Hk7sNf3'), output_path, input_path_d[output_key], input_path)
+
+            return MAIN_RET_V_BATCH_OUTPUT_PATH_ERR
+
+        #/
+        input_path_d[output_key] = input_path
+
+    #/
+    job_count = args_obj.batch_job_count or get_cpu_count()
+
+    run_item = functools.partial(run_batch_item, arg_s)
+
+    #/ 8vRj3Fc
+    pool = None
+
+    if job_count <= 1:
+        ret_v_s = map(run_item, item_s)
+    else:
+        #/
+        import multiprocessing
+
+        pool = multiprocessing.Pool(job_count)
+
+        ## Send files to workers in small batches to cut IPC round trips.
+        ret_v_s = pool.imap(run_item, item_s, chunksize=16)
+
+    #/
+    file_count = 0
+
+    failed_count = 0
+
+    first_ret_v = None
+
+    try:
+        #/
+        for ret_v in ret_v_s:
+            #/
+            file_count += 1
+
+            #/
+            if ret_v:
+                failed_count += 1
+
+                if first_ret_v is None:
+                    first_ret_v = ret_v
+
+        #/
+        if pool is not None:
+            pool.close()
+    finally:
+        #/
+        if pool is not None:
+            pool.terminate()
+
+            pool.join()
+
+    #/ 2nGx6Yt
+    if failed_count:
+        sio.stderr_print_fmt_safe(tt('Pz4mXc8'), str(failed_count), str(file_count))
+
+        return first_ret_v
+
+    #/
+    return MAIN_RET_V_OK
+
+RECORD_SEP_D = {
+    'nl': '\n',
+    'crlf': '\r\n',
+    'nul': '\0',
+}
+## Map |--rsep| value to record separator.
+
+MAIN_RET_V_OK = 0
+MAIN_RET_V_SHOW_HELP = 0
+MAIN_RET_V_PYTHON_VER_NOT_SUPPORTED = 1
+MAIN_RET_V_INIT_EASYIO_ERR = 2
+MAIN_RET_V_DECODE_INPUT_FILE_PATH_ERR = 3
+MAIN_RET_V_OPEN_INPUT_FILE_ERR = 4
+MAIN_RET_V_READ_INPUT_FILE_ERR = 5
+MAIN_RET_V_READ_STDIN_ERR = 6
+MAIN_RET_V_DECODE_SUBPROC_CMD_ERR = 7
+MAIN_RET_V_ENCODE_SUBPROC_CMD_ERR = 8
+MAIN_RET_V_ENCODE_SUBPROC_INPUT_ERR = 9
+MAIN_RET_V_RUN_SUBPROC_ERR = 10
+MAIN_RET_V_DECODE_SUBPROC_STDERR_ERR = 11
+MAIN_RET_V_WRITE_SUBPROC_STDERR_TO_STDERR_ERR = 12
+MAIN_RET_V_DECODE_SUBPROC_STDOUT_ERR = 13
+MAIN_RET_V_DECODE_OUTPUT_FILE_PATH_ERR = 14
+MAIN_RET_V_WRITE_STDOUT_ERR = 15
+MAIN_RET_V_OPEN_OUTPUT_FILE_ERR = 16
+MAIN_RET_V_WRITE_OUTPUT_FILE_ERR = 17
+MAIN_RET_V_SERVER_ERR = 18
+## Request to |aoiksixyiosrv| failed. Same value in |aoiksixyiocli|.
+MAIN_RET_V_BATCH_OUTPUT_PATH_ERR = 19
+## Batch mode output paths collide, or |--bod| is inside a |--bif| dir.
+
+#/
+ERR_STATS_STAGE_NAME_S = (
+    ('stdin', 'decode'),
+    ('input_file', 'decode'),
+    ('subproc_stdout', 'subproc_decode'),
+    ('subproc_stderr', 'subproc_decode'),
+)
+## Stage of |--stats| counting the decode errors of each stream.
+
+TT_D = {
+    'BlY3BYu': """Error: Unsupported Python version.
+Make sure your Python version is >=3.7""",
+    'A1sZVil': '#/ Native encoding settings',
+    '5tOBLf3': '#/ SixyIO encoding settings',
+    'ClrVxdw': """Error: Failed decoding input data from cmd arg.
+Encoding is |{}|.
+Please use cmd arg |--cae| to specify a correct encoding.""",
+    'IkN5JGx': 'Try if |--cae {}| works.',
+    'Ed6AdJ9': """Failed decoding input file path.
+Encoding is |{}|.
+Please use cmd arg |--cae| to specify a correct encoding.""",
+    'Ei1tnrR': 'Try if |--cae {}| works.',
+    'B6Lk4XI': """Error: Failed opening input file.
+Path is |{}|.""",
+    'AqphK0K': """Error: Failed decoding input file data.
+Encoding is |{}|.
+Path is |{}|.
+Please use cmd arg |--ife| to specify a correct encoding, or |--ife auto| to detect it.""",
+    'B37msq7': """Error: Failed reading input file.
+Path is |{}|.""",
+    'IXybCAa': """Error: Failed decoding input data from stdin.
+Encoding is |{}|.
+Please use cmd arg |--stdie| to specify a correct encoding, or |--stdie auto| to detect it.""",
+    'AtkIgBP': 'Error: Failed reading input data from stdin.',
+    'CWhvSZG': """Error: Failed decoding subproc command.
+Encoding is |{}|.
+Please use cmd arg |--cae| to specify a correct encoding.""",
+    'FdgFTmj': 'Try if |--cae {}| works.',
+    'Dm3mIS3': """Error: Failed encoding subproc command.
+Encoding is |{}|.
+Please use cmd arg |--spce| to specify a correct encoding.""",
+    'BItk9r9': 'Try if |--spce {}| works.',
+    'BdLRCnr': """Error: Failed encoding data to subproc stdin.
+Encoding is |{}|.
+Please use cmd arg |--spie| to specify a correct encoding.""",
+    'BCK6oxA': 'Try if |--spie {}| works.',
+    'FsfEwqB': 'Error: Failed running subproc command.',
+    'DKm86F3': """Error: Failed decoding data from subproc stderr.
+Encoding is |{}|.
+Please use cmd arg |--spee| to specify a correct encoding.""",
+    'CnoJPoC': 'Try if |--spee {}| works.',
+    'E2z7epN': 'Error: Failed writing data from subproc stderr to stderr.',
+    'GRzLy3z': """Error: Failed decoding data from subproc stdout.
+Encoding is |{}|.
+Please use cmd arg |--spoe| to specify a correct encoding, or |--spoe auto| to detect it.""",
+    'Dl5ML6g': 'Try if |--spoe {}| works.',
+    'CmfwiAq': """Error: Failed decoding output file path.
+Encoding is |{}|.
+Please use cmd arg |--cae| to specify a correct encoding.""",
+    'GuCfy1d': 'Try if |--cae {}| works.',
+    'IRQoaLq': """Error: Failed opening output file.
+Path is |{}|.""",
+    'HshHpp0': """Error: Failed encoding output data to file.
+Encoding is |{}|.
+Path is |{}|.
+Please use cmd arg |--ofe| to specify a correct encoding.""",
+    'AGCSyfb': """Error: Failed writing to output file.
+Path is |{}|.""",
+    'ARUsbv8': """Error: Failed encoding output data to stdout.
+Encoding is |{}|.
+Please use cmd arg |--stdoe| to specify a correct encoding.""",
+    'DhY9aWc': 'Error: Failed writing to stdout',
+    'BUv9hsz': 'Show encoding info.',
+    'EOTuiRi': 'Show debugging info.',
+    'IfBWe0d': 'Show help info.',
+    'C3Q0xhN': 'Input file path.',
+    'Ido2f1l': 'Input cmd arg value.',
+    'EqJvFJ7': 'Output file path.',
+    'EXSjWRS': 'Convert invalid characters in output file name to empty.',
+    'AcLZD2I': 'Convert invalid characters in output file name to spaces.',
+    'GeFIZQT': 'Convert invalid characters in output file name to %% notation.',
+    'Ay0if1H': 'Stdin, stdout, and stderr encoding. Override env var |PYTHONIOENCODING|.',
+    'AQTcrPq': """Stdin encoding. |auto| detects it from a sample of input.
+Override env var |PYTHONIOENCODING| and cmd arg |--stdioe|.""",
+    'HTstQFo': """Stdout encoding.
+Override env var |PYTHONIOENCODING| and cmd arg |--stdioe|.""",
+    'DO2cvC9': """Stderr encoding.
+Override env var |PYTHONIOENCODING| and cmd arg |--stdioe|.""",
+    'Az6N4l7': 'Cmd arg encoding. By default selected automatically.',
+    'FVgnCju': 'File system encoding. By default selected automatically.',
+    'HdnJ115': 'Input file encoding. By default utf-8. |auto| detects it from a sample at the file start.',
+    'EQq5Nla': 'Output file encoding. By default utf-8.',
+    'Vd3qLs8': 'Write the output file to a temporary file in the same directory and rename it into place when done, so readers never see a partial file. On error the old file is kept.',
+    'Tz6fKm1': 'Fsync policy of |--atomic|: |none|, |file|, or |file+dir|. By default |file|. Implies |--atomic|.',
+    'Fq2mT8c': 'Stream mode. Decode and write input in chunks, instead of reading it as a whole.',
+    'Bw7xNe3': 'Chunk size in bytes for stream mode. By default 65536.',
+    'Dq4nWx8': 'Decode |--if| input file straight from memory-mapped pages, in chunks. Implies |--stream|. Not used in passthrough mode.',
+    'CzT5hRw': 'Disable passthrough mode. By default, when input and output encodings are the same and no subproc is used, input bytes are checked valid and copied unchanged.',
+    'Hs4kTb7': 'Print wall time, CPU time, sizes in and out, and error counts of each processing stage to stderr.',
+    'Nv2cWq5': 'Write the stats of |--stats| as JSON to this file instead of stderr.',
+    'Wc8rYn2': 'Error handler for decoding stdin, input file, and subproc output, e.g. |replace| to keep going on bad data. By default |strict|. With |--stats|, errors are counted per stream, with the offsets of the first ones.',
+    'Lt3pXe7': 'Unknown error handler |{}| of cmd arg |--decerr|.',
+    'Qm7bVx3': 'Error: Failed writing stats file.\nPath is |{}|.',
+    'Kb3xTq1': 'Batch mode input file or directory. Repeat to give many. Directories are walked recursively. Requires |--bod|.',
+    'Rm8vZp2': 'Batch mode output directory. Files in an input directory keep their relative paths.',
+    'Wc5jHn4': 'Batch mode number of worker processes. By default the number of available cores.',
+    'Gt7kLs9': 'Cmd arg |--bod| is required in batch mode.',
+    'Yh2nQw6': 'Cmd args |--ia|, |--if|, and |--of| can not be used in batch mode.',
+    'Pz4mXc8': 'Error: {} of {} files failed in batch mode.',
+    'Dm4wQk8': 'Error: Batch mode output directory is inside an input directory.\nOutput directory is |{}|.\nInput directory is |{}|.',
+    'Hk7sNf3': 'Error: Two batch mode input files have the same output file.\nOutput file is |{}|.\nInput files are |{}| and |{}|.',
+    'Jq6vLc2': 'ASCII fast path: {} of {} pre-scanned bytes ({}%), {} of {} chunks.',
+    'C5DLRzH': 'Subproc command. Repeat to run a pipeline, e.g. |--sp A --sp B| pipes output of |A| to |B|.',
+    'CcmEKpl': 'Subproc command argument separator.',
+    'Fp7wKd2': 'Worker pool mode. Start the |--sp| command once in each of N workers, send them input records split by |--rsep|, and write the result records in input order. A worker must write one result record per input record and flush it before reading the next, e.g. |sed -u|.',
+    'Gz5hLr2': 'Record mode. Read input in a thread, decode and encode it in chunks of whole records split by |--rsep|, and write them in another thread. Output never ends inside a record, until input does. Implies |--stream|.',
+    'Hm3rTs9': 'Record separator of |--rec| and |--spw|: |nl| for newline, |crlf|, |nul|, or any other text as is. By default |nl|.',
+    'Tc3mWb5': 'Cmd arg |--rsep| can not be empty.',
+    'Dn4sKq7': 'Cmd arg |--rec| can not be used with |--mmap|, or with |--sp| without |--spw|.',
+    'Bq5nVy4': 'Frame records sent to and read from |--spw| workers with a 4-byte big-endian length prefix, instead of the separator. Needed for encodings like utf-16, or records containing the separator.',
+    'Lw6cZj1': 'Cmd arg |--spw| takes exactly one |--sp|.',
+    'Ry2kPn8': 'Records in encoding |{}| can not be split at |--rsep| without decoding. Use |--spwlen|.',
+    'Xk8bRw3': 'Error: A subproc worker exited before returning all results.',
+    'Ws4pHx6': 'Run subproc commands via the shell, e.g. to use pipes or redirections. The command is given to the shell as a whole. By default the program is run directly, which starts faster.',
+    'BViterk': 'Subproc command encoding. By default utf-8.',
+    'Ch8MLx8': 'Subproc stdin encoding. By default utf-8. Repeat to set per |--sp| stage.',
+    'Gn5NkKf': 'Subproc stdout encoding. By default utf-8. |auto| detects it from a sample of output. Repeat to set per |--sp| stage.',
+    'HxVZaBY': 'Subproc stderr encoding. By default utf-8. Repeat to set per |--sp| stage.',
+}
+
+def main(args=None, batch_item_on=False):
+    """
+    args: Cmd args. By default |sys.argv[1:]|.
+    batch_item_on: Whether called to convert one file of batch mode. If so,
+        batch mode cmd args are ignored.
+    """
+    #/ 9w4YZfi
+    SixyIO.reload_default_encoding('utf-8')
+
+    #/ 4ik08Ok
+    ## Special codecs are registered by |SixyIO.codec_info| on the first
+    ##  codec lookup miss, so runs that do not use them skip the cost.
+    
+    #/
+    def tt(key):
+        return TT_D[key]
+
+    #/ 5ueXs6y
+    ## 3.7 for |__set_name__| (3.6), |os.replace| (3.3), non-inheritable file
+    ##  descriptors (3.4, PEP 446), and |asyncio.get_running_loop| (3.7).
+    if sys.version_info < (3, 7):
+        #/ 2hF7IEj
+        SixyIO.stderr_print_safe(tt('BlY3BYu'))
+
+        #/ 6jGNubo
+        return MAIN_RET_V_PYTHON_VER_NOT_SUPPORTED
+
+    #/
+    from argparse import ArgumentParser
+    from argparse import HelpFormatter
+
+    #/
+    if args is None:
+        args = sys.argv[1:]
+
+    #/ 6pcwxTL
+    parser = make_arg_parser(cls=ArgumentParser, tt=tt, formatter_cls=HelpFormatter)
+
+    #/ 7jgFMxP
+    ## Parse once. Unrecognized arguments are reported at 9qw2HGt, after
+    ##  |-h| and |--ei| have been handled.
+    args_obj, unknown_arg_s = parser.parse_known_args(args=args)
+
+    #/
+    debug_on = args_obj.debug_on
+
+    SixyIO.DEBUG_ON = debug_on
+
+    #/
+    ## Counts are printed at 5nKw3Rt.
+    if debug_on:
+        SixyIO.prescan_stats_enable()
+
+    #/ 2hgn08k
+    ## Because of |add_help=False| at 3grGCaw, |-h| is no longer a special option.
+    ## |parse_args| will print usage message if positional arguments are not enough,
+    ##  even if |-h| is specified.
+    ## We do not want this behavior. So handle it before reporting argument errors at 9qw2HGt.
+    if args_obj.help_on:
+        #/
+        parser.print_help()
+
+        #/
+        return MAIN_RET_V_SHOW_HELP
+
+    #/ 8dLNrwl
+    ## After |-h|, which needs no encodings.
+    ##
+    #/ 2wxliSS
+    ## print msg inside |init| if has error.
+    ##
+    #/ 9rkDyfz
+    ## exit inside |init| if has error.
+    sio = make_sixyio_obj(args_obj)
+
+    #/ 8ntpDyN
+    if args_obj.show_encoding_info:
+        #/
+        sio.stderr_print_safe(tt('A1sZVil'))
+        sio.stderr_print_safe(SixyIO.get_native_encodings_info())
+        sio.stderr_print_safe('')
+
+        #/
+        sio.stderr_print_safe(tt('5tOBLf3'))
+        sio.stderr_print_safe(sio.get_sixyio_encodings_info())
+        sio.stderr_print_safe('')
+
+    #/ 9qw2HGt
+    if unknown_arg_s:
+        parser.error('unrecognized arguments: ' + ' '.join(unknown_arg_s))
+    #/
+    ## exit inside |error|, same as |parse_args| does
+
+    #/ 4tBq8Jx
+    if args_obj.batch_input_path_s and not batch_item_on:
+        return run_batch(parser, args_obj, args, sio, tt)
+
+    #/ 6rTm2Qa
+    ## Stats are recorded by wrapping the functions, iterators, and readers
+    ##  of each stage. Without |--stats|, nothing is wrapped.
+    stats = None
+
+    if args_obj.stats_on or args_obj.stats_file_path:
+        #/
+        import time
+
+        stats = sio.stats_enable()
+
+        main_wall_start = time.perf_counter()
+
+        main_cpu_start = time.process_time()
+
+    #/ 9Fs3Kd6
+    ## Decode errors are counted per stream by the handlers of
+    ##  |SixyIO.count_errors|.
+    decode_errors = args_obj.decode_errors
+
+    if stats is not None or decode_errors:
+        #/
+        try:
+            err_stats_d = sio.err_stats_enable(errors=decode_errors)
+        except LookupError:
+            parser.error(SixyIO.format(tt('Lt3pXe7'), sio.cae_to_u_safe(decode_errors)))
+
+        #/
+        ## The stage tables count errors the handler does not raise too.
+        if stats is not None:
+            for stream_name, stage_name in ERR_STATS_STAGE_NAME_S:
+                err_stats_d[stream_name].link_stage(stats, stage_name)
+
+    #/ 3Rw8Tz5
+    ## Stats are reported below also when a stage fails and returns early.
+    ret_v = run_stages(parser, args_obj, sio, stats, tt)
+
+    #/ 5nKw3Rt
+    if debug_on:
+        #/
+        stat_d = SixyIO.prescan_stats()
+
+        sio.stderr_print_fmt_safe(
+            tt('Jq6vLc2'),
+            str(stat_d['fast_byte_count']),
+            str(stat_d['scan_byte_count']),
+            '{:.1f}'.format(stat_d['fast_ratio'] * 100),
+            str(stat_d['fast_chunk_count']),
+            str(stat_d['scan_chunk_count']),
+        )
+
+    #/ 8pLs5Vd
+    if stats is not None:
+        #/
+        ## CPU time of all threads of this process, excluding subprocs.
+        stats.add('total',
+            call_count=1,
+            wall_s=time.perf_counter() - main_wall_start,
+            cpu_s=time.process_time() - main_cpu_start,
+        )
+
+        #/
+        if args_obj.stats_file_path:
+            #/
+            import json
+
+            #/
+            try:
+                with open(args_obj.stats_file_path, 'w') as stats_file:
+                    json.dump({
+                        'exit_code': MAIN_RET_V_OK if ret_v is None else ret_v,
+                        'stages': stats.to_dict(),
+                        'streams': dict(
+                            (name, err_stats.to_dict()) for name, err_stats in sio.err_stats_d.items()),
+                    }, stats_file, indent=1)
+            except Exception:
+                #/
+                sio.stderr_print_fmt_safe(tt('Qm7bVx3'), sio.cae_to_u_safe(args_obj.stats_file_path))
+
+                if debug_on:
+                    sio.stderr_write_tb_safe()
+        else:
+            sio.stderr_write_safe(stats.format())
+
+            sio.stderr_write_safe(sio.err_stats_format())
+
+    #/
+    if ret_v is not None:
+        return ret_v
+    
+    #/ 3jB9xDg
+    return MAIN_RET_V_OK
+
+def run_stages(parser, args_obj, sio, stats, tt):
+    """
+    Read and decode the input, run the subprocs, and encode and write the
+    output, as |args_obj| says. Return the exit code, or None if all went
+    well.
+
+    stats: |StageStats| to record the stages into, or None.
+    """
+    #/
+    debug_on = args_obj.debug_on
+
+    decode_errors = args_obj.decode_errors
+
+    #/
+    if stats is not None:
+        import time
+
+    def timed(name, func, in_on=True, out_on=True):
+        #/
+        if stats is None:
+            return func
+
+        #/
+        return stats.wrap_func(name, func, in_on=in_on, out_on=out_on)
+
+    def timed_iter(name, iterable):
+        #/
+        if stats is None:
+            return iterable
+
+        #/
+        return stats.wrap_iter(name, iterable)
+
+    def timed_reader(name, file_b, parent=None):
+        #/
+        if stats is None:
+            return file_b
+
+        #/
+        return stats.wrap_reader(name, file_b, parent=parent)
+
+    def counted(name, on_err):
+        """
+        Wrap error handler |on_err| to count the errors it handles in stage
+        |name|, for errors caught before reaching a timed function.
+        """
+        #/
+        if stats is None:
+            return on_err
+
+        #/
+        def on_err_counted(e):
+            #/
+            stats.add_err(name, e)
+
+            #/
+            return on_err(e)
+
+        #/
+        return on_err_counted
+
+    #/ 7mqi7PB
+    input_utxt = None
+
+    input_utxt_s = None
+    ## In stream mode, an iterator of unicode chunks is used instead of
+    ##  |input_utxt|.
+
+    on_input_err = None
+    ## Function that prints error message for an error raised when reading
+    ##  input, and returns the exit code.
+
+    stream_on = args_obj.stream_on
+
+    mmap_on = args_obj.mmap_on and args_obj.input_file_path is not None
+    ## Only input files can be mapped.
+
+    chunk_size = args_obj.chunk_size or SixyIO.CHUNK_SIZE
+
+    #/ 2Rc7Nx4
+    record_sep = RECORD_SEP_D.get(args_obj.record_sep_name)
+
+    if record_sep is None:
+        #/
+        try:
+            record_sep = sio.cae_to_u(args_obj.record_sep_name)
         except Exception:
+            parser.error(SixyIO.format(tt('Ed6AdJ9'), sio.cae_utxt))
+
+        #/
+        if not record_sep:
+            parser.error(tt('Tc3mWb5'))
+
+    #/
+    record_on = args_obj.record_on
+    ## Record mode. Input is read in a thread, converted in chunks of whole
+    ##  records, and written in another thread.
+
+    if record_on:
+        #/
+        if (args_obj.subproc_cmd_s and not args_obj.worker_count) or args_obj.mmap_on:
+            parser.error(tt('Dn4sKq7'))
+
+        #/
+        stream_on = True
+
+    input_arg_val_stxt = args_obj.input_arg_val
+    ## can be None
+    ## |stxt| means bytes str on Py2, unicode str on Py3.
+
+    input_file_path_stxt = args_obj.input_file_path
+    ## can be None
+    ## |stxt| means bytes str on Py2, unicode str on Py3.
+
+    #/ 4Nw8cUe
+    ## In passthrough mode, input bytes are copied to output unchanged, after
+    ##  being checked valid, because decoding and encoding back would give the
+    ##  same bytes.
+    passthrough_on = False
+
+    passthrough_encoding = None
+
+    input_file_b = None
+    ## Binary input file object in passthrough mode.
+
+    input_file = None
+    ## Binary input file object of |--if|.
+
+    if not args_obj.passthrough_off \
+    and not args_obj.subproc_cmd_s \
+    and not record_on \
+    and args_obj.decode_errors in (None, 'strict') \
+    and input_arg_val_stxt is None:
+        #/
+        if input_file_path_stxt is not None:
+            passthrough_encoding = sio.ife
+        else:
+            passthrough_encoding = sio.stdie
+
+        #/
+        if args_obj.output_file_path is not None:
+            output_encoding = sio.ofe
+        else:
+            output_encoding = sio.stdoe
+
+        #/
+        ## Detected encoding is not known until input is read. Decode it.
+        passthrough_on = passthrough_encoding != SixyIO.ENCODING_AUTO \
+            and SixyIO.codec_name(passthrough_encoding) == SixyIO.codec_name(output_encoding) \
+            and SixyIO.codec_is_passthrough_safe(passthrough_encoding)
+    
+    #/ 4vMmBo5
+    if input_arg_val_stxt is not None:
+        #/
+        def on_input_err(e):
             #/ 4vMmBo5
             sio.stderr_print_fmt_safe(tt('ClrVxdw'), sio.cae_utxt)
 
@@ -421,7 +1331,19 @@ def main():
             #/ 4szO3LX
             return MAIN_RET_V_DECODE_INPUT_FILE_PATH_ERR
 
+        #/ 4vMmBo5
+        try:
+            input_utxt = timed('decode', sio.cae_to_u)(input_arg_val_stxt)
+        except Exception as e:
+            return on_input_err(e)
+
         assert input_utxt is not None
+
+        #/ 3RkWq8v
+        if stream_on:
+            input_utxt_s = SixyIO.iter_split(input_utxt, chunk_size)
+
+            input_utxt = None
     
     #/ 2dvQxw3
     elif input_file_path_stxt is not None:
@@ -444,7 +1366,9 @@ def main():
 
         #/ 5hxB9lf
         try:
-            input_file = sio.open_in(input_file_path)
+            ## Opened binary in all modes. Data read as a whole is decoded by
+            ##  |ife_to_u|, which uses the ASCII pre-scan.
+            input_file = sio.open_in_b(input_file_path)
         except Exception:
             #/ 6gATkmv
             sio.stderr_print_fmt_safe(tt('B6Lk4XI'), input_file_path)
@@ -456,10 +1380,8 @@ def main():
             #/ 8oy1gRL
             return MAIN_RET_V_OPEN_INPUT_FILE_ERR
 
-        #/ 9aLExHg
-        try:
-            input_utxt = input_file.read()
-        except Exception as e:
+        #/
+        def on_input_err(e):
             #/ 4hEv1El
             if isinstance(e, UnicodeDecodeError):
                 sio.stderr_print_fmt_safe(tt('AqphK0K'), sio.ife_utxt, input_file_path)
@@ -473,14 +1395,44 @@ def main():
             #/ 8sDUvAY
             return MAIN_RET_V_READ_INPUT_FILE_ERR
 
+        #/ 7UoT2mc
+        if passthrough_on:
+            input_file_b = input_file
+        elif record_on:
+            #/ 8Wd5Rj6
+            ## Reads run in a thread, so their time is not part of the decode
+            ##  stage, which waits for them instead.
+            input_utxt_s = timed_iter('decode', sio.iter_in_records(
+                timed_reader('read', input_file),
+                record_sep,
+                chunk_size=chunk_size,
+            ))
+        elif mmap_on:
+            #/ 5bYp2Mf
+            ## Mapped input is decoded in chunks, so mmap mode implies
+            ##  stream mode.
+            stream_on = True
+
+            ## Pages are read while being decoded, so the read time is part
+            ##  of the decode stage.
+            input_utxt_s = timed_iter('decode', sio.iter_in_mmap(input_file, chunk_size=chunk_size))
+        elif stream_on:
+            input_utxt_s = timed_iter('decode', sio.iter_in(
+                timed_reader('read', input_file, parent='decode'),
+                chunk_size=chunk_size,
+            ))
+        else:
+            #/ 9aLExHg
+            try:
+                input_btxt = timed('read', input_file.read, in_on=False)()
+
+                input_utxt = timed('decode', sio.ife_to_u)(input_btxt)
+            except Exception as e:
+                return on_input_err(e)
+
     else:
-        try:
-            #/ 8e0bK1I
-            stdin_reader = sio.stdin_make_reader()
-            
-            #/ 7i9CcnB
-            input_utxt = stdin_reader.read()
-        except Exception as e:
+        #/
+        def on_input_err(e):
             #/ 2fRbg40
             if isinstance(e, UnicodeDecodeError):
                 sio.stderr_print_fmt_safe(tt('IXybCAa'), sio.stdie_utxt)
@@ -493,68 +1445,155 @@ def main():
 
             #/ 6c3zIP6
             return MAIN_RET_V_READ_STDIN_ERR
+
+        #/ 4GJs0kd
+        if passthrough_on:
+            input_file_b = SixyIO.stdin_get_b()
+        elif record_on:
+            #/ 8Wd5Rj6
+            stdin_b = SixyIO.stdin_get_b()
+
+            ## Read the raw file in the reader thread. A thread blocked in a
+            ##  buffered read holds the buffer's lock, which aborts the
+            ##  interpreter at exit if the output fails before input ends.
+            stdin_b = getattr(stdin_b, 'raw', stdin_b)
+
+            input_utxt_s = timed_iter('decode', sio.stdin_iter_records(
+                record_sep,
+                chunk_size=chunk_size,
+                file_b=timed_reader('read', stdin_b),
+            ))
+        elif stream_on:
+            input_utxt_s = timed_iter('decode', sio.stdin_iter(
+                chunk_size=chunk_size,
+                file_b=timed_reader('read', SixyIO.stdin_get_b(), parent='decode'),
+            ))
+        else:
+            try:
+                #/ 8e0bK1I
+                ## Read as bytes and decode as a whole, so that the ASCII
+                ##  pre-scan applies.
+                input_btxt = timed('read', SixyIO.stdin_get_b().read, in_on=False)()
+
+                input_utxt = timed('decode', sio.stdie_to_u)(input_btxt)
+            except Exception as e:
+                return on_input_err(e)
         
     #/ 3cP3Fst
-    assert SixyIO.is_u(input_utxt)
+    assert passthrough_on or input_utxt_s is not None or SixyIO.is_u(input_utxt)
     
     output_utxt = input_utxt
+
+    subproc_pump_s = []
+    ## Pumps of the subprocs, one per pipeline stage or pool worker.
+
+    subproc_err_ret_v_s = []
+    ## Exit codes of errors handled in subproc pump threads.
     
     #/ 2eTGHcd
-    subproc_cmd_stxt = args_obj.subproc_cmd
+    subproc_cmd_stxt_s = args_obj.subproc_cmd_s or []
+    ## Each |--sp| is a pipeline stage.
     
-    if subproc_cmd_stxt is not None:
+    #/ 5Vn2Hq7
+    worker_count = args_obj.worker_count
+    ## Set if run in worker pool mode.
+
+    if worker_count:
+        #/
+        if len(subproc_cmd_stxt_s) != 1:
+            parser.error(tt('Lw6cZj1'))
+
+        #/
+        ## With separator framing, results are split at the separator byte
+        ##  before being decoded.
+        if not args_obj.worker_len_on:
+            for encoding in (sio.spie, sio.spoe):
+                if not SixyIO.record_sep_is_byte_safe(record_sep, encoding):
+                    parser.error(SixyIO.format(tt('Ry2kPn8'), encoding))
+
+    if subproc_cmd_stxt_s:
         #/ 5gmWFQl
-        
-        #/ 7kqdgx5
-        try:
-            subproc_cmd_utxt = sio.cae_to_u(subproc_cmd_stxt)
-        except Exception:
-            #/ 8v9cD4R
-            sio.stderr_print_fmt_safe(tt('CWhvSZG'), sio.cae_utxt)
-    
-            if sio.cae != SixyIO.STDIE:
-                sio.stderr_print_fmt_safe(tt('FdgFTmj'), SixyIO.STDIE_UTXT)
-    
+        ## Imported here to keep startup fast when no subproc is run.
+        import subprocess
+
+        #/ 8GbTnL3
+        ## Stage 0 uses |sio|. Other stages have their own object, because
+        ##  |--spie|, |--spoe|, and |--spee| can be given per stage.
+        stage_sio_s = [sio]
+
+        for stage_idx in range(1, len(subproc_cmd_stxt_s)):
             #/
-            if debug_on:
-                sio.stderr_write_tb_safe()
-    
-            #/ 4b5BwuP
-            return MAIN_RET_V_DECODE_SUBPROC_CMD_ERR
+            stage_sio = make_sixyio_obj(args_obj, stage_idx=stage_idx)
+
+            if sio.err_stats_d is not None:
+                stage_sio.err_stats_enable(errors=decode_errors, err_stats_d=sio.err_stats_d)
+
+            stage_sio_s.append(stage_sio)
+
+        #/
+        stage_cmd_part_s_s = []
+        ## Argument list of each stage, or the whole command if run via the
+        ##  shell.
+
+        for subproc_cmd_stxt in subproc_cmd_stxt_s:
+            #/ 7kqdgx5
+            try:
+                subproc_cmd_utxt = sio.cae_to_u(subproc_cmd_stxt)
+            except Exception:
+                #/ 8v9cD4R
+                sio.stderr_print_fmt_safe(tt('CWhvSZG'), sio.cae_utxt)
         
-        #/ 9adD1em
-        try:
-            subproc_cmd_btxt = sio.spce_to_b(subproc_cmd_utxt)
-        except Exception:
-            #/ 7hs0meB
-            sio.stderr_print_fmt_safe(tt('Dm3mIS3'), sio.spce_utxt)
-    
-            if sio.spce != SixyIO.STDIE:
-                sio.stderr_print_fmt_safe(tt('BItk9r9'), SixyIO.STDIE_UTXT)
-    
-            #/
-            if debug_on:
-                sio.stderr_write_tb_safe()
-    
-            #/ 5ckdfD8
-            return MAIN_RET_V_DECODE_SUBPROC_CMD_ERR
+                if sio.cae != SixyIO.STDIE:
+                    sio.stderr_print_fmt_safe(tt('FdgFTmj'), SixyIO.STDIE_UTXT)
         
-        #/ 6ahDu4o
-        subproc_cmd_arg_sep_stxt = args_obj.subproc_cmd_arg_sep
-        ## can be None. None means split by whitespaces. 
+                #/
+                if debug_on:
+                    sio.stderr_write_tb_safe()
         
-        #/
-        if not subproc_cmd_arg_sep_stxt:
-            subproc_cmd_btxt_part_s = subproc_cmd_btxt.split()
-        else:
-            subproc_cmd_arg_sep_btxt = SixyIO.to_b_safe(subproc_cmd_arg_sep_stxt, encoding='ascii')
+                #/ 4b5BwuP
+                return MAIN_RET_V_DECODE_SUBPROC_CMD_ERR
             
-            subproc_cmd_btxt_part_s = subproc_cmd_btxt.split(subproc_cmd_arg_sep_btxt)
+            #/ 9adD1em
+            try:
+                subproc_cmd_btxt = sio.spce_to_b(subproc_cmd_utxt)
+            except Exception:
+                #/ 7hs0meB
+                sio.stderr_print_fmt_safe(tt('Dm3mIS3'), sio.spce_utxt)
         
-        #/ 4mwJcw7
-        try:
-            subproc_stdin_btxt = sio.spie_to_b(output_utxt)
-        except Exception:
+                if sio.spce != SixyIO.STDIE:
+                    sio.stderr_print_fmt_safe(tt('BItk9r9'), SixyIO.STDIE_UTXT)
+        
+                #/
+                if debug_on:
+                    sio.stderr_write_tb_safe()
+        
+                #/ 5ckdfD8
+                return MAIN_RET_V_DECODE_SUBPROC_CMD_ERR
+            
+            #/ 3vKe8Tn
+            ## The shell splits the command itself.
+            if args_obj.subproc_shell_on:
+                stage_cmd_part_s_s.append(subproc_cmd_btxt)
+
+                continue
+
+            #/ 6ahDu4o
+            subproc_cmd_arg_sep_stxt = args_obj.subproc_cmd_arg_sep
+            ## can be None. None means split by whitespaces. 
+            
+            #/
+            if not subproc_cmd_arg_sep_stxt:
+                subproc_cmd_btxt_part_s = subproc_cmd_btxt.split()
+            else:
+                subproc_cmd_arg_sep_btxt = SixyIO.to_b_safe(subproc_cmd_arg_sep_stxt, encoding='ascii')
+                
+                subproc_cmd_btxt_part_s = subproc_cmd_btxt.split(subproc_cmd_arg_sep_btxt)
+
+            #/
+            stage_cmd_part_s_s.append(subproc_cmd_btxt_part_s)
+
+        #/
+        def on_subproc_stdin_err(e, sio=sio):
             #/ 3sb9l3k
             sio.stderr_print_fmt_safe(tt('BdLRCnr'), sio.spie_utxt)
     
@@ -567,18 +1606,9 @@ def main():
     
             #/ 3fQOwsV
             return MAIN_RET_V_ENCODE_SUBPROC_INPUT_ERR
-        
-        #/ 6mWJVnP
-        try:
-            proc_obj = subprocess.Popen(subproc_cmd_btxt_part_s,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                shell=True,
-            )
-            
-            stdout_stderr_tuple = proc_obj.communicate(subproc_stdin_btxt)
-        except Exception:
+
+        #/
+        def on_subproc_run_err(e):
             #/ 5wPPeO4
             sio.stderr_print_safe(tt('FsfEwqB'))
     
@@ -588,16 +1618,9 @@ def main():
     
             #/ 7wXi8nl
             return MAIN_RET_V_RUN_SUBPROC_ERR
-        
-        #/ 3hP3mlZ
-        try:
-            subproc_stderr_btxt = stdout_stderr_tuple[1]
-            
-            if not subproc_stderr_btxt:
-                subproc_stderr_utxt = ''
-            else:
-                subproc_stderr_utxt = sio.spee_to_u(subproc_stderr_btxt)
-        except Exception:
+
+        #/
+        def on_subproc_stderr_err(e, sio=sio):
             #/ 6qzI4yL
             sio.stderr_print_fmt_safe(tt('DKm86F3'), sio.spee_utxt)
     
@@ -610,33 +1633,21 @@ def main():
     
             #/ 4zyralJ
             return MAIN_RET_V_DECODE_SUBPROC_STDERR_ERR
-        
+
         #/
-        if subproc_stderr_utxt:
-            #/ 7qcEsZD
-            try:
-                sio.stderr_write_fmt_safe('#/ Subproc stderr\n---\n{}---\n', subproc_stderr_utxt)
-            except Exception as e:
-                #/ 8cijfJr
-                sio.stderr_print_safe(tt('E2z7epN'))
-        
-                #/
-                if debug_on:
-                    sio.stderr_write_tb_safe()
-        
-                #/ 8kLQbwx
-                return MAIN_RET_V_WRITE_SUBPROC_STDERR_TO_STDERR_ERR
-        
-        #/ 2nnZF4R
-        try:
-            subproc_stdout_btxt = stdout_stderr_tuple[0]
-            
-            if not subproc_stdout_btxt:
-                subproc_stdout_utxt = ''
-            else:
-                subproc_stdout_utxt = sio.spoe_to_u(subproc_stdout_btxt)
-                
-        except Exception:
+        def on_subproc_stderr_write_err(e):
+            #/ 8cijfJr
+            sio.stderr_print_safe(tt('E2z7epN'))
+    
+            #/
+            if debug_on:
+                sio.stderr_write_tb_safe()
+    
+            #/ 8kLQbwx
+            return MAIN_RET_V_WRITE_SUBPROC_STDERR_TO_STDERR_ERR
+
+        #/
+        def on_subproc_stdout_err(e, sio=sio):
             #/ 5tAqT6m
             sio.stderr_print_fmt_safe(tt('GRzLy3z'), sio.spoe_utxt)
     
@@ -649,14 +1660,346 @@ def main():
     
             #/ 9csU4iB
             return MAIN_RET_V_DECODE_SUBPROC_STDOUT_ERR
-        
-        #/ 8k3qpHj
-        output_utxt = subproc_stdout_utxt
-        
-    #/
-    assert SixyIO.is_u(output_utxt)
+
+        #/ 4pQm7Ya
+        ## Subprocs run via pumps, which feed stdin and drain stdout and stderr
+        ##  in chunks, so that memory stays bounded and output is forwarded as
+        ##  it arrives. Data is not collected between pipeline stages.
+        ## Input read as a whole is fed in chunks too.
+        if input_utxt_s is None:
+            input_utxt_s = SixyIO.iter_split(output_utxt, chunk_size)
+
+            output_utxt = None
+
+        #/
+        def iter_subproc_stdin_btxt(input_utxt_s=input_utxt_s, on_input_err=on_input_err):
+            #/
+            encode = timed('subproc_encode', SixyIO.make_encoder(sio.spie).encode)
+
+            #/
+            while True:
+                #/
+                try:
+                    utxt = next(input_utxt_s)
+                except StopIteration:
+                    break
+                except Exception as e:
+                    subproc_err_ret_v_s.append(on_input_err(e))
+                    return
+
+                #/ 4mwJcw7
+                try:
+                    btxt = encode(utxt)
+                except Exception as e:
+                    subproc_err_ret_v_s.append(on_subproc_stdin_err(e))
+                    return
+
+                #/
+                if btxt:
+                    yield btxt
+
+            #/
+            try:
+                btxt = encode('', True)
+            except Exception as e:
+                subproc_err_ret_v_s.append(on_subproc_stdin_err(e))
+                return
+
+            if btxt:
+                yield btxt
+
+        #/
+        def make_stderr_consume(stage_idx, stage_sio):
+            #/
+            if len(stage_sio_s) == 1:
+                header = '#/ Subproc stderr\n---\n'
+            else:
+                header = SixyIO.format('#/ Subproc {} stderr\n---\n', str(stage_idx + 1))
+
+            #/
+            def consume_subproc_stderr(file_b):
+                #/
+                header_written = []
+
+                #/
+                def write(utxt):
+                    #/ 7qcEsZD
+                    if not header_written:
+                        sio.stderr_write_safe(header)
+
+                        header_written.append(True)
+
+                    sio.stderr_write_safe(utxt)
+
+                #/ 3hP3mlZ
+                ret_v = write_utxt_s(
+                    stage_sio.spee_iter_u(file_b, chunk_size=chunk_size),
+                    write=write,
+                    on_read_err=lambda e: on_subproc_stderr_err(e, stage_sio),
+                    on_write_err=on_subproc_stderr_write_err,
+                )
+
+                if ret_v is not None:
+                    subproc_err_ret_v_s.append(ret_v)
+                elif header_written:
+                    sio.stderr_write_safe('---\n')
+
+            #/
+            return consume_subproc_stderr
+
+        #/
+        if stats is not None:
+            subproc_wall_start = time.perf_counter()
+
+            subproc_cpu_start = get_children_cpu_time()
+
+        #/ 7Hq2wPz
+        ## Worker pool. Records are sent to long-lived workers, and their
+        ##  results are read back in input order.
+        if worker_count:
+            #/
+            open_record_idx_s = []
+            ## Index of the last record if input does not end with the
+            ##  separator. Its result is written without one, as in |--rec|.
+
+            #/
+            def iter_subproc_record_btxt(input_utxt_s=input_utxt_s, on_input_err=on_input_err):
+                #/
+                encode = timed('subproc_encode', sio.spie_to_b)
+
+                #/
+                input_done_s = []
+
+                def iter_input_utxt():
+                    #/
+                    for utxt in input_utxt_s:
+                        yield utxt
+
+                    #/
+                    input_done_s.append(True)
+
+                #/
+                record_utxt_s = SixyIO.iter_records(iter_input_utxt(), record_sep)
+
+                record_idx = 0
+
+                #/
+                while True:
+                    #/
+                    try:
+                        utxt = next(record_utxt_s)
+                    except StopIteration:
+                        break
+                    except Exception as e:
+                        subproc_err_ret_v_s.append(on_input_err(e))
+                        return
+
+                    #/
+                    ## |iter_records| yields a record after input ends only if
+                    ##  it is not ended by the separator. Set before the record
+                    ##  is sent, so before its result is read.
+                    if input_done_s:
+                        open_record_idx_s.append(record_idx)
+
+                    record_idx += 1
+
+                    #/ 4mwJcw7
+                    try:
+                        btxt = encode(utxt)
+                    except Exception as e:
+                        subproc_err_ret_v_s.append(on_subproc_stdin_err(e))
+                        return
+
+                    #/
+                    yield btxt
+
+            #/
+            subproc_pool = SubprocPool(stage_cmd_part_s_s[0],
+                worker_count=worker_count,
+                sep=None if args_obj.worker_len_on else sio.spie_to_b(record_sep),
+                shell=args_obj.subproc_shell_on,
+                chunk_size=chunk_size,
+            )
+
+            #/
+            try:
+                subproc_pool.start(
+                    iter_subproc_record_btxt(),
+                    stderr_consume=lambda worker_idx, file_b: make_stderr_consume(0, sio)(file_b),
+                )
+            except Exception as e:
+                return on_subproc_run_err(e)
+
+            subproc_pump_s.extend(subproc_pool.pump_s)
+
+            #/ 2nnZF4R
+            def iter_subproc_result_utxt():
+                #/
+                decode = timed('subproc_decode', sio.spoe_to_u)
+
+                #/
+                ## Results at hand are written in one chunk. A chunk is
+                ##  ended when no record is waiting for its result, so
+                ##  that results of a slow input are not held back.
+                utxt_s = []
+
+                utxt_s_len = 0
+
+                result_btxt_s = iter(subproc_pool)
+
+                result_idx = 0
+
+                while True:
+                    #/
+                    try:
+                        utxt = decode(next(result_btxt_s))
+                    except StopIteration:
+                        break
+                    except Exception:
+                        #/
+                        ## Write the results before the error.
+                        if utxt_s:
+                            yield ''.join(utxt_s)
+
+                        raise
+
+                    #/
+                    utxt_s.append(utxt)
+
+                    utxt_s_len += len(utxt)
+
+                    if result_idx not in open_record_idx_s:
+                        #/
+                        utxt_s.append(record_sep)
+
+                        utxt_s_len += len(record_sep)
+
+                    result_idx += 1
+
+                    #/
+                    if utxt_s_len >= chunk_size or not subproc_pool.pending_count():
+                        yield ''.join(utxt_s)
+
+                        utxt_s = []
+
+                        utxt_s_len = 0
+
+                #/
+                if utxt_s:
+                    yield ''.join(utxt_s)
+
+            input_utxt_s = iter_subproc_result_utxt()
+
+            #/
+            def on_input_err(e):
+                #/
+                if isinstance(e, EOFError):
+                    #/ 6Lr9Xwe
+                    sio.stderr_print_safe(tt('Xk8bRw3'))
+
+                    #/
+                    if debug_on:
+                        sio.stderr_write_tb_safe()
+
+                    #/
+                    return MAIN_RET_V_RUN_SUBPROC_ERR
+
+                #/
+                return on_subproc_stdout_err(e)
+        #/
+        else:
+            #/ 6Tz0uDb
+            prev_proc_obj = None
+
+            for stage_idx, stage_sio in enumerate(stage_sio_s):
+                #/ 2WcXe5N
+                if prev_proc_obj is None:
+                    #/
+                    stdin_arg = subprocess.PIPE
+
+                    stdin_btxt_s = iter_subproc_stdin_btxt()
+                else:
+                    #/
+                    prev_sio = stage_sio_s[stage_idx - 1]
+
+                    #/ 8Yq3vMs
+                    ## Same encoding on both sides. Connect the two subprocs
+                    ##  directly by an OS pipe. No data passes through us.
+                    if prev_sio.spoe != SixyIO.ENCODING_AUTO \
+                    and SixyIO.codec_name(prev_sio.spoe) == SixyIO.codec_name(stage_sio.spie):
+                        stdin_arg = prev_proc_obj.stdout
+
+                        stdin_btxt_s = None
+                    #/ 5rFk0Jt
+                    ## Different encodings. Transcode in a pump thread.
+                    else:
+                        stdin_arg = subprocess.PIPE
+
+                        stdin_btxt_s = timed_iter('subproc_transcode', SixyIO.iter_transcode(
+                            prev_proc_obj.stdout,
+                            from_encoding=prev_sio.spoe,
+                            to_encoding=stage_sio.spie,
+                            chunk_size=chunk_size,
+                        ))
+
+                #/
+                try:
+                    proc_obj = SixyIO.spawn(stage_cmd_part_s_s[stage_idx],
+                        shell=args_obj.subproc_shell_on,
+                        stdin=stdin_arg,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.PIPE,
+                    )
+                except Exception as e:
+                    #/
+                    for subproc_pump in subproc_pump_s:
+                        subproc_pump.abort()
+
+                    return on_subproc_run_err(e)
+
+                #/
+                ## Only the next stage should hold the pipe, so that it gets
+                ##  EOF and the previous stage gets SIGPIPE as usual.
+                if stdin_arg is not subprocess.PIPE:
+                    prev_proc_obj.stdout.close()
+
+                #/ 5KxZf1s
+                subproc_pump = SubprocPump(proc_obj, chunk_size=chunk_size)
+
+                subproc_pump.start(
+                    stdin_btxt_s=stdin_btxt_s,
+                    stderr_consume=make_stderr_consume(stage_idx, stage_sio),
+                )
+
+                subproc_pump_s.append(subproc_pump)
+
+                #/
+                prev_proc_obj = proc_obj
+
+            #/ 2nnZF4R
+            ## Last subproc's stdout is decoded in the main thread while it
+            ##  arrives.
+            last_sio = stage_sio_s[-1]
+
+            ## Reads wait for the subproc. Their time is moved to stage
+            ##  |subproc_read|.
+            input_utxt_s = timed_iter('subproc_decode', last_sio.spoe_iter_u(
+                timed_reader('subproc_read', prev_proc_obj.stdout, parent='subproc_decode'),
+                chunk_size=chunk_size,
+            ))
+
+            on_input_err = lambda e: on_subproc_stdout_err(e, last_sio)
         
     #/ 8fwlpZy
+    if passthrough_on:
+        output_utxt_s = None
+    elif input_utxt_s is not None:
+        output_utxt_s = input_utxt_s
+    else:
+        #/
+        assert SixyIO.is_u(output_utxt)
+
+        output_utxt_s = iter([output_utxt])
 
     #/
     output_file_path_stxt = args_obj.output_file_path
@@ -695,40 +2038,38 @@ def main():
             output_file_dir, output_file_name = os.path.split(output_file_path)
             
             #/
-            if esc_to_space or esc_to_empty:
-                #/
-                esc_char = ' ' if esc_to_space else ''
-        
-                output_file_name = output_file_name\
-                    .replace('\\', esc_char)\
-                    .replace('/', esc_char)\
-                    .replace('<', esc_char)\
-                    .replace('>', esc_char)\
-                    .replace(':', esc_char)\
-                    .replace('*', esc_char)\
-                    .replace('?', esc_char)\
-                    .replace('"', esc_char)\
-                    .replace('|', esc_char)
+            if esc_to_space:
+                esc_mode = SixyIO.FILENAME_ESC_SPACE
+            elif esc_to_empty:
+                esc_mode = SixyIO.FILENAME_ESC_EMPTY
             elif esc_to_notation:
-                output_file_name = output_file_name\
-                    .replace('\\', '%5C')\
-                    .replace('/', '%2F')\
-                    .replace('<', '%3C')\
-                    .replace('>', '%3E')\
-                    .replace(':', '%3A')\
-                    .replace('*', '%2A')\
-                    .replace('?', '%3F')\
-                    .replace('"', '%22')\
-                    .replace('|', '%7C')
+                esc_mode = SixyIO.FILENAME_ESC_NOTATION
             else:
                 assert False
+
+            #/
+            output_file_name = SixyIO.filename_esc(output_file_name, esc_mode)
                 
             #/
             output_file_path = os.path.join(output_file_dir, output_file_name)
     
         #/ 8tKpz6C
+        atomic_on = args_obj.atomic_on or args_obj.fsync_policy is not None
+
+        #/ 6Zq4Hw8
+        ## Opening the input file for output would truncate it before it is
+        ##  read, e.g. in passthrough or stream mode. Write a temp file and
+        ##  rename it over the input file instead.
+        if input_file is not None and SixyIO.is_same_file(input_file, output_file_path):
+            atomic_on = True
+
         try:
-            output_file = sio.open_out(output_file_path)
+            ## With stats or in record mode, output is encoded by
+            ##  |make_encode_write|.
+            if passthrough_on or stats is not None or record_on:
+                output_file = sio.open_out_b(output_file_path, atomic=atomic_on, fsync=args_obj.fsync_policy)
+            else:
+                output_file = sio.open_out(output_file_path, engine='io', atomic=atomic_on, fsync=args_obj.fsync_policy)
         except Exception:
             #/ 3qDTzam
             sio.stderr_print_fmt_safe(tt('IRQoaLq'), output_file_path)
@@ -737,14 +2078,15 @@ def main():
             if debug_on:
                 sio.stderr_write_tb_safe()
     
+            #/
+            for subproc_pump in subproc_pump_s:
+                subproc_pump.abort()
+
             #/ 3mQGvRY
-            return
-    
-        #/ 2zli7tD
-        try:
-            with output_file:
-                output_file.write(output_utxt)
-        except Exception as e:
+            return MAIN_RET_V_OPEN_OUTPUT_FILE_ERR
+
+        #/
+        def on_output_err(e):
             #/ 4srhuSj
             if isinstance(e, UnicodeEncodeError):
                 sio.stderr_print_fmt_safe(tt('HshHpp0'), sio.ofe_utxt, output_file_path)
@@ -756,13 +2098,54 @@ def main():
                 sio.stderr_write_tb_safe()
             
             #/ 8sXeIhg
-            return
-    #/
-    else:
-        #/ 4uXYGqG
+            return MAIN_RET_V_WRITE_OUTPUT_FILE_ERR
+    
+        #/ 2zli7tD
         try:
-            sio.stdout_write(output_utxt)
+            with output_file:
+                if passthrough_on:
+                    ret_v = timed('passthrough', copy_passthrough, in_on=False, out_on=False)(
+                        input_file_b,
+                        output_file,
+                        encoding=passthrough_encoding,
+                        on_read_err=counted('passthrough', on_input_err),
+                        on_write_err=on_output_err,
+                        chunk_size=chunk_size,
+                        stats=stats,
+                    )
+                elif stats is not None or record_on:
+                    #/
+                    write, close = make_encode_write(sio.ofe, output_file,
+                        stats=stats,
+                        thread_on=record_on,
+                    )
+
+                    ret_v = write_utxt_s(
+                        output_utxt_s,
+                        write=write,
+                        on_read_err=on_input_err,
+                        on_write_err=on_output_err,
+                    )
+
+                    close(abort=ret_v is not None)
+                else:
+                    ret_v = write_utxt_s(
+                        output_utxt_s,
+                        write=output_file.write,
+                        on_read_err=on_input_err,
+                        on_write_err=on_output_err,
+                    )
+
+                #/
+                ## Keep the old file if failed.
+                if ret_v is not None and atomic_on:
+                    output_file.abort()
         except Exception as e:
+            ret_v = on_output_err(e)
+    #/
+    else:
+        #/
+        def on_output_err(e):
             #/ 9sufbR0
             if isinstance(e, UnicodeEncodeError):
                 sio.stderr_print_fmt_safe(tt('ARUsbv8'), sio.stdoe_utxt)
@@ -775,9 +2158,116 @@ def main():
     
             #/ 8da437J
             return MAIN_RET_V_WRITE_STDOUT_ERR
-    
-    #/ 3jB9xDg
-    return MAIN_RET_V_OK
+
+        #/ 4uXYGqG
+        if passthrough_on:
+            ret_v = timed('passthrough', copy_passthrough, in_on=False, out_on=False)(
+                input_file_b,
+                SixyIO.stdout_get_b(),
+                encoding=passthrough_encoding,
+                on_read_err=counted('passthrough', on_input_err),
+                on_write_err=on_output_err,
+                chunk_size=chunk_size,
+                flush=stream_on,
+                stats=stats,
+            )
+        elif stats is not None or record_on:
+            #/
+            write, close = make_encode_write(sio.stdoe, SixyIO.stdout_get_b(),
+                flush_on=stream_on,
+                stats=stats,
+                thread_on=record_on,
+            )
+
+            ret_v = write_utxt_s(
+                output_utxt_s,
+                write=write,
+                on_read_err=on_input_err,
+                on_write_err=on_output_err,
+            )
+
+            #/
+            try:
+                close(abort=ret_v is not None)
+            except Exception as e:
+                ret_v = on_output_err(e)
+        elif stream_on:
+            #/ 2Hvd5Mk
+            ## Flush each chunk so that output is seen as soon as it is ready.
+            stdout_writer = sio.stdout_make_writer()
+
+            ret_v = write_utxt_s(
+                output_utxt_s,
+                write=stdout_writer.write,
+                on_read_err=on_input_err,
+                on_write_err=on_output_err,
+                flush=stdout_writer.flush,
+            )
+        else:
+            ret_v = write_utxt_s(
+                output_utxt_s,
+                write=sio.stdout_write,
+                on_read_err=on_input_err,
+                on_write_err=on_output_err,
+            )
+
+    #/ 6hWpR3e
+    if subproc_pump_s:
+        #/
+        if ret_v is not None:
+            ## Output failed. Subproc output is no longer wanted.
+            for subproc_pump in subproc_pump_s:
+                subproc_pump.abort()
+        else:
+            #/
+            for subproc_pump in subproc_pump_s:
+                subproc_pump.wait()
+
+        #/
+        ## Wall time from the first start to the last exit. CPU time of all
+        ##  stages' processes.
+        if stats is not None:
+            stats.add('subproc',
+                call_count=len(subproc_pump_s),
+                wall_s=time.perf_counter() - subproc_wall_start,
+                cpu_s=get_children_cpu_time() - subproc_cpu_start,
+            )
+
+        #/
+        if ret_v is None:
+            #/
+            if subproc_err_ret_v_s:
+                ret_v = subproc_err_ret_v_s[0]
+            else:
+                #/
+                for stage_idx, subproc_pump in enumerate(subproc_pump_s):
+                    #/
+                    exc_info = subproc_pump.stdin_exc_info
+
+                    if exc_info is not None:
+                        #/
+                        ## Stages other than the first are fed by transcoding
+                        ##  the previous stage's stdout.
+                        if stage_idx > 0 and isinstance(exc_info[1], UnicodeDecodeError):
+                            ret_v = call_with_exc_info(on_subproc_stdout_err, exc_info, stage_sio_s[stage_idx - 1])
+                        elif stage_idx > 0 and isinstance(exc_info[1], UnicodeEncodeError):
+                            ret_v = call_with_exc_info(on_subproc_stdin_err, exc_info, stage_sio_s[stage_idx])
+                        else:
+                            ret_v = call_with_exc_info(on_subproc_run_err, exc_info)
+
+                        break
+
+                    #/
+                    exc_info = subproc_pump.stderr_exc_info
+
+                    if exc_info is not None:
+                        ret_v = call_with_exc_info(on_subproc_run_err, exc_info)
+
+                        break
+
+    #/
+    return ret_v
+
 
 if __name__ == '__main__':
     try:
@@ -0,0 +1,644 @@
+# coding: utf-8
+"""
+File ID: 4Ns8Kw2
+
+Server mode of |aoiksixyioexp|. Listen on a Unix domain socket, and run
+|aoiksixyioexp.main| in a forked child for each request of client
+|aoiksixyiocli|, so that requests skip interpreter startup and imports, and
+reuse the codecs and validated |SixyIOObj| profiles warmed up here.
+
+The client sends its cmd args, working directory, environment, and the
+encodings of its stdio, with its stdin, stdout, and stderr file descriptors
+attached. The child reads and writes these directly, so output is streamed
+to the client's stdout as it is produced.
+
+Request: 4-byte big-endian body length, then the body. The body is fields
+joined by NUL: protocol version, working directory, encoding and errors of
+stdin, stdout, and stderr, arg count, the args, then the environment as
+|NAME=VALUE| items.
+
+Reply: 4-byte big-endian pid of the child, then 4-byte big-endian exit code
+when the child is done.
+"""
+
+from aoiksixyio import SixyIO
+import os
+import struct
+import sys
+
+#/
+PROTOCOL_VER = b'1'
+
+HEAD_FMT = '!I'
+## Format of request body length.
+
+REPLY_FMT = '!i'
+## Format of reply items.
+
+RECV_SIZE = 64 * 1024
+
+FD_COUNT = 3
+## Stdin, stdout, and stderr.
+
+LISTEN_BACKLOG = 128
+
+REAP_INTERVAL = 1.0
+## Seconds between reaping exited children when idle.
+
+SOCK_PATH_ENV_NAME = 'AOIKSIXYIO_SOCK'
+
+SOCK_FILE_NAME = 'srv.sock'
+
+def get_sock_dir():
+    """
+    Per-user directory of the default socket, in |XDG_RUNTIME_DIR| or
+    |/tmp|. |aoiksixyiocli.get_sock_dir| is the same.
+    """
+    #/
+    dir_path = os.environ.get('XDG_RUNTIME_DIR') or '/tmp'
+
+    return os.path.join(dir_path, 'aoiksixyio-{}'.format(os.getuid()))
+
+def get_sock_path():
+    """
+    Socket path from env var |AOIKSIXYIO_SOCK|, otherwise |SOCK_FILE_NAME|
+    in |get_sock_dir|. |aoiksixyiocli.get_sock_path| is the same.
+    """
+    #/
+    sock_path = os.environ.get(SOCK_PATH_ENV_NAME)
+
+    if sock_path:
+        return sock_path
+
+    #/
+    return os.path.join(get_sock_dir(), SOCK_FILE_NAME)
+
+def make_sock_dir(dir_path):
+    """
+    Create directory |dir_path| accessible only to the current user, or check
+    that an existing one is. Raise |EnvironmentError| if it is not, e.g. it
+    was created by another user to catch the clients' requests.
+    """
+    import errno
+    import stat
+
+    #/
+    try:
+        os.mkdir(dir_path, 0o700)
+    except EnvironmentError as e:
+        if e.errno != errno.EEXIST:
+            raise
+
+    #/
+    dir_stat = os.lstat(dir_path)
+
+    if not stat.S_ISDIR(dir_stat.st_mode) \
+    or dir_stat.st_uid != os.getuid() \
+    or dir_stat.st_mode & 0o077:
+        raise EnvironmentError(errno.EPERM, os.strerror(errno.EPERM), dir_path)
+
+def get_peer_uid(sock):
+    """
+    User id of the process at the other end of Unix domain socket |sock|, or
+    None if the platform does not tell.
+    """
+    import socket
+
+    #/
+    peer_cred_opt = getattr(socket, 'SO_PEERCRED', None)
+
+    if peer_cred_opt is None:
+        return None
+
+    #/
+    ## |struct ucred| of pid, uid, and gid.
+    cred_fmt = '3i'
+
+    cred_btxt = sock.getsockopt(socket.SOL_SOCKET, peer_cred_opt, struct.calcsize(cred_fmt))
+
+    #/
+    return struct.unpack(cred_fmt, cred_btxt)[1]
+
+#/
+def warm_up(warm_arg_s_s, tt):
+    """
+    Import what |aoiksixyioexp.main| imports lazily, and create a |SixyIOObj|
+    for the default encodings and for each list of cmd args in
+    |warm_arg_s_s|, so that forked children find their codecs and validated
+    profiles cached.
+    """
+    #/
+    from argparse import ArgumentParser
+    from argparse import HelpFormatter
+    import subprocess
+    import threading
+
+    try:
+        import queue
+    except ImportError:
+        import Queue as queue
+
+    from aoiksixyio import aoiksixyioexp
+
+    #/
+    for encoding in ('utf-8', 'ascii', 'latin-1', 'utf-16', SixyIO.LCE):
+        SixyIO.codec_info(encoding)
+
+    #/
+    parser = aoiksixyioexp.make_arg_parser(
+        cls=ArgumentParser,
+        tt=lambda key: aoiksixyioexp.TT_D[key],
+        formatter_cls=HelpFormatter,
+    )
+
+    #/
+    for arg_s in [[]] + list(warm_arg_s_s):
+        #/
+        args_obj, _ = parser.parse_known_args(args=arg_s)
+
+        ## Exits with a message on an invalid encoding.
+        aoiksixyioexp.make_sixyio_obj(args_obj)
+
+#/
+def listen(sock_path):
+    """
+    Return a Unix domain socket listening on |sock_path|, accessible only to
+    the current user.
+
+    A socket file left by a server that is gone is removed. Raise
+    |EnvironmentError| if another server is listening on |sock_path|.
+    """
+    import errno
+    import socket
+
+    #/
+    if os.path.exists(sock_path):
+        #/
+        probe_sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+        try:
+            probe_sock.connect(sock_path)
+        except EnvironmentError as e:
+            #/
+            if e.errno != errno.ECONNREFUSED:
+                raise
+
+            os.unlink(sock_path)
+        else:
+            raise EnvironmentError(errno.EADDRINUSE, os.strerror(errno.EADDRINUSE), sock_path)
+        finally:
+            probe_sock.close()
+
+    #/
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    ## The client's file descriptors are handed to the children, so only the
+    ##  owner may connect. Connections are also checked by |get_peer_uid|.
+    old_umask = os.umask(0o177)
+
+    try:
+        sock.bind(sock_path)
+    finally:
+        os.umask(old_umask)
+
+    sock.listen(LISTEN_BACKLOG)
+
+    #/
+    return sock
+
+#/
+def recv_request(conn):
+    """
+    Read a request from connection |conn|.
+
+    Return a tuple of the file descriptors received, and the list of body
+    fields. Return None if the request is malformed, after closing the file
+    descriptors received.
+    """
+    import array
+    import socket
+
+    #/
+    fd_s = []
+
+    fd_size = array.array('i').itemsize
+
+    #/
+    btxt, anc_data_s, _, _ = conn.recvmsg(RECV_SIZE, socket.CMSG_SPACE(FD_COUNT * fd_size))
+
+    for level, anc_type, anc_data in anc_data_s:
+        #/
+        if level == socket.SOL_SOCKET and anc_type == socket.SCM_RIGHTS:
+            #/
+            fd_arr = array.array('i')
+
+            fd_arr.frombytes(anc_data[:len(anc_data) - len(anc_data) % fd_size])
+
+            fd_s.extend(fd_arr)
+
+    #/
+    head_size = struct.calcsize(HEAD_FMT)
+
+    btxt_s = [btxt]
+
+    size = len(btxt)
+
+    body_size = None
+
+    while True:
+        #/
+        if body_size is None and size >= head_size:
+            btxt = b''.join(btxt_s)
+
+            btxt_s = [btxt]
+
+            body_size = struct.unpack(HEAD_FMT, btxt[:head_size])[0]
+
+        #/
+        if body_size is not None and size >= head_size + body_size:
+            break
+
+        #/
+        btxt = conn.recv(RECV_SIZE)
+
+        if not btxt:
+            break
+
+        btxt_s.append(btxt)
+
+        size += len(btxt)
+
+    #/
+    btxt = b''.join(btxt_s)
+
+    field_s = btxt[head_size:].split(b'\0')
+
+    #/
+    if len(fd_s) != FD_COUNT \
+    or body_size is None \
+    or len(btxt) != head_size + body_size \
+    or field_s[0] != PROTOCOL_VER:
+        #/
+        for fd in fd_s:
+            os.close(fd)
+
+        return None
+
+    #/
+    return fd_s, field_s
+
+def make_std_stream(fd, encoding, errors, mode):
+    """
+    Text stream over file descriptor |fd|, set up the way Python sets up
+    |sys.stdin|, |sys.stdout|, and |sys.stderr|.
+    """
+    import io
+
+    #/
+    file_b = io.open(fd, mode, closefd=False)
+
+    #/
+    return io.TextIOWrapper(file_b,
+        encoding=encoding,
+        errors=errors,
+        line_buffering=fd == 2 or os.isatty(fd),
+    )
+
+def run_request(conn, fd_s, field_s, tt):
+    """
+    Run a request in a forked child. Take over the client's stdio, working
+    directory, and environment, then call |aoiksixyioexp.main|.
+
+    Return the exit code.
+    """
+    from aoiksixyio import aoiksixyioexp
+
+    #/
+    ## Detach from the server's terminal, so that reading the client's
+    ##  terminal is not stopped by job control.
+    os.setsid()
+
+    #/
+    for std_fd, fd in enumerate(fd_s):
+        #/
+        os.dup2(fd, std_fd)
+
+        if fd > 2:
+            os.close(fd)
+
+    #/
+    cwd_b = field_s[1]
+
+    std_encoding_s = [x.decode('ascii') for x in field_s[2:8]]
+
+    arg_count = int(field_s[8])
+
+    arg_s = [os.fsdecode(x) for x in field_s[9:9 + arg_count]]
+
+    env_item_s = field_s[9 + arg_count:]
+
+    #/
+    sys.stdin = make_std_stream(0, std_encoding_s[0], std_encoding_s[1], 'rb')
+
+    sys.stdout = make_std_stream(1, std_encoding_s[2], std_encoding_s[3], 'wb')
+
+    sys.stderr = make_std_stream(2, std_encoding_s[4], std_encoding_s[5], 'wb')
+
+    #/
+    os.environb.clear()
+
+    for item in env_item_s:
+        #/
+        name, sep, value = item.partition(b'=')
+
+        if sep:
+            os.environb[name] = value
+
+    #/
+    SixyIO.refresh()
+
+    #/
+    try:
+        os.chdir(cwd_b)
+    except EnvironmentError:
+        #/
+        SixyIO.stderr_print_fmt_safe(tt('Kc5vRz8'), os.fsdecode(cwd_b))
+
+        return aoiksixyioexp.MAIN_RET_V_SERVER_ERR
+
+    #/
+    sys.argv = [sys.argv[0]] + arg_s
+
+    #/
+    ## Same as running |aoiksixyioexp| as a program, e.g. a |SystemExit|
+    ##  raised by |parser.error| gives its exit code.
+    try:
+        ret_v = aoiksixyioexp.main(args=arg_s)
+    except SystemExit as e:
+        #/
+        ret_v = e.code
+
+        if ret_v is None:
+            ret_v = 0
+        elif not isinstance(ret_v, int):
+            SixyIO.stderr_print_safe(SixyIO.to_u_safe(str(ret_v)))
+
+            ret_v = 1
+    except KeyboardInterrupt:
+        ret_v = aoiksixyioexp.MAIN_RET_V_OK
+    except Exception:
+        #/
+        SixyIO.stderr_write_tb_safe()
+
+        ret_v = 1
+
+    #/
+    return ret_v
+
+def flush_std():
+    """
+    Flush the buffered stdio writers of |SixyIO| and the |sys| streams.
+    Errors, e.g. a closed pipe, are ignored.
+    """
+    for flush in (
+        SixyIO.stdout_flush,
+        SixyIO.stderr_flush,
+        lambda: sys.stdout.flush(),
+        lambda: sys.stderr.flush(),
+    ):
+        try:
+            flush()
+        except Exception:
+            pass
+
+def handle_conn(conn, tt):
+    """
+    Handle a connection in a forked child. Never returns.
+    """
+    #/
+    import signal
+
+    ## Back to the defaults, so that a signal forwarded by the client acts
+    ##  the same as on a standalone run.
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    #/
+    ret_v = None
+
+    try:
+        #/
+        request = recv_request(conn)
+
+        if request is not None:
+            #/
+            conn.sendall(struct.pack(REPLY_FMT, os.getpid()))
+
+            #/
+            fd_s, field_s = request
+
+            ret_v = run_request(conn, fd_s, field_s, tt)
+
+            #/
+            flush_std()
+
+            conn.sendall(struct.pack(REPLY_FMT, ret_v))
+    except BaseException:
+        ## The client gives its server error exit code when the connection
+        ##  closes without one.
+        pass
+    finally:
+        os._exit(0)
+
+def reap():
+    """
+    Reap exited children without blocking.
+    """
+    while True:
+        #/
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+
+        #/
+        if pid == 0:
+            return
+
+def serve(sock, tt):
+    """
+    Accept connections on listening socket |sock| and fork a child for each,
+    until interrupted.
+    """
+    import socket
+
+    #/
+    sock.settimeout(REAP_INTERVAL)
+
+    #/
+    while True:
+        #/
+        try:
+            conn, _ = sock.accept()
+        except socket.timeout:
+            reap()
+
+            continue
+
+        #/
+        ## Only serve the user running the server. Without a way to tell the
+        ##  peer, rely on the permissions of the socket and its directory.
+        try:
+            peer_uid = get_peer_uid(conn)
+        except EnvironmentError:
+            peer_uid = -1
+
+        if peer_uid is not None and peer_uid != os.getuid():
+            conn.close()
+
+            continue
+
+        #/
+        conn.settimeout(None)
+
+        ## Write out buffered data, so that the child does not write it too.
+        flush_std()
+
+        #/
+        try:
+            pid = os.fork()
+        except EnvironmentError:
+            #/
+            SixyIO.stderr_write_tb_safe()
+
+            conn.close()
+
+            continue
+
+        #/
+        if pid == 0:
+            #/
+            sock.close()
+
+            handle_conn(conn, tt)
+
+        #/
+        conn.close()
+
+        reap()
+
+#/
+MAIN_RET_V_OK = 0
+MAIN_RET_V_NOT_SUPPORTED = 1
+MAIN_RET_V_LISTEN_ERR = 2
+
+TT_D = {
+    'Hx7nWq4': 'Show help.',
+    'Jr3mTk6': 'Socket path. By default |$AOIKSIXYIO_SOCK|, or |aoiksixyio-UID/srv.sock| in |$XDG_RUNTIME_DIR| or |/tmp|. The |aoiksixyio-UID| directory is created accessible only to the current user.',
+    'Zb8cLp5': 'Cmd args of |aoiksixyioexp| whose encodings to warm up, as one string, e.g. |--warm "--ife gbk --stdoe utf-8"|. Can be given multiple times.',
+    'Pw2dFs9': 'Error: Server mode needs Unix domain sockets and |fork|.',
+    'Vy6hQm3': """Error: Failed listening on socket.
+Path is |{}|.""",
+    'Ns4tGx1': 'Listening on |{}|.',
+    'Kc5vRz8': """Error: Failed changing to the client's working directory.
+Path is |{}|.""",
+}
+
+def main(args=None):
+    """
+    args: Cmd args. By default |sys.argv[1:]|.
+    """
+    #/
+    def tt(key):
+        return TT_D[key]
+
+    #/
+    from argparse import ArgumentParser
+    import shlex
+    import signal
+    import socket
+
+    #/
+    parser = ArgumentParser(prog='aoiksixyiosrv', add_help=False)
+
+    parser.add_argument(
+        '-h', '--help',
+        action='help',
+        help=tt('Hx7nWq4'),
+    )
+
+    parser.add_argument(
+        '--sock',
+        dest='sock_path',
+        metavar='PATH',
+        default=None,
+        help=tt('Jr3mTk6'),
+    )
+
+    parser.add_argument(
+        '--warm',
+        dest='warm_arg_s_s',
+        metavar='ARGS',
+        action='append',
+        type=shlex.split,
+        default=[],
+        help=tt('Zb8cLp5'),
+    )
+
+    args_obj = parser.parse_args(args=args)
+
+    #/
+    if not hasattr(socket, 'AF_UNIX') or not hasattr(os, 'fork') \
+    or not hasattr(socket.socket, 'recvmsg'):
+        #/
+        SixyIO.stderr_print_safe(tt('Pw2dFs9'))
+
+        return MAIN_RET_V_NOT_SUPPORTED
+
+    #/
+    warm_up(args_obj.warm_arg_s_s, tt)
+
+    #/
+    sock_path = args_obj.sock_path or get_sock_path()
+
+    try:
+        #/
+        if sock_path == os.path.join(get_sock_dir(), SOCK_FILE_NAME):
+            make_sock_dir(get_sock_dir())
+
+        #/
+        sock = listen(sock_path)
+    except EnvironmentError:
+        #/
+        SixyIO.stderr_print_fmt_safe(tt('Vy6hQm3'), SixyIO.to_u_safe(sock_path))
+
+        SixyIO.stderr_write_tb_safe()
+
+        return MAIN_RET_V_LISTEN_ERR
+
+    #/
+    ## Exit via |SystemExit| on SIGTERM, to remove the socket file.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(MAIN_RET_V_OK))
+
+    SixyIO.stderr_print_fmt_safe(tt('Ns4tGx1'), SixyIO.to_u_safe(sock_path))
+
+    #/
+    try:
+        serve(sock, tt)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        #/
+        sock.close()
+
+        try:
+            os.unlink(sock_path)
+        except EnvironmentError:
+            pass
+
+    #/
+    return MAIN_RET_V_OK
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,269 @@
+# coding: utf-8
+"""
+File ID: 7Gd2Xv5
+
+Client of |aoiksixyiosrv|. Takes the same cmd args as |aoiksixyioexp|, has
+them run by the server, and exits with the same exit code. Runs
+|aoiksixyioexp| in this process instead if no server is listening.
+
+Kept outside package |aoiksixyio|, so that starting it does not import the
+package. See |aoiksixyio.aoiksixyiosrv| for the protocol.
+"""
+
+import os
+import struct
+import sys
+
+#/
+PROTOCOL_VER = b'1'
+
+HEAD_FMT = '!I'
+
+REPLY_FMT = '!i'
+
+SOCK_PATH_ENV_NAME = 'AOIKSIXYIO_SOCK'
+
+MAIN_RET_V_SERVER_ERR = 18
+## Same as |aoiksixyioexp.MAIN_RET_V_SERVER_ERR|.
+
+FORWARD_SIGNAL_NAME_S = ('SIGINT', 'SIGTERM', 'SIGHUP', 'SIGQUIT')
+## Signals forwarded to the server's child running the request.
+
+SOCK_FILE_NAME = 'srv.sock'
+
+def get_sock_dir():
+    """
+    Same as |aoiksixyio.aoiksixyiosrv.get_sock_dir|.
+    """
+    #/
+    dir_path = os.environ.get('XDG_RUNTIME_DIR') or '/tmp'
+
+    return os.path.join(dir_path, 'aoiksixyio-{}'.format(os.getuid()))
+
+def get_sock_path():
+    """
+    Same as |aoiksixyio.aoiksixyiosrv.get_sock_path|.
+    """
+    #/
+    sock_path = os.environ.get(SOCK_PATH_ENV_NAME)
+
+    if sock_path:
+        return sock_path
+
+    #/
+    return os.path.join(get_sock_dir(), SOCK_FILE_NAME)
+
+def import_socket():
+    """
+    Module |_socket|, the C part of |socket|. |socket| and |signal| import
+    |enum|, which costs about as much as the rest of the client.
+    """
+    try:
+        import _socket as socket
+    except ImportError:
+        import socket
+
+    return socket
+
+def import_signal():
+    """
+    Module |_signal|, the C part of |signal|. See |import_socket|.
+    """
+    try:
+        import _signal as signal
+    except ImportError:
+        import signal
+
+    return signal
+
+def run_local(args):
+    """
+    Run |aoiksixyioexp| in this process.
+    """
+    from aoiksixyio.aoiksixyioexp import main as exp_main
+
+    #/
+    try:
+        return exp_main(args=args)
+    except KeyboardInterrupt:
+        return 0
+
+def get_peer_uid(sock):
+    """
+    Same as |aoiksixyio.aoiksixyiosrv.get_peer_uid|.
+    """
+    socket = import_socket()
+
+    #/
+    peer_cred_opt = getattr(socket, 'SO_PEERCRED', None)
+
+    if peer_cred_opt is None:
+        return None
+
+    #/
+    cred_fmt = '3i'
+
+    cred_btxt = sock.getsockopt(socket.SOL_SOCKET, peer_cred_opt, struct.calcsize(cred_fmt))
+
+    #/
+    return struct.unpack(cred_fmt, cred_btxt)[1]
+
+def connect():
+    """
+    Return a socket connected to the server, or None if there is no server,
+    or it is not run by the current user.
+    """
+    #/
+    socket = import_socket()
+
+    if not hasattr(socket, 'AF_UNIX') or not hasattr(socket.socket, 'sendmsg'):
+        return None
+
+    #/
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    try:
+        #/
+        sock.connect(get_sock_path())
+
+        #/
+        ## The request carries the environment and the stdio file
+        ##  descriptors. Send them only to a server of the current user.
+        ## Where the peer can not be told, e.g. not on Linux, do not send.
+        peer_uid = get_peer_uid(sock)
+    except EnvironmentError:
+        peer_uid = None
+
+    #/
+    if peer_uid is None or peer_uid != os.getuid():
+        sock.close()
+
+        return None
+
+    #/
+    return sock
+
+def send_request(sock, args):
+    """
+    Send cmd args |args|, the working directory, the environment, and the
+    stdio encodings, with stdio file descriptors attached.
+    """
+    import array
+
+    socket = import_socket()
+
+    #/
+    field_s = [PROTOCOL_VER, os.getcwdb()]
+
+    for stream in (sys.stdin, sys.stdout, sys.stderr):
+        field_s.append((getattr(stream, 'encoding', None) or 'utf-8').encode('ascii'))
+
+        field_s.append((getattr(stream, 'errors', None) or 'strict').encode('ascii'))
+
+    field_s.append(str(len(args)).encode('ascii'))
+
+    field_s.extend(os.fsencode(x) for x in args)
+
+    field_s.extend(name + b'=' + value for name, value in os.environb.items())
+
+    #/
+    body = b'\0'.join(field_s)
+
+    btxt = struct.pack(HEAD_FMT, len(body)) + body
+
+    #/
+    fd_arr = array.array('i', [0, 1, 2])
+
+    sent_size = sock.sendmsg([btxt], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, fd_arr.tobytes())])
+
+    sock.sendall(btxt[sent_size:])
+
+def recv_reply(sock):
+    """
+    Return the next int of the reply, or None if the connection closed.
+    """
+    #/
+    size = struct.calcsize(REPLY_FMT)
+
+    btxt = b''
+
+    while len(btxt) < size:
+        #/
+        data = sock.recv(size - len(btxt))
+
+        if not data:
+            return None
+
+        btxt += data
+
+    #/
+    return struct.unpack(REPLY_FMT, btxt)[0]
+
+def main(args=None):
+    """
+    args: Cmd args. By default |sys.argv[1:]|.
+    """
+    #/
+    if args is None:
+        args = sys.argv[1:]
+
+    #/
+    sock = connect()
+
+    if sock is None:
+        return run_local(args)
+
+    #/
+    try:
+        #/
+        try:
+            send_request(sock, args)
+
+            pid = recv_reply(sock)
+        except EnvironmentError:
+            pid = None
+
+        #/
+        ## Nothing has run yet.
+        if pid is None:
+            return run_local(args)
+
+        #/
+        signal = import_signal()
+
+        signum_s = []
+
+        def forward_signal(signum, frame):
+            #/
+            signum_s.append(signum)
+
+            try:
+                os.kill(pid, signum)
+            except EnvironmentError:
+                pass
+
+        for signal_name in FORWARD_SIGNAL_NAME_S:
+            #/
+            signum = getattr(signal, signal_name, None)
+
+            if signum is not None:
+                signal.signal(signum, forward_signal)
+
+        #/
+        try:
+            ret_v = recv_reply(sock)
+        except EnvironmentError:
+            ret_v = None
+
+        #/
+        if ret_v is None:
+            ## The child was killed, e.g. by a forwarded signal.
+            ret_v = 128 + signum_s[-1] if signum_s else MAIN_RET_V_SERVER_ERR
+
+        #/
+        return ret_v
+    finally:
+        sock.close()
+
+if __name__ == '__main__':
+    sys.exit(main())
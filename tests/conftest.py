@@ -0,0 +1,57 @@
+# coding: utf-8
+"""
+File ID: 5Hc8Tm3
+
+Shared fixtures. Tests run the |aoiksixyioexp| command in a subprocess, the
+way it is used, with |src| on |PYTHONPATH|.
+"""
+
+import os.path
+import subprocess
+import sys
+
+import pytest
+
+#/
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+sys.path.insert(0, SRC_DIR)
+
+#/
+MAIN_CODE = 'import sys; from aoiksixyio.aoiksixyioexp import main; sys.exit(main())'
+
+def make_env(**kwargs):
+    #/
+    env = dict(os.environ)
+
+    env['PYTHONPATH'] = SRC_DIR
+
+    env['PYTHONIOENCODING'] = 'utf-8'
+
+    env.update(kwargs)
+
+    #/
+    return env
+
+def run_code(code, arg_s, input_btxt=b'', cwd=None, env=None, timeout=60):
+    #/
+    return subprocess.run(
+        [sys.executable, '-c', code] + list(arg_s),
+        input=input_btxt,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        cwd=cwd,
+        env=env or make_env(),
+        timeout=timeout,
+    )
+
+@pytest.fixture
+def run_exp():
+    """
+    Return a function that runs |aoiksixyioexp| with the given cmd args and
+    stdin bytes, and returns the |CompletedProcess|.
+    """
+    def run(arg_s, input_btxt=b'', cwd=None, env=None):
+        return run_code(MAIN_CODE, arg_s, input_btxt=input_btxt, cwd=cwd, env=env)
+
+    return run
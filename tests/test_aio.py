@@ -0,0 +1,72 @@
+# coding: utf-8
+"""
+File ID: 8Rk2Vd5
+
+Tests of the asyncio helpers, |SixyIOObj.aio|.
+"""
+
+from conftest import run_code
+
+#/
+WRITER_CODE = '''
+import asyncio
+import os
+import sys
+
+from aoiksixyio import SixyIOObj
+
+async def main():
+    aio = SixyIOObj(stdoe='gbk').aio()
+
+    for _ in range(2):
+        writer = await aio.stdout_make_writer()
+
+        writer.write('中文\\n')
+
+        await writer.drain()
+
+        await writer.close()
+
+asyncio.run(main())
+
+os.write(1, b'fd 1 open\\n')
+'''
+
+READER_CODE = '''
+import asyncio
+
+from aoiksixyio import SixyIOObj
+
+async def main():
+    aio = SixyIOObj(stdie='gbk', stdoe='utf-8').aio()
+
+    reader = await aio.stdin_make_reader(chunk_size=1)
+
+    utxt = await reader.read()
+
+    writer = await aio.stdout_make_writer()
+
+    writer.write(utxt)
+
+    await writer.close()
+
+asyncio.run(main())
+'''
+
+def test_stdout_writer_write_and_close():
+    #/
+    res = run_code(WRITER_CODE, [])
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert res.stdout == '中文\n'.encode('gbk') * 2 + b'fd 1 open\n'
+
+def test_stdin_reader_to_stdout_writer():
+    #/
+    res = run_code(READER_CODE, [], input_btxt='中文\n'.encode('gbk'))
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert res.stdout == '中文\n'.encode('utf-8')
@@ -0,0 +1,157 @@
+# coding: utf-8
+"""
+File ID: 9Lc4Hs6
+
+Tests of atomic output, |SixyIO.open_atomic| and |--atomic|.
+"""
+
+import os
+
+import pytest
+
+from aoiksixyio import SixyIO
+
+def list_dir(dir_path):
+    return sorted(x.name for x in dir_path.iterdir())
+
+def test_close_renames_into_place(tmp_path):
+    #/
+    file_path = tmp_path / 'f.txt'
+
+    #/
+    with SixyIO.open_atomic(str(file_path)) as file_b:
+        file_b.write(b'new')
+
+        ## Not visible before close.
+        assert not file_path.exists()
+
+    #/
+    assert file_path.read_bytes() == b'new'
+
+    assert list_dir(tmp_path) == ['f.txt']
+
+def test_abort_keeps_old_file(tmp_path):
+    #/
+    file_path = tmp_path / 'f.txt'
+
+    file_path.write_bytes(b'old')
+
+    #/
+    file_b = SixyIO.open_atomic(str(file_path))
+
+    file_b.write(b'new')
+
+    file_b.abort()
+
+    ## No-op after abort.
+    file_b.close()
+
+    #/
+    assert file_path.read_bytes() == b'old'
+
+    assert list_dir(tmp_path) == ['f.txt']
+
+def test_raise_in_with_keeps_old_file(tmp_path):
+    #/
+    file_path = tmp_path / 'f.txt'
+
+    file_path.write_bytes(b'old')
+
+    #/
+    with pytest.raises(ValueError):
+        with SixyIO.open_atomic(str(file_path)) as file_b:
+            file_b.write(b'new')
+
+            raise ValueError()
+
+    #/
+    assert file_path.read_bytes() == b'old'
+
+    assert list_dir(tmp_path) == ['f.txt']
+
+def test_mode_kept(tmp_path):
+    #/
+    file_path = tmp_path / 'f.sh'
+
+    file_path.write_bytes(b'old')
+
+    file_path.chmod(0o750)
+
+    #/
+    with SixyIO.open_atomic(str(file_path)) as file_b:
+        file_b.write(b'new')
+
+    #/
+    assert file_path.stat().st_mode & 0o777 == 0o750
+
+def test_symlink_kept_and_target_replaced(tmp_path):
+    #/
+    target_dir = tmp_path / 'target'
+
+    target_dir.mkdir()
+
+    target_path = target_dir / 'f.txt'
+
+    target_path.write_bytes(b'old')
+
+    target_path.chmod(0o640)
+
+    link_path = tmp_path / 'link.txt'
+
+    link_path.symlink_to(target_path)
+
+    #/
+    with SixyIO.open_atomic(str(link_path)) as file_b:
+        file_b.write(b'new')
+
+    #/
+    assert link_path.is_symlink()
+
+    assert target_path.read_bytes() == b'new'
+
+    assert target_path.stat().st_mode & 0o777 == 0o640
+
+    #/
+    ## The temp file was made next to the target, not the link.
+    assert list_dir(tmp_path) == ['link.txt', 'target']
+
+    assert list_dir(target_dir) == ['f.txt']
+
+def test_relative_filename(tmp_path, monkeypatch):
+    #/
+    monkeypatch.chdir(tmp_path)
+
+    #/
+    with SixyIO.open_atomic('f.txt') as file_b:
+        file_b.write(b'new')
+
+    #/
+    assert (tmp_path / 'f.txt').read_bytes() == b'new'
+
+def test_cmd_atomic_output_via_symlink(run_exp, tmp_path):
+    #/
+    target_path = tmp_path / 'f.txt'
+
+    target_path.write_bytes(b'old')
+
+    link_path = tmp_path / 'link.txt'
+
+    link_path.symlink_to(target_path)
+
+    #/
+    res = run_exp(['--ia', 'new', '--of', str(link_path), '--atomic'])
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert link_path.is_symlink()
+
+    assert target_path.read_bytes() == b'new'
+
+def test_bad_mode_refused(tmp_path):
+    #/
+    with pytest.raises(ValueError):
+        SixyIO.open_atomic(str(tmp_path / 'f.txt'), mode='ab')
+
+    #/
+    assert os.listdir(str(tmp_path)) == []
@@ -0,0 +1,161 @@
+# coding: utf-8
+"""
+File ID: 4Rb6Nw8
+
+Tests of batch mode, |--bif|, |--bod|, and |--bj|.
+"""
+
+import pytest
+
+#/
+CONTENT_UTXT = '中文\nline 2\n'
+
+def make_input_dir(dir_path):
+    """
+    Make input files in |dir_path|, incl. a sub directory. Return their
+    relative paths.
+    """
+    #/
+    rel_path_s = ['a.txt', 'b.txt', 'sub/c.txt', 'sub/deep/d.txt']
+
+    #/
+    for rel_path in rel_path_s:
+        #/
+        file_path = dir_path / rel_path
+
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+
+        file_path.write_bytes((rel_path + CONTENT_UTXT).encode('gbk'))
+
+    #/
+    return rel_path_s
+
+@pytest.mark.parametrize('job_arg_s', [['--bj', '1'], ['--bj', '3']])
+def test_dir_converted_with_relative_paths(run_exp, tmp_path, job_arg_s):
+    #/
+    input_dir = tmp_path / 'in'
+
+    rel_path_s = make_input_dir(input_dir)
+
+    output_dir = tmp_path / 'out'
+
+    #/
+    res = run_exp(['--bif', str(input_dir), '--bod', str(output_dir), '--ife', 'gbk', '--ofe', 'utf-8']
+        + job_arg_s)
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    #/
+    assert sorted(str(x.relative_to(output_dir)) for x in output_dir.rglob('*') if x.is_file()) \
+        == sorted(rel_path_s)
+
+    for rel_path in rel_path_s:
+        assert (output_dir / rel_path).read_bytes() == (rel_path + CONTENT_UTXT).encode('utf-8')
+
+def test_files_output_by_base_name(run_exp, tmp_path):
+    #/
+    input_dir = tmp_path / 'in'
+
+    make_input_dir(input_dir)
+
+    output_dir = tmp_path / 'out'
+
+    #/
+    res = run_exp(['--bif', str(input_dir / 'a.txt'), '--bif', str(input_dir / 'sub' / 'c.txt'),
+        '--bod', str(output_dir), '--ife', 'gbk', '--bj', '2'])
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert sorted(x.name for x in output_dir.iterdir()) == ['a.txt', 'c.txt']
+
+    assert (output_dir / 'c.txt').read_bytes() == ('sub/c.txt' + CONTENT_UTXT).encode('utf-8')
+
+@pytest.mark.parametrize('job_arg_s', [['--bj', '1'], ['--bj', '2']])
+def test_failed_file_does_not_stop_others(run_exp, tmp_path, job_arg_s):
+    #/
+    input_dir = tmp_path / 'in'
+
+    make_input_dir(input_dir)
+
+    (input_dir / 'bad.txt').write_bytes(b'\x80\n')
+
+    output_dir = tmp_path / 'out'
+
+    #/
+    res = run_exp(['--bif', str(input_dir), '--bif', str(tmp_path / 'no-such-file'),
+        '--bod', str(output_dir), '--ife', 'gbk', '--nopt'] + job_arg_s)
+
+    #/
+    ## Exit code of the first failed file in input order, i.e. the decode
+    ##  error of |bad.txt|.
+    assert res.returncode == 5
+
+    assert b'2 of 6 files failed in batch mode' in res.stderr
+
+    #/
+    assert (output_dir / 'sub' / 'deep' / 'd.txt').read_bytes() \
+        == ('sub/deep/d.txt' + CONTENT_UTXT).encode('utf-8')
+
+@pytest.mark.parametrize('arg_s', [
+    ## No output dir.
+    ['--bif', 'x'],
+    ## Batch mode with single file args.
+    ['--bif', 'x', '--bod', 'y', '--if', 'z'],
+])
+def test_bad_args_refused(run_exp, arg_s):
+    #/
+    res = run_exp(arg_s)
+
+    #/
+    assert res.returncode == 2
+
+    assert b'usage:' in res.stderr
+
+def test_same_output_path_refused(run_exp, tmp_path):
+    #/
+    for dir_name in ['a', 'b']:
+        #/
+        input_dir = tmp_path / dir_name
+
+        input_dir.mkdir()
+
+        (input_dir / 'x.txt').write_bytes(dir_name.encode('ascii'))
+
+    output_dir = tmp_path / 'out'
+
+    #/
+    for arg_s in [
+        ## Files with the same base name.
+        ['--bif', str(tmp_path / 'a' / 'x.txt'), '--bif', str(tmp_path / 'b' / 'x.txt')],
+        ## Dirs with the same relative paths.
+        ['--bif', str(tmp_path / 'a'), '--bif', str(tmp_path / 'b')],
+    ]:
+        #/
+        res = run_exp(arg_s + ['--bod', str(output_dir)])
+
+        #/
+        assert res.returncode == 19
+
+        assert b'Two batch mode input files have the same output file' in res.stderr
+
+        #/
+        ## Nothing is converted.
+        assert not output_dir.exists()
+
+def test_output_dir_inside_input_dir_refused(run_exp, tmp_path):
+    #/
+    input_dir = tmp_path / 'in'
+
+    make_input_dir(input_dir)
+
+    #/
+    res = run_exp(['--bif', str(input_dir), '--bod', str(input_dir / 'sub' / 'out'), '--ife', 'gbk'])
+
+    #/
+    assert res.returncode == 19
+
+    assert b'output directory is inside an input directory' in res.stderr
+
+    assert not (input_dir / 'sub' / 'out').exists()
@@ -0,0 +1,46 @@
+# coding: utf-8
+"""
+File ID: 7Gs4Mk9
+
+Smoke test of the benchmark suite, |bench/bench_suite.py|, at the smallest
+size, so that it keeps up with the API it measures.
+"""
+
+import json
+import os.path
+import subprocess
+import sys
+
+from conftest import make_env
+
+#/
+SUITE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bench', 'bench_suite.py')
+
+def run_suite(arg_s, tmp_path):
+    #/
+    return subprocess.run(
+        [sys.executable, SUITE_PATH, '--size', '1', '--min-time', '0'] + arg_s,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        cwd=str(tmp_path),
+        env=make_env(),
+        timeout=120,
+    )
+
+def test_suite_runs_and_compares(tmp_path):
+    #/
+    res = run_suite(['--encoding', 'utf-8,gbk', '--errors', 'strict,replace', '--out', 'a.json'], tmp_path)
+
+    assert res.returncode == 0, res.stderr
+
+    #/
+    res_d_s = json.loads((tmp_path / 'a.json').read_text())['results']
+
+    assert {x['case'] for x in res_d_s} >= {'to_u', 'to_b', 'open_out', 'open_in', 'main', 'main --sp'}
+
+    assert {x['errors'] for x in res_d_s} == {'strict', 'replace'}
+
+    #/
+    res = run_suite(['--out', 'b.json', '--cmp', 'a.json', '--threshold', '1000'], tmp_path)
+
+    assert res.returncode == 0, res.stderr
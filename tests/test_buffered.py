@@ -0,0 +1,134 @@
+# coding: utf-8
+"""
+File ID: 7Qd3Nx8
+
+Tests of buffered mode of stdout and stderr, |EncodedBufferWriter|.
+"""
+
+import io
+
+import pytest
+
+from aoiksixyio.aoiksixyio_ import EncodedBufferWriter
+
+from conftest import run_code
+
+def test_write_gathers_until_flush():
+    #/
+    file_b = io.BytesIO()
+
+    writer = EncodedBufferWriter(file_b, line_buffered=False)
+
+    #/
+    writer.write('中\n', 'utf-8', 'strict')
+
+    writer.write('文\n', 'utf-8', 'strict')
+
+    assert file_b.getvalue() == b''
+
+    #/
+    writer.flush()
+
+    assert file_b.getvalue() == '中\n文\n'.encode('utf-8')
+
+def test_write_out_when_full():
+    #/
+    file_b = io.BytesIO()
+
+    writer = EncodedBufferWriter(file_b, buf_size=4, line_buffered=False)
+
+    #/
+    writer.write('ab', 'ascii', 'strict')
+
+    assert file_b.getvalue() == b''
+
+    writer.write('cd', 'ascii', 'strict')
+
+    assert file_b.getvalue() == b'abcd'
+
+def test_line_buffered_writes_out_on_newline():
+    #/
+    file_b = io.BytesIO()
+
+    writer = EncodedBufferWriter(file_b, line_buffered=True)
+
+    #/
+    writer.write('ab', 'ascii', 'strict')
+
+    assert file_b.getvalue() == b''
+
+    writer.write('c\n', 'ascii', 'strict')
+
+    assert file_b.getvalue() == b'abc\n'
+
+def test_encoding_change_and_bytes_keep_order():
+    #/
+    file_b = io.BytesIO()
+
+    writer = EncodedBufferWriter(file_b, line_buffered=False)
+
+    #/
+    writer.write('中', 'gbk', 'strict')
+
+    writer.write('中', 'utf-8', 'strict')
+
+    writer.write_b(b'|')
+
+    writer.write('?', 'ascii', 'strict')
+
+    writer.flush()
+
+    #/
+    assert file_b.getvalue() == '中'.encode('gbk') + '中'.encode('utf-8') + b'|?'
+
+def test_encode_error_writes_text_before_and_keeps_text_after():
+    #/
+    file_b = io.BytesIO()
+
+    writer = EncodedBufferWriter(file_b, line_buffered=False)
+
+    #/
+    writer.write('a', 'ascii', 'strict')
+
+    writer.write('中', 'ascii', 'strict')
+
+    writer.write('b', 'ascii', 'strict')
+
+    #/
+    with pytest.raises(UnicodeEncodeError):
+        writer.flush()
+
+    assert file_b.getvalue() == b'a'
+
+    #/
+    writer.flush()
+
+    assert file_b.getvalue() == b'ab'
+
+BUFFERED_CODE = '''
+import os
+
+from aoiksixyio import SixyIO
+
+SixyIO.stdout_set_buffered(line_buffered=False)
+
+SixyIO.stdout_write_b(b'bytes\\n')
+
+SixyIO.stdout_flush()
+
+SixyIO.stdout_print('line 1', encoding='gbk')
+
+SixyIO.stdout_print('中文', encoding='gbk')
+
+## Not written out yet.
+os.write(1, b'direct\\n')
+'''
+
+def test_buffered_stdout_flushed_at_exit():
+    #/
+    res = run_code(BUFFERED_CODE, [])
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert res.stdout == b'bytes\ndirect\nline 1\n' + '中文\n'.encode('gbk')
@@ -0,0 +1,170 @@
+# coding: utf-8
+"""
+File ID: 2Vh9Xe4
+
+Tests of the codec registry, |SixyIO.codec_info|, the incremental codecs
+made from it, and the memoized encoding validation of |SixyIOObj|.
+"""
+
+import codecs
+
+import pytest
+
+from aoiksixyio import SixyIO
+from aoiksixyio import SixyIOObj
+
+@pytest.fixture
+def lookup_count(monkeypatch):
+    """
+    Empty the codec registry and count the |codecs.lookup| calls made.
+    Return a dict with the count in key |count|.
+    """
+    #/
+    count_d = {'count': 0}
+
+    lookup = codecs.lookup
+
+    def lookup_counted(encoding):
+        #/
+        count_d['count'] += 1
+
+        #/
+        return lookup(encoding)
+
+    #/
+    monkeypatch.setattr(codecs, 'lookup', lookup_counted)
+
+    SixyIO.codec_info_clear()
+
+    #/
+    yield count_d
+
+    #/
+    SixyIO.codec_info_clear()
+
+def test_lookup_once(lookup_count):
+    #/
+    info = SixyIO.codec_info('gbk')
+
+    #/
+    assert SixyIO.codec_info('gbk') is info
+
+    assert SixyIO.make_decoder('gbk').decode('中'.encode('gbk')) == '中'
+
+    assert SixyIO.make_encoder('gbk').encode('中') == '中'.encode('gbk')
+
+    #/
+    assert lookup_count['count'] == 1
+
+def test_spellings_share_entry(lookup_count):
+    #/
+    info = SixyIO.codec_info('utf-8')
+
+    #/
+    for encoding in ['UTF8', 'utf_8', 'Utf_8', 'u8', 'UTF-8']:
+        assert SixyIO.codec_info(encoding) is info
+
+    #/
+    assert list(SixyIO._codec_info_d) == ['utf_8']
+
+    assert lookup_count['count'] == 1
+
+def test_size_bounded(lookup_count, monkeypatch):
+    #/
+    monkeypatch.setattr(SixyIO, 'CODEC_CACHE_SIZE', 2)
+
+    #/
+    for encoding in ['gbk', 'big5', 'latin-1', 'gbk']:
+        SixyIO.codec_info(encoding)
+
+    #/
+    ## |gbk| was dropped as the oldest, so looked up again.
+    assert lookup_count['count'] == 4
+
+    assert len(SixyIO._codec_info_d) == 2
+
+def test_unknown_encoding_raises(lookup_count):
+    #/
+    with pytest.raises(LookupError):
+        SixyIO.codec_info('no-such-enc')
+
+    #/
+    with pytest.raises(LookupError):
+        SixyIO.make_decoder('no-such-enc')
+
+def test_incremental_codecs_not_shared():
+    #/
+    ## Each call makes a new codec object, so state is not shared.
+    decoder = SixyIO.make_decoder('utf-8')
+
+    assert decoder.decode(b'\xe4') == ''
+
+    #/
+    assert SixyIO.make_decoder('utf-8').decode(b'a') == 'a'
+
+    assert decoder.decode(b'\xb8\xad') == '中'
+
+def test_codec_name_canonical():
+    #/
+    assert SixyIO.codec_name('UTF8') == SixyIO.codec_name('u8') == 'utf-8'
+
+@pytest.fixture
+def profile_clear():
+    """
+    Empty the encoding validation memo and the |SixyIOObj| profiles.
+    """
+    #/
+    SixyIO._encoding_valid_d.clear()
+
+    SixyIOObj._profile_d.clear()
+
+    #/
+    yield
+
+    #/
+    SixyIO._encoding_valid_d.clear()
+
+    SixyIOObj._profile_d.clear()
+
+def test_encoding_valid_memoized(profile_clear, lookup_count):
+    #/
+    assert SixyIO.encoding_is_valid('gbk')
+
+    assert not SixyIO.encoding_is_valid('no-such-enc')
+
+    count = lookup_count['count']
+
+    #/
+    assert SixyIO.encoding_is_valid('gbk')
+
+    assert not SixyIO.encoding_is_valid('no-such-enc')
+
+    #/
+    assert lookup_count['count'] == count
+
+def test_identical_config_shares_profile(profile_clear, monkeypatch):
+    #/
+    sio = SixyIOObj(stdie='gbk', ofe='big5')
+
+    #/
+    ## Encodings are not validated again for an identical config.
+    monkeypatch.setattr(SixyIO, 'encoding_is_valid', staticmethod(lambda encoding: False))
+
+    sio2 = SixyIOObj(stdie='gbk', ofe='big5')
+
+    #/
+    assert (sio2.stdie, sio2.ofe, sio2.ofe_utxt) == (sio.stdie, sio.ofe, sio.ofe_utxt)
+
+    #/
+    ## A different config is validated.
+    with pytest.raises(AssertionError):
+        SixyIOObj(stdie='gbk', ofe='gbk')
+
+def test_invalid_config_not_kept(profile_clear):
+    #/
+    for _ in range(2):
+        with pytest.raises(AssertionError):
+            SixyIOObj(ife='no-such-enc')
+
+    #/
+    assert not SixyIOObj._profile_d
@@ -0,0 +1,54 @@
+# coding: utf-8
+"""
+File ID: 9Kd4Rs2
+
+Tests of the batch conversion API, |SixyIO.to_u_many| and
+|SixyIO.to_b_many|, against |SixyIO.to_u| and |SixyIO.to_b|.
+"""
+
+import pytest
+
+from aoiksixyio import SixyIO
+
+#/
+## All bytes, all unicode, and mixed, to hit the fast paths and the slow one.
+OBJ_S_S = [
+    [b'a', '中'.encode('gbk'), b''],
+    ['a', '中', ''],
+    [b'a', '中', '中'.encode('gbk')],
+    [],
+]
+
+@pytest.mark.parametrize('obj_s', OBJ_S_S)
+@pytest.mark.parametrize('lazy', [False, True])
+def test_to_u_many_same_as_to_u(obj_s, lazy):
+    #/
+    res_s = SixyIO.to_u_many(obj_s, 'gbk', lazy=lazy)
+
+    #/
+    assert list(res_s) == [SixyIO.to_u(obj, 'gbk') for obj in obj_s]
+
+@pytest.mark.parametrize('obj_s', OBJ_S_S)
+@pytest.mark.parametrize('lazy', [False, True])
+def test_to_b_many_same_as_to_b(obj_s, lazy):
+    #/
+    res_s = SixyIO.to_b_many(obj_s, 'gbk', lazy=lazy)
+
+    #/
+    assert list(res_s) == [SixyIO.to_b(obj, 'gbk') for obj in obj_s]
+
+def test_many_take_iterators():
+    #/
+    assert SixyIO.to_u_many(iter([b'a', b'b'])) == ['a', 'b']
+
+    assert SixyIO.to_b_many(iter(['a', 'b'])) == [b'a', b'b']
+
+def test_many_errors():
+    #/
+    with pytest.raises(UnicodeDecodeError):
+        SixyIO.to_u_many([b'a', b'\xff'])
+
+    #/
+    assert SixyIO.to_u_many([b'a', b'\xff'], errors='replace') == ['a', '�']
+
+    assert SixyIO.to_b_many(['中'], 'ascii', errors='replace') == [b'?']
@@ -0,0 +1,107 @@
+# coding: utf-8
+"""
+File ID: 6Wm2Jq5
+
+Tests of encoding detection, |SixyIO.detect_encodings| and encoding |auto|.
+"""
+
+import codecs
+import io
+
+import pytest
+
+from aoiksixyio import SixyIO
+
+#/
+CONTENT_UTXT = '中文编码测试，这是一段比较长的文本。\n'
+
+ASCII_UTXT = 'plain text line\n'
+
+@pytest.mark.parametrize('btxt, encoding', [
+    (codecs.BOM_UTF8 + CONTENT_UTXT.encode('utf-8'), 'utf-8-sig'),
+    (CONTENT_UTXT.encode('utf-16'), 'utf-16'),
+    (CONTENT_UTXT.encode('utf-32'), 'utf-32'),
+    (ASCII_UTXT.encode('utf-16-le'), 'utf-16-le'),
+    (ASCII_UTXT.encode('utf-16-be'), 'utf-16-be'),
+    (CONTENT_UTXT.encode('utf-8'), 'utf-8'),
+    (CONTENT_UTXT.encode('gbk'), 'gbk'),
+], ids=lambda x: x if isinstance(x, str) else '')
+def test_detect_encoding(btxt, encoding):
+    #/
+    assert SixyIO.detect_encoding(btxt, is_final=True) == encoding
+
+def test_cut_char_allowed_unless_final():
+    #/
+    btxt = CONTENT_UTXT.encode('utf-8')[:4]
+
+    #/
+    assert SixyIO.detect_encoding(btxt) == 'utf-8'
+
+    assert SixyIO.detect_encoding(btxt, is_final=True) != 'utf-8'
+
+def test_candidates_order_kept():
+    #/
+    btxt = '中文'.encode('gbk')
+
+    #/
+    assert SixyIO.detect_encodings(btxt, candidate_s=['big5', 'gbk']) == ['big5', 'gbk']
+
+    #/
+    ## Falls back to |latin-1|, so never empty.
+    assert SixyIO.detect_encodings(btxt, candidate_s=['ascii']) == ['latin-1']
+
+def test_detect_stream_encoding_puts_sample_back():
+    #/
+    btxt = CONTENT_UTXT.encode('gbk') * 100
+
+    #/
+    class PipeReader(io.RawIOBase):
+        """
+        Reader that can not seek, like a pipe.
+        """
+        def __init__(self):
+            self._file_b = io.BytesIO(btxt)
+
+        def readable(self):
+            return True
+
+        def readinto(self, buf):
+            #/
+            data = self._file_b.read(len(buf))
+
+            buf[:len(data)] = data
+
+            return len(data)
+
+    #/
+    encoding, file_b = SixyIO.detect_stream_encoding(PipeReader(), sample_size=10, wait=True)
+
+    #/
+    assert encoding == 'gbk'
+
+    assert file_b.read() == btxt
+
+@pytest.mark.parametrize('extra_arg_s', [[], ['--stream'], ['--stream', '--chunk', '1'], ['--rec']])
+def test_stdin_auto(run_exp, extra_arg_s):
+    #/
+    res = run_exp(['--stdie', 'auto'] + extra_arg_s, input_btxt=CONTENT_UTXT.encode('gbk'))
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert res.stdout == CONTENT_UTXT.encode('utf-8')
+
+@pytest.mark.parametrize('extra_arg_s', [[], ['--stream'], ['--mmap']])
+def test_input_file_auto(run_exp, tmp_path, extra_arg_s):
+    #/
+    input_path = tmp_path / 'in.txt'
+
+    input_path.write_bytes(CONTENT_UTXT.encode('utf-16'))
+
+    #/
+    res = run_exp(['--if', str(input_path), '--ife', 'auto'] + extra_arg_s)
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert res.stdout == CONTENT_UTXT.encode('utf-8')
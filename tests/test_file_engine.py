@@ -0,0 +1,68 @@
+# coding: utf-8
+"""
+File ID: 6Hw2Ck9
+
+Tests of the file engines of |SixyIOObj.open_in| and |SixyIOObj.open_out|.
+"""
+
+import codecs
+
+import pytest
+
+from aoiksixyio import SixyIOObj
+
+#/
+CONTENT_UTXT = '中文\r\nline 2\n'
+
+@pytest.fixture
+def sio():
+    return SixyIOObj(ife='gbk', ofe='gbk')
+
+def test_default_engine_takes_codecs_kwargs(sio, tmp_path):
+    #/
+    file_path = str(tmp_path / 'f.txt')
+
+    #/
+    with sio.open_out(file_path, errors='strict', buffering=4096) as file_obj:
+        file_obj.write(CONTENT_UTXT)
+
+    #/
+    with sio.open_in(file_path, buffering=-1) as file_obj:
+        #/
+        assert isinstance(file_obj, codecs.StreamReaderWriter)
+
+        assert file_obj.read() == CONTENT_UTXT
+
+@pytest.mark.parametrize('engine', ['io', 'codecs'])
+def test_engines_write_and_read_same_bytes(sio, tmp_path, engine):
+    #/
+    file_path = tmp_path / 'f.txt'
+
+    #/
+    with sio.open_out(str(file_path), engine=engine) as file_obj:
+        file_obj.write(CONTENT_UTXT)
+
+    #/
+    ## No newline translation either way.
+    assert file_path.read_bytes() == CONTENT_UTXT.encode('gbk')
+
+    #/
+    with sio.open_in(str(file_path), engine=engine) as file_obj:
+        assert file_obj.read() == CONTENT_UTXT
+
+def test_io_engine_refuses_bytes(sio, tmp_path):
+    #/
+    with sio.open_out(str(tmp_path / 'f.txt'), engine='io') as file_obj:
+        with pytest.raises(TypeError):
+            file_obj.write(b'bytes')
+
+def test_io_engine_buf_size_and_newline(sio, tmp_path):
+    #/
+    file_path = tmp_path / 'f.txt'
+
+    #/
+    with sio.open_out(str(file_path), engine='io', buf_size=16, newline='\r\n') as file_obj:
+        file_obj.write('a\nb\n')
+
+    #/
+    assert file_path.read_bytes() == b'a\r\nb\r\n'
@@ -0,0 +1,108 @@
+# coding: utf-8
+"""
+File ID: 8Qy5Lt7
+
+Tests of the file name sanitizer, |SixyIO.filename_esc| and
+|SixyIO.filename_esc_many|, and |--ofnte|, |--ofnts|, and |--ofntn|.
+"""
+
+import pytest
+
+from aoiksixyio import SixyIO
+
+#/
+NAME_S = [
+    'plain.txt',
+    '中文.txt',
+    'a\\b/c<d>e:f*g?h"i|j',
+    '::',
+    '',
+    ## Lone surrogate, as given by |os.fsdecode| for bad bytes.
+    'bad\udcff:x',
+]
+
+def esc_ref(name, mode):
+    """
+    Reference implementation, one |replace| per character.
+    """
+    #/
+    for char, notation in SixyIO.FILENAME_ESC_NOTATION_PAIR_S:
+        #/
+        if mode == SixyIO.FILENAME_ESC_EMPTY:
+            notation = ''
+        elif mode == SixyIO.FILENAME_ESC_SPACE:
+            notation = ' '
+
+        #/
+        name = name.replace(char, notation)
+
+    #/
+    return name
+
+MODE_S = [
+    SixyIO.FILENAME_ESC_EMPTY,
+    SixyIO.FILENAME_ESC_SPACE,
+    SixyIO.FILENAME_ESC_NOTATION,
+]
+
+@pytest.mark.parametrize('mode', MODE_S)
+@pytest.mark.parametrize('name', NAME_S)
+def test_esc_same_as_ref(name, mode):
+    #/
+    assert SixyIO.filename_esc(name, mode) == esc_ref(name, mode)
+
+@pytest.mark.parametrize('mode', MODE_S)
+def test_esc_many_same_as_esc(mode):
+    #/
+    ## A name with NUL makes the batch fall back to one call per name.
+    for name_s in [NAME_S, NAME_S + ['nul\0:x'], []]:
+        assert SixyIO.filename_esc_many(name_s, mode) == [SixyIO.filename_esc(x, mode) for x in name_s]
+
+def test_esc_default_mode_is_notation():
+    #/
+    assert SixyIO.filename_esc('a:b') == 'a%3Ab'
+
+@pytest.mark.parametrize('opt, name', [
+    ('--ofnte', 'ab.txt'),
+    ('--ofnts', 'a b.txt'),
+    ('--ofntn', 'a%3Ab.txt'),
+])
+def test_output_file_name_escaped(run_exp, tmp_path, opt, name):
+    #/
+    res = run_exp(['--ia', 'x', '--of', str(tmp_path / 'a:b.txt'), opt])
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    #/
+    ## The dir part is kept as is.
+    assert [x.name for x in tmp_path.iterdir()] == [name]
+
+    assert (tmp_path / name).read_bytes() == b'x'
+
+@pytest.mark.parametrize('name', ['clean', 'a:b'])
+def test_unknown_mode_refused(name):
+    #/
+    with pytest.raises(ValueError):
+        SixyIO.filename_esc(name, 'no-such-mode')
+
+    #/
+    with pytest.raises(ValueError):
+        SixyIO.filename_esc_many([name], 'no-such-mode')
+
+    with pytest.raises(ValueError):
+        SixyIO.filename_esc_many([], 'no-such-mode')
+
+def test_tables_not_rebuilt_by_refresh():
+    #/
+    table_d = SixyIO.FILENAME_ESC_BTABLE_D
+
+    pair_s = SixyIO.FILENAME_ESC_NOTATION_PAIR_S
+
+    #/
+    SixyIO.refresh()
+
+    #/
+    assert SixyIO.FILENAME_ESC_BTABLE_D is table_d
+
+    assert SixyIO.FILENAME_ESC_NOTATION_PAIR_S is pair_s
@@ -0,0 +1,72 @@
+# coding: utf-8
+"""
+File ID: 5Lp7Dz3
+
+Tests of the lazy environment probes of |SixyIO|. Run in a subprocess each,
+so that probes are not evaluated by other tests first.
+"""
+
+from conftest import run_code
+
+def run_check(code):
+    #/
+    res = run_code(code, [])
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    #/
+    return res.stdout
+
+def test_import_does_not_probe():
+    #/
+    stdout_btxt = run_check('''
+from aoiksixyio import SixyIO
+from aoiksixyio.aoiksixyio_ import LazyClassAttr
+
+for name in ['LCE', 'STDIE', 'STDOE', 'STDEE', 'CAE', 'FSE', 'stdout_write_b']:
+    assert isinstance(vars(SixyIO)[name], LazyClassAttr), name
+
+print('ok')
+''')
+
+    #/
+    assert stdout_btxt == b'ok\n'
+
+def test_probe_replaced_by_value():
+    #/
+    stdout_btxt = run_check('''
+from aoiksixyio import SixyIO
+
+value = SixyIO.STDOE
+
+assert vars(SixyIO)['STDOE'] == value
+
+print(value)
+''')
+
+    #/
+    ## |PYTHONIOENCODING| set by |make_env|.
+    assert stdout_btxt == b'utf-8\n'
+
+def test_refresh_probes_again():
+    #/
+    stdout_btxt = run_check('''
+import io
+import sys
+
+from aoiksixyio import SixyIO
+
+assert SixyIO.STDIE == 'utf-8'
+
+sys.stdin = io.TextIOWrapper(io.BytesIO(), encoding='gbk')
+
+assert SixyIO.STDIE == 'utf-8'
+
+SixyIO.refresh()
+
+print(SixyIO.STDIE, SixyIO.STDIE_UTXT)
+''')
+
+    #/
+    assert stdout_btxt == b'gbk gbk\n'
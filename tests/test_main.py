@@ -0,0 +1,83 @@
+# coding: utf-8
+"""
+File ID: 3Jw7Pf4
+
+Tests of |aoiksixyioexp.main|'s cmd args handling and exit codes.
+"""
+
+import sys
+
+import pytest
+
+from aoiksixyio import SixyIO
+from aoiksixyio import SixyIOObj
+from aoiksixyio import aoiksixyioexp
+
+def test_old_python_version_refused(monkeypatch):
+    #/
+    monkeypatch.setattr(sys, 'version_info', (3, 6, 15, 'final', 0))
+
+    #/
+    assert aoiksixyioexp.main(args=['--ia', 'x']) \
+        == aoiksixyioexp.MAIN_RET_V_PYTHON_VER_NOT_SUPPORTED
+
+def test_help_does_not_check_encodings(run_exp):
+    #/
+    res = run_exp(['-h', '--stdoe', 'no-such-enc'])
+
+    #/
+    assert res.returncode == aoiksixyioexp.MAIN_RET_V_SHOW_HELP
+
+    assert b'usage:' in res.stdout
+
+@pytest.mark.parametrize('opt', ['--stdoe', '--ife', '--spoe', '--cae'])
+def test_bad_encoding_option_refused(run_exp, opt):
+    #/
+    res = run_exp(['--ia', 'x', opt, 'no-such-enc'])
+
+    #/
+    assert res.returncode == aoiksixyioexp.MAIN_RET_V_INIT_EASYIO_ERR
+
+    assert b'no-such-enc' in res.stderr
+
+def test_default_encodings_checked_unless_turned_off(monkeypatch):
+    #/
+    monkeypatch.setattr(SixyIO, 'OFE', 'no-such-enc')
+
+    #/
+    with pytest.raises(AssertionError):
+        SixyIOObj()
+
+    #/
+    assert SixyIOObj(default_check_on=False).ofe == 'no-such-enc'
+
+@pytest.mark.parametrize('make_arg_s, input_btxt, ret_v', [
+    ## Bad encoding arg.
+    (lambda tmp_path: ['--stdie', 'no-such-enc'], b'', aoiksixyioexp.MAIN_RET_V_INIT_EASYIO_ERR),
+    ## Input file not found.
+    (lambda tmp_path: ['--if', str(tmp_path / 'no-such-file')], b'',
+        aoiksixyioexp.MAIN_RET_V_OPEN_INPUT_FILE_ERR),
+    ## Input file decode error.
+    (lambda tmp_path: ['--if', str(tmp_path / 'bad.txt'), '--ife', 'utf-8', '--nopt'], b'',
+        aoiksixyioexp.MAIN_RET_V_READ_INPUT_FILE_ERR),
+    ## Stdin decode error.
+    (lambda tmp_path: ['--stdie', 'utf-8', '--nopt'], b'\xff', aoiksixyioexp.MAIN_RET_V_READ_STDIN_ERR),
+    ## Stdout encode error.
+    (lambda tmp_path: ['--ia', '中', '--stdoe', 'ascii'], b'', aoiksixyioexp.MAIN_RET_V_WRITE_STDOUT_ERR),
+    ## Output dir not found.
+    (lambda tmp_path: ['--ia', 'x', '--of', str(tmp_path / 'no' / 'out.txt')], b'',
+        aoiksixyioexp.MAIN_RET_V_OPEN_OUTPUT_FILE_ERR),
+    ## Output file encode error.
+    (lambda tmp_path: ['--ia', '中', '--of', str(tmp_path / 'out.txt'), '--ofe', 'ascii'], b'',
+        aoiksixyioexp.MAIN_RET_V_WRITE_OUTPUT_FILE_ERR),
+])
+@pytest.mark.parametrize('extra_arg_s', [[], ['--stream']])
+def test_exit_code(run_exp, tmp_path, make_arg_s, input_btxt, ret_v, extra_arg_s):
+    #/
+    (tmp_path / 'bad.txt').write_bytes(b'abc\xff')
+
+    #/
+    res = run_exp(make_arg_s(tmp_path) + extra_arg_s, input_btxt=input_btxt)
+
+    #/
+    assert res.returncode == ret_v, res.stderr
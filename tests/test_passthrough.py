@@ -0,0 +1,99 @@
+# coding: utf-8
+"""
+File ID: 2Wv6Kd9
+
+Tests of passthrough mode, and of output to the input file.
+"""
+
+import os
+
+import pytest
+
+#/
+CONTENT_BTXT = 'keep me 中文\n'.encode('utf-8') * 100
+
+@pytest.mark.parametrize('extra_arg_s', [
+    [],
+    ['--nopt'],
+    ['--stream'],
+    ['--mmap'],
+    ['--rec'],
+    ['--stats'],
+])
+def test_output_to_input_file_keeps_content(run_exp, tmp_path, extra_arg_s):
+    #/
+    file_path = tmp_path / 'f.txt'
+
+    file_path.write_bytes(CONTENT_BTXT)
+
+    #/
+    res = run_exp(['--if', str(file_path), '--of', str(file_path)] + extra_arg_s)
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert file_path.read_bytes() == CONTENT_BTXT
+
+def test_output_to_input_file_via_link_keeps_content(run_exp, tmp_path):
+    #/
+    file_path = tmp_path / 'f.txt'
+
+    file_path.write_bytes(CONTENT_BTXT)
+
+    link_path = tmp_path / 'lnk.txt'
+
+    os.symlink(str(file_path), str(link_path))
+
+    #/
+    res = run_exp(['--if', str(file_path), '--of', str(link_path)])
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert file_path.read_bytes() == CONTENT_BTXT
+
+def test_batch_output_dir_same_as_input_dir_keeps_content(run_exp, tmp_path):
+    #/
+    content_d = {
+        'a.txt': b'aaa\n',
+        'b.txt': CONTENT_BTXT,
+    }
+
+    for name, btxt in content_d.items():
+        (tmp_path / name).write_bytes(btxt)
+
+    #/
+    res = run_exp(['--bif', str(tmp_path), '--bod', str(tmp_path), '--bj', '2'])
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    for name, btxt in content_d.items():
+        assert (tmp_path / name).read_bytes() == btxt
+
+def test_passthrough_copies_bytes(run_exp, tmp_path):
+    #/
+    input_path = tmp_path / 'in.txt'
+
+    input_path.write_bytes(CONTENT_BTXT)
+
+    output_path = tmp_path / 'out.txt'
+
+    #/
+    res = run_exp(['--if', str(input_path), '--of', str(output_path), '--stats'])
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert output_path.read_bytes() == CONTENT_BTXT
+
+    assert b'passthrough' in res.stderr
+
+def test_passthrough_invalid_input_fails(run_exp):
+    #/
+    res = run_exp([], input_btxt=b'ab\xff\n')
+
+    #/
+    assert res.returncode == 6
+
+    assert res.stdout == b''
@@ -0,0 +1,139 @@
+# coding: utf-8
+"""
+File ID: 2Gx8Mb4
+
+Tests of the ASCII pre-scan fast path and its counts.
+"""
+
+import codecs
+import threading
+
+import pytest
+
+from aoiksixyio import SixyIO
+
+@pytest.fixture
+def prescan_stats_on():
+    #/
+    SixyIO.prescan_stats_enable()
+
+    SixyIO.prescan_stats_reset()
+
+    #/
+    yield
+
+    #/
+    SixyIO.prescan_stats_enable(False)
+
+def test_counts_off_by_default():
+    #/
+    assert SixyIO.to_u(b'abc', 'gbk') == 'abc'
+
+    #/
+    assert SixyIO.prescan_stats()['scan_chunk_count'] == 0
+
+def test_to_u_counts(prescan_stats_on):
+    #/
+    assert SixyIO.to_u(b'abc', 'gbk') == 'abc'
+
+    assert SixyIO.to_u('中'.encode('gbk'), 'gbk') == '中'
+
+    #/
+    stat_d = SixyIO.prescan_stats()
+
+    assert stat_d['scan_chunk_count'] == 2
+
+    assert stat_d['scan_byte_count'] == 5
+
+    assert stat_d['fast_chunk_count'] == 1
+
+    assert stat_d['fast_byte_count'] == 3
+
+    assert stat_d['fast_ratio'] == pytest.approx(0.6)
+
+def test_counts_exact_across_threads(prescan_stats_on):
+    #/
+    thread_count = 8
+
+    call_count = 2000
+
+    def work():
+        for _ in range(call_count):
+            SixyIO.to_u(b'ab', 'gbk')
+
+    #/
+    thread_s = [threading.Thread(target=work) for _ in range(thread_count)]
+
+    for thread in thread_s:
+        thread.start()
+
+    for thread in thread_s:
+        thread.join()
+
+    #/
+    stat_d = SixyIO.prescan_stats()
+
+    assert stat_d['fast_chunk_count'] == thread_count * call_count
+
+    assert stat_d['fast_byte_count'] == thread_count * call_count * 2
+
+def test_decode_chunk_after_partial_char_uses_codec(prescan_stats_on):
+    #/
+    decoder = SixyIO.make_decoder('gbk')
+
+    btxt = '中'.encode('gbk')
+
+    #/
+    ## The second byte of a character is not ASCII, but the byte after it
+    ##  is. The decoder holds the first byte, so the codec must run.
+    assert SixyIO.decode_chunk(decoder, btxt[:1], prescan_on=True) == ''
+
+    assert SixyIO.decode_chunk(decoder, btxt[1:] + b'a', prescan_on=True) == '中a'
+
+    assert SixyIO.decode_chunk(decoder, b'bc', prescan_on=True) == 'bc'
+
+    #/
+    stat_d = SixyIO.prescan_stats()
+
+    assert stat_d['scan_chunk_count'] == 3
+
+    assert stat_d['fast_chunk_count'] == 1
+
+def test_debug_prints_counts(run_exp):
+    #/
+    res = run_exp(['--debug', '--stdie', 'gbk', '--nopt'], input_btxt=b'abc\n')
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert res.stdout == b'abc\n'
+
+    assert b'ASCII fast path: 4 of 4 pre-scanned bytes' in res.stderr
+
+@pytest.mark.parametrize('encoding', ['rot13', 'hex', 'zlib', 'base64'])
+def test_non_text_codec_raises_lookup_error(prescan_stats_on, encoding):
+    #/
+    for _ in range(2):
+        with pytest.raises(LookupError):
+            SixyIO.to_u(b'abc', encoding)
+
+    #/
+    ## Refused by the probe once, and the result kept.
+    assert SixyIO._ascii_prescan_d[encoding] is False
+
+    assert SixyIO.prescan_stats()['scan_chunk_count'] == 0
+
+def test_probe_error_turns_prescan_off(monkeypatch):
+    #/
+    class ProbeError(Exception):
+        pass
+
+    def decode(btxt, errors='strict'):
+        raise ProbeError()
+
+    info = codecs.CodecInfo(codecs.latin_1_encode, decode, name='probe-err-enc')
+
+    monkeypatch.setattr(SixyIO, 'codec_info', staticmethod(lambda encoding: info))
+
+    #/
+    assert SixyIO.codec_is_ascii_compatible('probe-err-enc') is False
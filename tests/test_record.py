@@ -0,0 +1,98 @@
+# coding: utf-8
+"""
+File ID: 3Nv8Hc1
+
+Tests of record mode, |--rec| and |--rsep|.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+from conftest import MAIN_CODE
+from conftest import make_env
+
+#/
+RECORD_UTXT_S = ['rec {} 中文'.format(i) for i in range(5000)]
+
+@pytest.mark.parametrize('rsep_name, rsep', [
+    ('nl', '\n'),
+    ('crlf', '\r\n'),
+    ('nul', '\0'),
+    (';;', ';;'),
+])
+@pytest.mark.parametrize('chunk_arg_s', [[], ['--chunk', '1'], ['--chunk', '7']])
+def test_same_output_as_one_shot(run_exp, rsep_name, rsep, chunk_arg_s):
+    #/
+    ## No separator at the end, so the last record ends with input.
+    input_utxt = rsep.join(RECORD_UTXT_S)
+
+    #/
+    res = run_exp(['--rec', '--rsep', rsep_name, '--stdie', 'gbk', '--stdoe', 'utf-8'] + chunk_arg_s,
+        input_btxt=input_utxt.encode('gbk'))
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert res.stdout == input_utxt.encode('utf-8')
+
+def test_output_file(run_exp, tmp_path):
+    #/
+    input_utxt = '\n'.join(RECORD_UTXT_S) + '\n'
+
+    input_path = tmp_path / 'in.txt'
+
+    input_path.write_bytes(input_utxt.encode('gbk'))
+
+    output_path = tmp_path / 'out.txt'
+
+    #/
+    res = run_exp(['--rec', '--if', str(input_path), '--ife', 'gbk', '--of', str(output_path),
+        '--ofe', 'utf-16-le'])
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert output_path.read_bytes() == input_utxt.encode('utf-16-le')
+
+def test_decode_error_exit_code(run_exp):
+    #/
+    res = run_exp(['--rec', '--stdie', 'utf-8'], input_btxt=b'a\nb\xff\nc\n')
+
+    #/
+    assert res.returncode == 6
+
+    assert b'Failed decoding input data from stdin' in res.stderr
+
+def test_output_ends_on_record_boundary():
+    #/
+    proc = subprocess.Popen(
+        [sys.executable, '-c', MAIN_CODE, '--rec', '--stdie', 'gbk'],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        env=make_env(),
+    )
+
+    #/
+    try:
+        #/
+        proc.stdin.write(b'a\nb')
+
+        proc.stdin.flush()
+
+        #/
+        ## The whole record is written while stdin is still open. The cut
+        ##  one is held back.
+        assert proc.stdout.read1(100) == b'a\n'
+
+        #/
+        proc.stdin.close()
+
+        assert proc.stdout.read() == b'b'
+
+        assert proc.wait(timeout=30) == 0
+    finally:
+        proc.kill()
+
+        proc.wait()
@@ -0,0 +1,193 @@
+# coding: utf-8
+"""
+File ID: 4Tn8Wq2
+
+Tests of server mode, |aoiksixyiosrv| with client |aoiksixyiocli|.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import pytest
+
+from conftest import make_env
+from conftest import run_code
+
+#/
+CLI_CODE = 'import sys; from aoiksixyiocli import main; sys.exit(main())'
+
+@pytest.fixture(scope='module')
+def srv_sock_path():
+    """
+    Start a server on a socket in a temp directory, and return the socket
+    path. The path is kept short for the Unix domain socket path limit.
+    """
+    #/
+    dir_path = tempfile.mkdtemp(prefix='sxs')
+
+    sock_path = os.path.join(dir_path, 's.sock')
+
+    #/
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'aoiksixyio.aoiksixyiosrv', '--sock', sock_path],
+        env=make_env(),
+    )
+
+    #/
+    try:
+        #/
+        deadline = time.time() + 30
+
+        while not os.path.exists(sock_path):
+            #/
+            assert proc.poll() is None, 'Server exited.'
+
+            assert time.time() < deadline, 'Server did not start.'
+
+            time.sleep(0.05)
+
+        #/
+        yield sock_path
+    finally:
+        #/
+        proc.terminate()
+
+        proc.wait(timeout=30)
+
+        shutil.rmtree(dir_path, ignore_errors=True)
+
+def run_cli(arg_s, sock_path, input_btxt=b'', cwd=None):
+    #/
+    return run_code(CLI_CODE, arg_s, input_btxt=input_btxt, cwd=cwd,
+        env=make_env(AOIKSIXYIO_SOCK=sock_path))
+
+def test_connect_to_own_server(srv_sock_path, monkeypatch):
+    #/
+    import aoiksixyiocli
+
+    #/
+    monkeypatch.setenv('AOIKSIXYIO_SOCK', srv_sock_path)
+
+    sock = aoiksixyiocli.connect()
+
+    #/
+    assert sock is not None
+
+    sock.close()
+
+def test_round_trip_stdin_to_stdout(srv_sock_path):
+    #/
+    res = run_cli(['--stdie', 'gbk'], srv_sock_path, input_btxt='中文\n'.encode('gbk'))
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert res.stdout == '中文\n'.encode('utf-8')
+
+def test_round_trip_input_arg(srv_sock_path):
+    #/
+    res = run_cli(['--ia', 'hello'], srv_sock_path)
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert res.stdout == b'hello'
+
+def test_round_trip_uses_client_cwd(srv_sock_path, tmp_path):
+    #/
+    (tmp_path / 'in.txt').write_bytes(b'from cwd\n')
+
+    #/
+    res = run_cli(['--if', 'in.txt', '--of', 'out.txt'], srv_sock_path, cwd=str(tmp_path))
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert (tmp_path / 'out.txt').read_bytes() == b'from cwd\n'
+
+@pytest.mark.parametrize('arg_s, input_btxt', [
+    (['--bad-arg'], b''),
+    (['--if', 'no/such/file'], b''),
+    (['--stdie', 'utf-8'], b'\xff\xfe\xfd'),
+])
+def test_exit_code_same_as_local(srv_sock_path, run_exp, arg_s, input_btxt):
+    #/
+    local_res = run_exp(arg_s, input_btxt=input_btxt)
+
+    srv_res = run_cli(arg_s, srv_sock_path, input_btxt=input_btxt)
+
+    #/
+    assert local_res.returncode != 0
+
+    assert srv_res.returncode == local_res.returncode
+
+    assert srv_res.stdout == local_res.stdout
+
+def test_no_server_runs_local(tmp_path):
+    #/
+    res = run_cli(['--ia', 'local'], str(tmp_path / 'none.sock'))
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert res.stdout == b'local'
+
+def test_other_user_server_runs_local(srv_sock_path, tmp_path, monkeypatch):
+    #/
+    import aoiksixyiocli
+
+    #/
+    sent_s = []
+
+    monkeypatch.setenv('AOIKSIXYIO_SOCK', srv_sock_path)
+
+    monkeypatch.setattr(aoiksixyiocli, 'get_peer_uid', lambda sock: os.getuid() + 1)
+
+    monkeypatch.setattr(aoiksixyiocli, 'send_request', lambda *args: sent_s.append(args))
+
+    #/
+    out_path = tmp_path / 'out.txt'
+
+    ret_v = aoiksixyiocli.main(['--ia', 'local', '--of', str(out_path)])
+
+    #/
+    assert ret_v == 0
+
+    assert sent_s == []
+
+    assert out_path.read_bytes() == b'local'
+
+def test_make_sock_dir_rejects_open_dir(tmp_path):
+    #/
+    from aoiksixyio.aoiksixyiosrv import make_sock_dir
+
+    #/
+    dir_path = tmp_path / 'open'
+
+    dir_path.mkdir()
+
+    dir_path.chmod(0o755)
+
+    #/
+    with pytest.raises(EnvironmentError):
+        make_sock_dir(str(dir_path))
+
+def test_make_sock_dir_creates_private_dir(tmp_path):
+    #/
+    from aoiksixyio.aoiksixyiosrv import make_sock_dir
+
+    #/
+    dir_path = tmp_path / 'private'
+
+    make_sock_dir(str(dir_path))
+
+    #/
+    assert dir_path.stat().st_mode & 0o777 == 0o700
+
+    #/
+    ## An existing private directory is accepted.
+    make_sock_dir(str(dir_path))
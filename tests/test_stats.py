@@ -0,0 +1,179 @@
+# coding: utf-8
+"""
+File ID: 8Fm5Ty1
+
+Tests of |--stats| and |--stats-file|.
+"""
+
+import json
+
+import pytest
+
+#/
+BAD_BTXT = b'a\xffb\xfec\n'
+
+def run_stats(run_exp, tmp_path, arg_s, input_btxt=b''):
+    """
+    Run with |--stats-file|. Return the |CompletedProcess| and the stats.
+    """
+    #/
+    stats_path = tmp_path / 'stats.json'
+
+    res = run_exp(arg_s + ['--stats-file', str(stats_path)], input_btxt=input_btxt)
+
+    #/
+    return res, json.loads(stats_path.read_text())
+
+@pytest.mark.parametrize('extra_arg_s', [[], ['--stream'], ['--rec']])
+def test_replaced_decode_errors_in_stage(run_exp, tmp_path, extra_arg_s):
+    #/
+    res, stat_d = run_stats(run_exp, tmp_path,
+        ['--stdie', 'utf-8', '--decerr', 'replace', '--nopt'] + extra_arg_s, input_btxt=BAD_BTXT)
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert res.stdout == 'a�b�c\n'.encode('utf-8')
+
+    #/
+    assert stat_d['streams']['stdin']['err_count'] == 2
+
+    assert stat_d['stages']['decode']['decode_err_count'] == 2
+
+def test_fatal_decode_error_counted_once(run_exp, tmp_path):
+    #/
+    res, stat_d = run_stats(run_exp, tmp_path, ['--stdie', 'utf-8', '--nopt'], input_btxt=BAD_BTXT)
+
+    #/
+    assert res.returncode == 6
+
+    assert stat_d['exit_code'] == 6
+
+    #/
+    assert stat_d['streams']['stdin']['err_count'] == 1
+
+    assert stat_d['stages']['decode']['decode_err_count'] == 1
+
+def test_stats_written_when_output_fails(run_exp, tmp_path):
+    #/
+    res, stat_d = run_stats(run_exp, tmp_path,
+        ['--ia', 'x', '--of', str(tmp_path / 'no' / 'such' / 'dir')])
+
+    #/
+    assert res.returncode == 16
+
+    assert stat_d['exit_code'] == 16
+
+def test_subproc_decode_errors_in_stage(run_exp, tmp_path):
+    #/
+    res, stat_d = run_stats(run_exp, tmp_path,
+        ['--stdie', 'latin-1', '--spie', 'latin-1', '--spoe', 'utf-8', '--decerr', 'replace',
+            '--sp', 'cat'],
+        input_btxt=BAD_BTXT)
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert stat_d['streams']['subproc_stdout']['err_count'] == 2
+
+    assert stat_d['stages']['subproc_decode']['decode_err_count'] == 2
+
+#/
+## Bad bytes, incl. a cut character inside the data and at its end.
+OFFSET_BTXT = b'ab\xffc\xe4\xb8\xad\xfe\xfdxyz\xe4\xb8x\xff\xe4\xb8'
+
+OFFSET_S = [2, 7, 8, 12, 15, 16]
+
+@pytest.mark.parametrize('extra_arg_s', [
+    [],
+    ['--stream'],
+    ['--stream', '--chunk', '1'],
+    ['--stream', '--chunk', '5'],
+    ['--rec'],
+])
+def test_stdin_error_offsets_across_chunks(run_exp, tmp_path, extra_arg_s):
+    #/
+    res, stat_d = run_stats(run_exp, tmp_path,
+        ['--stdie', 'utf-8', '--decerr', 'replace', '--nopt'] + extra_arg_s, input_btxt=OFFSET_BTXT)
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert res.stdout == OFFSET_BTXT.decode('utf-8', 'replace').encode('utf-8')
+
+    #/
+    err_stat_d = stat_d['streams']['stdin']
+
+    assert err_stat_d['offset_s'] == OFFSET_S
+
+    assert err_stat_d['err_size'] == 8
+
+@pytest.mark.parametrize('extra_arg_s', [
+    [],
+    ['--stream', '--chunk', '2'],
+    ['--mmap', '--stream', '--chunk', '3'],
+])
+def test_input_file_error_offsets_across_chunks(run_exp, tmp_path, extra_arg_s):
+    #/
+    input_path = tmp_path / 'in.txt'
+
+    input_path.write_bytes(OFFSET_BTXT)
+
+    #/
+    res, stat_d = run_stats(run_exp, tmp_path,
+        ['--if', str(input_path), '--ife', 'utf-8', '--decerr', 'replace', '--nopt'] + extra_arg_s)
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    #/
+    assert stat_d['streams']['input_file']['offset_s'] == OFFSET_S
+
+    assert stat_d['stages']['decode']['decode_err_count'] == len(OFFSET_S)
+
+@pytest.mark.parametrize('encoding', [
+    ## Checked while copied.
+    'utf-8',
+    ## Copied by the kernel if possible.
+    'latin-1',
+])
+@pytest.mark.parametrize('extra_arg_s', [[], ['--stream'], ['--stream', '--chunk', '5']])
+@pytest.mark.parametrize('file_on', [False, True])
+def test_passthrough_sizes(run_exp, tmp_path, encoding, extra_arg_s, file_on):
+    #/
+    input_btxt = 'hello 中文\n'.encode(encoding, 'replace') * 3
+
+    #/
+    if file_on:
+        #/
+        input_path = tmp_path / 'in.txt'
+
+        input_path.write_bytes(input_btxt)
+
+        output_path = tmp_path / 'out.txt'
+
+        io_arg_s = ['--if', str(input_path), '--ife', encoding, '--of', str(output_path), '--ofe', encoding]
+
+        stdin_btxt = b''
+    else:
+        io_arg_s = ['--stdie', encoding, '--stdoe', encoding]
+
+        stdin_btxt = input_btxt
+
+    #/
+    res, stat_d = run_stats(run_exp, tmp_path, io_arg_s + extra_arg_s, input_btxt=stdin_btxt)
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    if file_on:
+        assert output_path.read_bytes() == input_btxt
+    else:
+        assert res.stdout == input_btxt
+
+    #/
+    stage_stat_d = stat_d['stages']['passthrough']
+
+    assert stage_stat_d['in_size'] == len(input_btxt)
+
+    assert stage_stat_d['out_size'] == len(input_btxt)
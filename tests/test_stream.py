@@ -0,0 +1,171 @@
+# coding: utf-8
+"""
+File ID: 7Tc3Vn6
+
+Tests of stream mode, |--stream| and |--chunk|, and mmap mode, |--mmap|,
+against one-shot mode.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+from aoiksixyio import SixyIO
+from conftest import MAIN_CODE
+from conftest import make_env
+
+#/
+CONTENT_UTXT = ''.join('line {} 中文\r\n'.format(i) for i in range(3000))
+
+GBK_BTXT = CONTENT_UTXT.encode('gbk')
+
+UTF8_BTXT = CONTENT_UTXT.encode('utf-8')
+
+#/
+## Chunk sizes of 1 and 7 cut most multibyte characters.
+STREAM_ARG_S_S = [
+    [],
+    ['--stream'],
+    ['--stream', '--chunk', '1'],
+    ['--stream', '--chunk', '7'],
+]
+
+@pytest.mark.parametrize('extra_arg_s', STREAM_ARG_S_S)
+def test_stdin_stream_and_one_shot_same_output(run_exp, extra_arg_s):
+    #/
+    res = run_exp(['--stdie', 'gbk', '--stdoe', 'utf-8'] + extra_arg_s, input_btxt=GBK_BTXT)
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert res.stdout == UTF8_BTXT
+
+@pytest.mark.parametrize('extra_arg_s', STREAM_ARG_S_S)
+def test_input_file_stream_and_one_shot_same_output(run_exp, tmp_path, extra_arg_s):
+    #/
+    input_path = tmp_path / 'in.txt'
+
+    input_path.write_bytes(GBK_BTXT)
+
+    output_path = tmp_path / 'out.txt'
+
+    #/
+    res = run_exp(['--if', str(input_path), '--ife', 'gbk', '--of', str(output_path), '--ofe', 'utf-8']
+        + extra_arg_s)
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert output_path.read_bytes() == UTF8_BTXT
+
+@pytest.mark.parametrize('extra_arg_s', STREAM_ARG_S_S)
+def test_input_arg_stream_and_one_shot_same_output(run_exp, extra_arg_s):
+    #/
+    res = run_exp(['--ia', '中文 x', '--stdoe', 'gbk'] + extra_arg_s)
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert res.stdout == '中文 x'.encode('gbk')
+
+@pytest.mark.parametrize('extra_arg_s', STREAM_ARG_S_S)
+def test_decode_error_exit_code(run_exp, extra_arg_s):
+    #/
+    res = run_exp(['--stdie', 'utf-8', '--nopt'] + extra_arg_s, input_btxt=b'abc\xff')
+
+    #/
+    assert res.returncode == 6
+
+    assert b'Failed decoding input data from stdin' in res.stderr
+
+def test_stream_output_before_input_ends():
+    #/
+    proc = subprocess.Popen(
+        [sys.executable, '-c', MAIN_CODE, '--stream', '--stdie', 'gbk', '--nopt'],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        env=make_env(),
+    )
+
+    #/
+    try:
+        #/
+        proc.stdin.write('中\n'.encode('gbk'))
+
+        proc.stdin.flush()
+
+        #/
+        ## Read back while stdin is still open.
+        assert proc.stdout.readline() == '中\n'.encode('utf-8')
+
+        #/
+        proc.stdin.close()
+
+        assert proc.stdout.read() == b''
+
+        assert proc.wait(timeout=30) == 0
+    finally:
+        proc.kill()
+
+        proc.wait()
+
+@pytest.mark.parametrize('chunk_arg_s', [[], ['--chunk', '1'], ['--chunk', '7']])
+def test_mmap_same_output(run_exp, tmp_path, chunk_arg_s):
+    #/
+    input_path = tmp_path / 'in.txt'
+
+    input_path.write_bytes(GBK_BTXT)
+
+    #/
+    res = run_exp(['--if', str(input_path), '--ife', 'gbk', '--mmap'] + chunk_arg_s)
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert res.stdout == UTF8_BTXT
+
+def test_mmap_empty_file(run_exp, tmp_path):
+    #/
+    input_path = tmp_path / 'in.txt'
+
+    input_path.write_bytes(b'')
+
+    #/
+    res = run_exp(['--if', str(input_path), '--ife', 'gbk', '--mmap'])
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert res.stdout == b''
+
+def test_mmap_decode_error_exit_code(run_exp, tmp_path):
+    #/
+    input_path = tmp_path / 'in.txt'
+
+    input_path.write_bytes(b'abc\xff')
+
+    #/
+    res = run_exp(['--if', str(input_path), '--ife', 'utf-8', '--mmap', '--nopt'])
+
+    #/
+    assert res.returncode == 5
+
+    assert b'Failed decoding input file data' in res.stderr
+
+def test_iter_decode_mmap_pipe_falls_back():
+    #/
+    proc = subprocess.Popen(['cat'], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    proc.stdin.write(GBK_BTXT[:100])
+
+    proc.stdin.close()
+
+    #/
+    try:
+        assert ''.join(SixyIO.iter_decode_mmap(proc.stdout, 'gbk', chunk_size=3)) \
+            == GBK_BTXT[:100].decode('gbk')
+    finally:
+        proc.stdout.close()
+
+        proc.wait()
@@ -0,0 +1,274 @@
+# coding: utf-8
+"""
+File ID: 4Px9Gw3
+
+Tests of subproc mode, |--sp|: one-shot and stream mode, pipelines, the
+worker pool, and exit codes.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+from conftest import MAIN_CODE
+from conftest import make_env
+
+#/
+LINE_BTXT_S = ['line {} 中文\n'.format(i).encode('utf-8') for i in range(20000)]
+
+INPUT_BTXT = b''.join(LINE_BTXT_S)
+
+@pytest.mark.parametrize('extra_arg_s', [
+    [],
+    ['--stream'],
+    ['--stream', '--chunk', '7'],
+])
+def test_stream_and_one_shot_same_output(run_exp, extra_arg_s):
+    #/
+    res = run_exp(['--sp', 'cat'] + extra_arg_s, input_btxt=INPUT_BTXT)
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert res.stdout == INPUT_BTXT
+
+def test_transcode_via_subproc(run_exp):
+    #/
+    res = run_exp(['--stdie', 'gbk', '--spie', 'utf-16-le', '--spoe', 'utf-16-le', '--stdoe', 'utf-8',
+        '--sp', 'cat'], input_btxt='中文\n'.encode('gbk'))
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert res.stdout == '中文\n'.encode('utf-8')
+
+def test_subproc_stderr_written_in_block(run_exp):
+    #/
+    res = run_exp(['--spsh', '--sp', 'echo err >&2; cat'], input_btxt=b'out\n')
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert res.stdout == b'out\n'
+
+    assert res.stderr == b'#/ Subproc stderr\n---\nerr\n---\n'
+
+def test_pipeline(run_exp):
+    #/
+    res = run_exp(['--sp', 'cat', '--sp', 'tr a-z A-Z', '--sp', 'cat'], input_btxt=b'abc\n')
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert res.stdout == b'ABC\n'
+
+@pytest.mark.parametrize('extra_arg_s', [[], ['--rec'], ['--chunk', '7']])
+def test_pool_keeps_input_order(run_exp, extra_arg_s):
+    #/
+    res = run_exp(['--spw', '4', '--sp', 'sed -u s/line/LINE/'] + extra_arg_s, input_btxt=INPUT_BTXT)
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert res.stdout == INPUT_BTXT.replace(b'line', b'LINE')
+
+def test_stream_output_before_input_ends():
+    #/
+    proc = subprocess.Popen(
+        [sys.executable, '-c', MAIN_CODE, '--stream', '--sp', 'cat'],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        env=make_env(),
+    )
+
+    #/
+    try:
+        #/
+        proc.stdin.write(b'first\n')
+
+        proc.stdin.flush()
+
+        #/
+        ## Read back while stdin is still open.
+        assert proc.stdout.readline() == b'first\n'
+
+        #/
+        proc.stdin.close()
+
+        assert proc.stdout.read() == b''
+
+        assert proc.wait(timeout=30) == 0
+    finally:
+        proc.kill()
+
+        proc.wait()
+
+@pytest.mark.parametrize('arg_s, input_btxt, ret_v', [
+    ## Run error.
+    (['--sp', 'no-such-cmd-5e7a'], b'x', 10),
+    ## Encode error of subproc stdin.
+    (['--spie', 'ascii', '--sp', 'cat'], '中'.encode('utf-8'), 9),
+    ## Decode error of subproc stdout.
+    (['--stdie', 'latin-1', '--spie', 'latin-1', '--spoe', 'utf-8', '--sp', 'cat'], b'\xff', 13),
+    ## Decode error of subproc stderr.
+    (['--spsh', '--spee', 'utf-8', '--sp', "printf '\\377' >&2"], b'', 11),
+])
+@pytest.mark.parametrize('extra_arg_s', [[], ['--stream']])
+def test_exit_code(run_exp, arg_s, input_btxt, ret_v, extra_arg_s):
+    #/
+    res = run_exp(arg_s + extra_arg_s, input_btxt=input_btxt)
+
+    #/
+    assert res.returncode == ret_v, res.stderr
+
+#/
+LEN_WORKER_CODE = '''
+import struct
+import sys
+
+file_in = sys.stdin.buffer
+file_out = sys.stdout.buffer
+
+while True:
+    head_btxt = file_in.read(4)
+
+    if not head_btxt:
+        break
+
+    btxt = file_in.read(struct.unpack('>I', head_btxt)[0])
+
+    btxt = btxt.decode('utf-16-le').upper().encode('utf-16-le')
+
+    file_out.write(struct.pack('>I', len(btxt)) + btxt)
+
+    file_out.flush()
+'''
+
+def test_pool_len_framed_records(run_exp, tmp_path):
+    #/
+    worker_path = tmp_path / 'worker.py'
+
+    worker_path.write_text(LEN_WORKER_CODE)
+
+    #/
+    ## Records containing NUL bytes in utf-16 need length framing.
+    res = run_exp(['--spw', '3', '--spwlen', '--spie', 'utf-16-le', '--spoe', 'utf-16-le',
+        '--sp', '{} {}'.format(sys.executable, worker_path)], input_btxt=INPUT_BTXT)
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert res.stdout == INPUT_BTXT.replace(b'line', b'LINE')
+
+def test_pool_crlf_records(run_exp):
+    #/
+    res = run_exp(['--spw', '2', '--rsep', 'crlf', '--sp', 'sed -u s/^/X/'], input_btxt=b'a\r\nb\r\nc\r\n')
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert res.stdout == b'Xa\r\nXb\r\nXc\r\n'
+
+def test_pool_worker_exits_early(run_exp):
+    #/
+    res = run_exp(['--spw', '2', '--sp', 'head -n 1'], input_btxt=INPUT_BTXT)
+
+    #/
+    assert res.returncode == 10
+
+    assert b'A subproc worker exited before returning all results' in res.stderr
+
+def test_direct_exec_does_not_use_shell(run_exp):
+    #/
+    res = run_exp(['--ia', 'x', '--sp', 'echo $HOME |'])
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert res.stdout == b'$HOME |\n'
+
+def test_direct_exec_arg_sep(run_exp):
+    #/
+    res = run_exp(['--ia', 'x', '--spsep', '|', '--sp', 'printf|%s-|a b'])
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert res.stdout == b'a b-'
+
+def test_shell_exec(run_exp):
+    #/
+    res = run_exp(['--ia', 'x', '--spsh', '--sp', "echo 'a  b' | tr a A"])
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert res.stdout == b'A  b\n'
+
+def test_cmd_encoding(run_exp):
+    #/
+    res = run_exp(['--ia', 'x', '--spce', 'gbk', '--spoe', 'gbk', '--sp', 'echo 中文'])
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert res.stdout == '中文\n'.encode('utf-8')
+
+@pytest.mark.parametrize('spie_2', [
+    ## Same as output encoding of stage 1. Stages are chained by an OS pipe.
+    'gbk',
+    ## Different. Output of stage 1 is transcoded.
+    'big5',
+])
+def test_pipeline_stage_encodings(run_exp, spie_2):
+    #/
+    res = run_exp([
+        '--sp', 'iconv -f utf-8 -t gbk', '--spie', 'utf-8', '--spoe', 'gbk',
+        '--sp', 'iconv -f {} -t utf-16le'.format(spie_2), '--spie', spie_2, '--spoe', 'utf-16-le',
+    ], input_btxt='中文\n'.encode('utf-8'))
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert res.stdout == '中文\n'.encode('utf-8')
+
+def test_pipeline_stage_stderr_named(run_exp):
+    #/
+    res = run_exp(['--spsh', '--sp', 'cat', '--sp', 'echo err >&2; cat'], input_btxt=b'out\n')
+
+    #/
+    assert res.returncode == 0, res.stderr
+
+    assert res.stdout == b'out\n'
+
+    assert res.stderr == b'#/ Subproc 2 stderr\n---\nerr\n---\n'
+
+@pytest.mark.parametrize('arg_s, ret_v', [
+    ## Run error of a middle stage.
+    (['--sp', 'cat', '--sp', 'no-such-cmd-5e7a', '--sp', 'cat'], 10),
+    ## Decode error of the last stage's stdout.
+    (['--sp', 'cat', '--sp', "printf \\377", '--spoe', 'utf-8'], 13),
+    ## Encode error of the data sent from stage 1 to stage 2.
+    (['--spie', 'ascii', '--spoe', 'latin-1', '--sp', "printf \\377", '--sp', 'cat'], 9),
+])
+def test_pipeline_exit_code(run_exp, arg_s, ret_v):
+    #/
+    res = run_exp(arg_s, input_btxt=b'a\n')
+
+    #/
+    assert res.returncode == ret_v, res.stderr
+
+@pytest.mark.parametrize('input_btxt', [b'a\nb', b'a\nb\n', b'a\n\n', b'x', b''])
+@pytest.mark.parametrize('extra_arg_s', [[], ['--chunk', '1']])
+def test_pool_keeps_trailing_state(run_exp, input_btxt, extra_arg_s):
+    #/
+    ## Same output as without the pool, and as |--rec|.
+    for arg_s in [['--sp', 'cat'], ['--rec'], ['--spw', '2', '--sp', 'cat']]:
+        #/
+        res = run_exp(arg_s + extra_arg_s, input_btxt=input_btxt)
+
+        #/
+        assert res.returncode == 0, res.stderr
+
+        assert res.stdout == input_btxt, arg_s